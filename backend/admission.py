@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+"""
+admission.py contains the admission control in front of the expensive /check_job work.
+
+At most `max_active` checks run at once (and at most `max_expensive` of them may need Chromium). Requests beyond that
+wait in a bounded queue that is served round-robin per client, so one caller can't starve the others. When the queue
+is full, or a client already has its share of it waiting, the request is turned away straight away with a
+Retry-After instead of piling up behind 60s checks.
+"""
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request isn't admitted. retry_after is the suggested wait in seconds.
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    def __init__(self, client_id, expensive):
+        self.client_id = client_id
+        self.expensive = expensive
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    :param max_active: Checks allowed to run at once
+    :param max_expensive: Of those, how many may be expensive (Playwright)
+    :param max_pending: Max requests waiting for a slot
+    :param per_client_pending: Max waiting requests per client
+    :param max_wait: Seconds a request may wait before it's rejected
+    """
+
+    def __init__(self, max_active=2, max_expensive=1, max_pending=8, per_client_pending=2, max_wait=20):
+        self.max_active = max_active
+        self.max_expensive = max_expensive
+        self.max_pending = max_pending
+        self.per_client_pending = per_client_pending
+        self.max_wait = max_wait
+
+        self.cond = threading.Condition()
+        self.active = 0
+        self.expensive_active = 0
+        self.waiting = OrderedDict()  # client_id -> deque of tickets, rotated for fairness
+        self.pending = 0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_times = deque(maxlen=500)
+        self.service_times = deque(maxlen=500)
+
+    def _fits(self, expensive):
+        if self.active >= self.max_active:
+            return False
+        return not expensive or self.expensive_active < self.max_expensive
+
+    def _start(self, ticket):
+        ticket.granted = True
+        self.active += 1
+        if ticket.expensive:
+            self.expensive_active += 1
+        self.admitted += 1
+        self.wait_times.append(time.monotonic() - ticket.enqueued_at)
+
+    def _grant_waiting(self):
+        # Round-robin over clients: each pass gives at most one slot per client, in rotation order
+        progress = True
+        while progress and self.waiting:
+            progress = False
+            for client_id in list(self.waiting):
+                queue = self.waiting[client_id]
+                if not self._fits(queue[0].expensive):
+                    continue
+
+                ticket = queue.popleft()
+                self.pending -= 1
+                self._start(ticket)
+                progress = True
+
+                del self.waiting[client_id]
+                if queue:
+                    self.waiting[client_id] = queue  # back of the rotation
+        self.cond.notify_all()
+
+    def _retry_after(self):
+        avg_service = (sum(self.service_times) / len(self.service_times)) if self.service_times else 5.0
+        return max(1, int(math.ceil(avg_service * (self.pending + 1) / max(1, self.max_active))))
+
+    def _reject(self, reason):
+        self.rejected += 1
+        raise AdmissionRejected(reason, self._retry_after())
+
+    @contextmanager
+    def admit(self, client_id, expensive=False):
+        """
+        Holds a slot for the duration of the block; raises AdmissionRejected if none can be had.
+
+        :param client_id: Caller identity used for fairness (e.g. client IP)
+        :param expensive: True if the check is expected to need Playwright
+        """
+        ticket = _Ticket(client_id, expensive)
+
+        with self.cond:
+            if not self.waiting and self._fits(expensive):
+                self._start(ticket)
+            else:
+                if self.pending >= self.max_pending:
+                    self._reject("Check queue is full")
+                if len(self.waiting.get(client_id, ())) >= self.per_client_pending:
+                    self._reject("Too many pending checks for this client")
+
+                self.waiting.setdefault(client_id, deque()).append(ticket)
+                self.pending += 1
+                self._grant_waiting()  # it may fit right away (e.g. a cheap check behind a blocked expensive one)
+
+                ends_at = ticket.enqueued_at + self.max_wait
+                while not ticket.granted:
+                    remaining = ends_at - time.monotonic()
+                    if remaining <= 0:
+                        queue = self.waiting.get(client_id)
+                        if queue and ticket in queue:
+                            queue.remove(ticket)
+                            if not queue:
+                                del self.waiting[client_id]
+                            self.pending -= 1
+                        self._reject(f"No check slot free within {self.max_wait}s")
+                    self.cond.wait(remaining)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.service_times.append(time.monotonic() - started)
+                self.active -= 1
+                if ticket.expensive:
+                    self.expensive_active -= 1
+                self._grant_waiting()
+
+    def stats(self):
+        """
+        Queue depth, active counts and wait time stats for monitoring.
+        """
+        with self.cond:
+            waits = sorted(self.wait_times)
+            return {
+                "queue_depth": self.pending,
+                "active": self.active,
+                "expensive_active": self.expensive_active,
+                "max_active": self.max_active,
+                "max_expensive": self.max_expensive,
+                "max_pending": self.max_pending,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "wait_avg_seconds": (sum(waits) / len(waits)) if waits else 0.0,
+                "wait_p95_seconds": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            }
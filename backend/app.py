@@ -1,21 +1,35 @@
+import hmac
+import json
 import logging
 import os
+import sys
 from datetime import timedelta
 from dotenv import load_dotenv
-from flask import Flask, send_from_directory
+from flask import Flask, Response, send_from_directory, stream_with_context
 from flask_cors import CORS, cross_origin
 from flask_session import Session
 from flask_sqlalchemy import SQLAlchemy
 from flask import request, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
 
+from backend import database_config, metrics, sentry_config
 from backend.sentry_config import init_sentry
-from backend.job_cleaningtesting import check_single_link
+from backend.admission import AdmissionController, AdmissionRejected
+from backend.check_queue import CheckQueue
+from backend.host_throttle import HostGuard
+from backend.result_cache import ResultCache
+from backend.static_assets import StaticAssets
+from backend.url_canonical import canonical_url
+from backend.stateless_session import StatelessPathsSessionInterface
 
 """
 rezify.py is the main file of the Rezify application. It contains the main Flask app and all the routes for the 
 application.
 
 Any new routes for the application should be added here.
+
+Startup is kept light: the link checker (Playwright, BeautifulSoup, ...) is imported on first use through checker(),
+and Sentry plus the DB / HTTP connection pools are set up per process in init_worker(), after gunicorn forks.
 """
 
 load_dotenv()  # Load environment variables from.env file
@@ -24,14 +38,16 @@ load_dotenv()  # Load environment variables from.env file
 # Setup logging
 logging.basicConfig(level=logging.WARNING)
 
-init_sentry()
-
 # logging.getLogger("werkzeug").setLevel(logging.WARNING)      # or WARNING
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("sentry_sdk").setLevel(logging.WARNING)
 
 # Initialize Flask app
-app = Flask(__name__, static_folder="../frontend/build", static_url_path="")
+# The React build is served by serve_react from an in-memory manifest, not by Flask's static route
+FRONTEND_BUILD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "build")
+app = Flask(__name__, static_folder=None)
+# Heroku's router is the one proxy in front of the app: trust only the X-Forwarded-For hop it appends
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
 CORS(
     app,
     supports_credentials=True,
@@ -57,20 +73,142 @@ app.config['SESSION_SQLALCHEMY'] = db
 
 Session(app)
 
+# Link check routes, metrics and build assets never use the session, so skip loading / saving it for them
+STATELESS_PATHS = ("/check_job", "/check_jobs", "/metrics", "/static")
+app.session_interface = StatelessPathsSessionInterface(
+    app.session_interface,
+    STATELESS_PATHS,
+    extra=lambda path: path.lstrip("/") in static_assets and path.lstrip("/") != "index.html",
+)
+
+# Import the link checker in the (preloading) gunicorn master so forked workers share it copy-on-write
+PRELOAD_CHECKER = os.getenv('PRELOAD_CHECKER', '0') == '1'
+
+_worker_pid = None
+
+
+def checker():
+    """
+    Returns the backend.job_cleaningtesting module, importing it on first call.
+    """
+    import backend.job_cleaningtesting as job_cleaningtesting
+    return job_cleaningtesting
+
+
+def init_worker():
+    """
+    Per-process setup that must happen after fork: starts Sentry (its transport thread doesn't survive a fork) and
+    drops DB / HTTP connections inherited from a preloading master. Runs from gunicorn's post_fork hook
+    (gunicorn.conf.py), or else on the process's first request.
+    """
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    _worker_pid = os.getpid()
+
+    database_config.dispose_engine()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    if 'backend.http_client' in sys.modules:
+        sys.modules['backend.http_client'].close()
+
+    init_sentry()
+
+
+@app.before_request
+def ensure_worker_initialized():
+    init_worker()
+
+
+if PRELOAD_CHECKER:
+    checker()
+
+# Limits for /check_jobs (per request)
+CHECK_JOBS_MAX_URLS = int(os.getenv('CHECK_JOBS_MAX_URLS', '1000'))
+CHECK_JOBS_MAX_CONCURRENCY = int(os.getenv('CHECK_JOBS_MAX_CONCURRENCY', '10'))
+CHECK_JOBS_MAX_DEADLINE = float(os.getenv('CHECK_JOBS_MAX_DEADLINE', '300'))
+
+# Shared across batch requests so a host's rate limit / breaker state outlives a single request
+batch_host_guard = HostGuard()
+
+# Recent /check_job results, keyed by canonical URL (tracking params etc. stripped), with concurrent identical checks
+# coalesced
+result_cache = ResultCache(ttl=int(os.getenv('CHECK_JOB_CACHE_TTL', '600')), key_fn=canonical_url)
+
+
+def cached_check(final_url):
+    return result_cache.get_or_compute(final_url, checker().check_single_link)[0]
+
+
+# Built once per process; the files are small enough to keep in memory with their gzip / brotli variants
+static_assets = StaticAssets(FRONTEND_BUILD)
+
+# Background pool for /check_job/submit
+check_queue = CheckQueue(cached_check)
+CHECK_QUEUE_MAX_DEPTH = int(os.getenv('CHECK_QUEUE_MAX_DEPTH', '200'))
+
+# Bounds the synchronous /check_job work this process accepts (per gunicorn worker)
+admission = AdmissionController(
+    max_active=int(os.getenv('CHECK_JOB_MAX_ACTIVE', '2')),
+    max_expensive=int(os.getenv('CHECK_JOB_MAX_EXPENSIVE', '1')),
+    max_pending=int(os.getenv('CHECK_JOB_MAX_PENDING', '8')),
+    per_client_pending=int(os.getenv('CHECK_JOB_PER_CLIENT_PENDING', '2')),
+    max_wait=float(os.getenv('CHECK_JOB_MAX_WAIT', '20')),
+)
+
+
+# Queue depths and counters the objects above already keep, read when /metrics is scraped
+metrics.QUEUE_DEPTH.set_function(lambda: check_queue.depth, queue="background_checks")
+metrics.QUEUE_DEPTH.set_function(lambda: admission.stats()["queue_depth"], queue="admission")
+metrics.ADMISSION_DECISIONS.set_function(lambda: admission.admitted, outcome="admitted")
+metrics.ADMISSION_DECISIONS.set_function(lambda: admission.rejected, outcome="rejected")
+for _status in result_cache.stats:
+    metrics.RESULT_CACHE_LOOKUPS.set_function(lambda s=_status: result_cache.stats[s], status=_status)
+
+# Bearer token for /metrics and /metrics/sentry_sampling (both answer 404 when it isn't set)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+def has_metrics_token():
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return bool(METRICS_TOKEN) and hmac.compare_digest(supplied, METRICS_TOKEN)
+
+
+def client_id():
+    """
+    Identifies the caller for fair queueing. remote_addr is the address Heroku's router saw (ProxyFix takes the last
+    X-Forwarded-For hop, the one the client can't forge) or the socket address without a proxy.
+    """
+    return request.remote_addr or "unknown"
+
+
+def too_busy(e):
+    response = jsonify({"error": f"Server busy: {e.reason}", "retry_after": e.retry_after})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
+
+SSE_RETRY_MS = 1500  # how soon EventSource reconnects to /events for a check that isn't done yet
+
 
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve_react(path):
-    static_file = os.path.join(app.static_folder, path)
-
-    if path != "" and os.path.exists(static_file):
-        return send_from_directory(app.static_folder, path)
-
-    return send_from_directory(app.static_folder, "index.html")
+    # Unknown paths are client-side routes, so they get index.html
+    response = static_assets.response(path, request)
+    if response is None:
+        response = static_assets.response("index.html", request)
+    if response is None:
+        return send_from_directory(FRONTEND_BUILD, "index.html")  # build missing: plain 404
+    return response
 
 
 @app.route("/check_job", methods=["POST"])
 def check_job():
+    """
+    Checks one final_url. Results are cached per canonical URL (X-Cache: HIT / MISS / COALESCED / BYPASS); send
+    "no_cache": true in the body or a Cache-Control: no-cache header to force a fresh check.
+    """
     try:
         data = request.get_json(silent=True) or {}
         final_url = data.get("final_url")
@@ -80,9 +218,25 @@ def check_job():
                 "error": "Missing or invalid final_url"
             }), 400
 
-        result = check_single_link(final_url)
+        bypass = bool(data.get("no_cache")) or "no-cache" in (request.headers.get("Cache-Control") or "").lower()
 
-        return jsonify(result), 200
+        # Cache hits are cheap and skip admission control entirely
+        result, age = (None, None) if bypass else result_cache.cached(final_url)
+        if result is not None:
+            cache_status = "HIT"
+        else:
+            try:
+                with admission.admit(client_id(), expensive=checker().uses_browser(final_url)):
+                    result, cache_status, age = result_cache.get_or_compute(
+                        final_url, checker().check_single_link, bypass=bypass
+                    )
+            except AdmissionRejected as e:
+                return too_busy(e)
+
+        response = jsonify(result)
+        response.headers["X-Cache"] = cache_status
+        response.headers["Age"] = str(int(age or 0))
+        return response, 200
 
     except Exception as e:
         return jsonify({
@@ -92,8 +246,170 @@ def check_job():
             "used": "route_error"
         }), 500
 
+
+@app.route("/check_job/stats", methods=["GET"])
+def check_job_stats():
+    """
+    Admission queue depth / wait times, background queue depth and cache counters for this worker process.
+    """
+    return jsonify({
+        "admission": admission.stats(),
+        "background_queue_depth": check_queue.depth,
+        "result_cache": dict(result_cache.stats),
+    }), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """
+    This worker process's metrics in the Prometheus text format. Needs the METRICS_TOKEN bearer token.
+    """
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not has_metrics_token():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/metrics/sentry_sampling", methods=["GET", "POST"])
+def sentry_sampling():
+    """
+    Reads or sets the Sentry traces sample rate ({"traces_sample_rate": 0.05}). Needs the METRICS_TOKEN bearer token.
+    A change applies to every process on the dyno that served it within a few seconds, and only until that dyno
+    restarts (see sentry_config); the response names the dyno. Set SENTRY_TRACES_SAMPLE_RATE to change it everywhere.
+    """
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not has_metrics_token():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        try:
+            sentry_config.set_traces_sample_rate(data.get("traces_sample_rate"))
+        except (TypeError, ValueError):
+            return jsonify({"error": "traces_sample_rate must be a number between 0 and 1"}), 400
+
+    return jsonify({
+        "traces_sample_rate": sentry_config.traces_sample_rate(),
+        "dyno": os.getenv('DYNO'),
+    }), 200
+
+
+@app.route("/check_job/submit", methods=["POST"])
+def submit_check_job():
+    """
+    Queues a check and returns its id immediately (202). The result is fetched from /check_job/<check_id> (polling)
+    or pushed over /check_job/<check_id>/events (server-sent events).
+    """
+    data = request.get_json(silent=True) or {}
+    final_url = data.get("final_url")
+
+    if not final_url or not isinstance(final_url, str):
+        return jsonify({
+            "error": "Missing or invalid final_url"
+        }), 400
+
+    if check_queue.depth >= CHECK_QUEUE_MAX_DEPTH:
+        return too_busy(AdmissionRejected("Background check queue is full", 5))
+
+    try:
+        check_id = check_queue.submit(final_url)
+    except Exception as e:
+        return jsonify({"error": f"Could not queue check: {type(e).__name__}"}), 503
+
+    return jsonify({
+        "check_id": check_id,
+        "status": "queued",
+        "poll_url": f"/check_job/{check_id}",
+        "events_url": f"/check_job/{check_id}/events",
+    }), 202
+
+
+@app.route("/check_job/<check_id>", methods=["GET"])
+def get_check_job(check_id):
+    state = check_queue.get(check_id)
+    if state is None:
+        return jsonify({"error": "Unknown check_id"}), 404
+
+    return jsonify(state), 200
+
+
+@app.route("/check_job/<check_id>/events", methods=["GET"])
+def check_job_events(check_id):
+    """
+    Server-sent events for one check. Answers from one read of the check's state and ends the stream straight away,
+    so no worker thread is held while the check runs: a "result" event when it is done, else a "pending" event, and
+    EventSource reconnects after SSE_RETRY_MS.
+    """
+    state = check_queue.get(check_id)
+
+    if state is None:
+        body = f"event: missing\ndata: {json.dumps({'error': 'Unknown check_id'})}\n\n"
+    elif state["status"] == "done":
+        body = f"event: result\ndata: {json.dumps(state)}\n\n"
+    else:
+        body = f"event: pending\ndata: {json.dumps(state)}\n\n"
+
+    return Response(
+        f"retry: {SSE_RETRY_MS}\n\n" + body,
+        mimetype="text/event-stream",
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+
+
+@app.route("/check_jobs", methods=["POST"])
+def check_jobs():
+    """
+    Batch version of /check_job. Takes {"final_urls": [...], "concurrency": int, "deadline_seconds": float} and
+    streams one NDJSON line per URL ({"index": i, ...check_single_link result}) as each check finishes, so results
+    arrive in completion order, not input order.
+
+    concurrency is capped at CHECK_JOBS_MAX_CONCURRENCY and deadline_seconds at CHECK_JOBS_MAX_DEADLINE. URLs that
+    haven't finished when the deadline hits come back as KEEP with used="deadline".
+    """
+    data = request.get_json(silent=True) or {}
+    final_urls = data.get("final_urls")
+
+    if not isinstance(final_urls, list) or not final_urls or not all(isinstance(u, str) for u in final_urls):
+        return jsonify({"error": "Missing or invalid final_urls (expected a non-empty list of strings)"}), 400
+
+    if len(final_urls) > CHECK_JOBS_MAX_URLS:
+        return jsonify({"error": f"Too many final_urls (max {CHECK_JOBS_MAX_URLS})"}), 400
+
+    try:
+        concurrency = int(data.get("concurrency") or CHECK_JOBS_MAX_CONCURRENCY)
+        deadline = float(data.get("deadline_seconds") or CHECK_JOBS_MAX_DEADLINE)
+    except (TypeError, ValueError):
+        return jsonify({"error": "concurrency and deadline_seconds must be numbers"}), 400
+
+    concurrency = max(1, min(concurrency, CHECK_JOBS_MAX_CONCURRENCY))
+    deadline = max(1.0, min(deadline, CHECK_JOBS_MAX_DEADLINE))
+
+    def generate():
+        for idx, url, res in checker().iter_link_checks_parallel(
+                final_urls,
+                timeout=min(60, deadline),
+                max_workers=concurrency,
+                host_guard=batch_host_guard,
+                deadline=deadline,
+        ):
+            yield json.dumps({"index": idx, **res}) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+
+
 # Main block to run the app
 if __name__ == "__main__":
+    from backend import browser_pool
+
+    init_worker()
     with app.app_context():
         db.create_all()
-    app.run(port=5000)
+    with browser_pool.serving():
+        app.run(port=5000)
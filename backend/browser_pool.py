@@ -0,0 +1,419 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+
+from backend import metrics
+
+"""
+browser_pool.py contains the dedicated Chromium worker pool used by the Playwright detectors.
+
+Instead of every gunicorn worker (and every cleaning thread) launching its own Chromium, a separate server process
+owns a fixed number of browser worker processes, each with one long-lived browser. Web workers and cleaning runs send
+render requests to it over a local Unix socket, so Chromium memory is bounded by BROWSER_POOL_SIZE no matter how many
+web workers are running.
+
+The server (python -m backend.browser_pool) is owned by the process that runs the renders' clients: the gunicorn master
+starts it in on_starting and stops it in on_exit (gunicorn.conf.py), and scripts wrap their run in serving(). Its
+owner restarts it if it dies, and it exits if its owner does. Clients only connect; they never start a server.
+Connections are authenticated with BROWSER_POOL_AUTHKEY, generated per boot by start_server() when it isn't set.
+
+Set BROWSER_POOL_ENABLED=0 to launch Chromium in-process like before (handy for local debugging).
+"""
+
+BROWSER_POOL_ENABLED = os.getenv('BROWSER_POOL_ENABLED', '1') != '0'
+BROWSER_POOL_ADDRESS = os.getenv('BROWSER_POOL_ADDRESS', '/tmp/rezify-browser-pool.sock')
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+BROWSER_POOL_QUEUE_SIZE = int(os.getenv('BROWSER_POOL_QUEUE_SIZE', str(BROWSER_POOL_SIZE * 4)))  # waiting renders
+BROWSER_RECYCLE_AFTER = int(os.getenv('BROWSER_RECYCLE_AFTER', '100'))  # renders before a browser is relaunched
+SERVER_CONNECT_TIMEOUT = 5  # how long a client waits for a server that is (re)starting
+SERVER_RESTART_DELAY = 2
+RESULT_GRACE_SECONDS = 30  # extra time on top of the render timeout before a client gives up on a result
+MIN_RENDER_SECONDS = 1.0  # a task with less time than this before its client gives up is dropped unrendered
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BrowserPoolError(Exception):
+    """
+    Raised when the pool can't be reached, is full, or a render fails inside a browser worker.
+    """
+
+
+def ensure_authkey():
+    """
+    Sets BROWSER_POOL_AUTHKEY to a random key for this boot unless one is configured. Processes started or forked
+    afterwards (the server, gunicorn workers) inherit it.
+    """
+    if not os.getenv('BROWSER_POOL_AUTHKEY'):
+        os.environ['BROWSER_POOL_AUTHKEY'] = secrets.token_hex(32)
+
+
+def _authkey():
+    key = os.getenv('BROWSER_POOL_AUTHKEY')
+    if not key:
+        raise BrowserPoolError("BROWSER_POOL_AUTHKEY is not set (start the pool with browser_pool.start_server())")
+    return key.encode()
+
+
+# ============================================================
+# Server side
+# ============================================================
+
+def _browser_worker(tasks, results):
+    """
+    Browser worker process: keeps one Chromium alive and runs render tasks from the queue until it gets None.
+    Each task is (task_id, kind, url, timeout_ms, deadline); each result is (task_id, status, reason, error_type).
+    deadline is the wall-clock time the client stops waiting: a task that can't start a render before then is dropped,
+    and the render's timeout is capped to it.
+    """
+    # Imported here so the server process itself never loads Playwright
+    from playwright.sync_api import sync_playwright
+    from backend.job_cleaningtesting import launch_browser, RENDERERS
+
+    with sync_playwright() as p:
+        browser = None
+        renders = 0
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, kind, url, timeout_ms, deadline = task
+
+            left = deadline - time.time()
+            if left < MIN_RENDER_SECONDS:
+                results.put((task_id, None, "Client deadline passed before the render started", "Expired"))
+                continue
+            timeout_ms = min(timeout_ms, int(left * 1000))
+
+            try:
+                if browser is None or not browser.is_connected() or renders >= BROWSER_RECYCLE_AFTER:
+                    if browser is not None:
+                        try:
+                            browser.close()
+                        except Exception:
+                            pass
+                    browser = launch_browser(p)
+                    renders = 0
+
+                renders += 1
+                status, reason = RENDERERS[kind](browser, url, timeout_ms)
+                results.put((task_id, status, reason, None))
+
+            except Exception as e:
+                results.put((task_id, None, str(e), type(e).__name__))
+
+        if browser is not None:
+            browser.close()
+
+
+class BrowserPoolServer:
+    """
+    Owns the browser worker processes and the Unix socket clients connect to.
+    """
+
+    def __init__(self, address=BROWSER_POOL_ADDRESS, size=BROWSER_POOL_SIZE):
+        self.address = address
+        self.size = size
+        ctx = multiprocessing.get_context("spawn")
+        self.ctx = ctx
+        self.tasks = ctx.Queue(maxsize=BROWSER_POOL_QUEUE_SIZE)
+        self.results = ctx.Queue()
+        self.workers = []
+        self.pending = {}  # task_id -> (conn, conn_lock, request_id)
+        self.lock = threading.Lock()
+        self.task_ids = itertools.count()
+        self.closing = False
+
+    def _start_worker(self):
+        proc = self.ctx.Process(target=_browser_worker, args=(self.tasks, self.results), daemon=True)
+        proc.start()
+        return proc
+
+    def _watch_workers(self, parent):
+        # Replace crashed (e.g. OOM-killed) workers so the pool stays at its fixed size, and shut down if the process
+        # that owns the server is gone (it would otherwise keep Chromium running with nobody to stop it)
+        while True:
+            time.sleep(5)
+            if os.getppid() != parent:
+                logging.warning("Browser pool owner exited, shutting down")
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+            for i, proc in enumerate(self.workers):
+                if not proc.is_alive() and not self.closing:
+                    logging.warning(f"Browser worker {proc.pid} exited ({proc.exitcode}), restarting")
+                    self.workers[i] = self._start_worker()
+
+    def _dispatch_results(self):
+        while True:
+            task_id, status, reason, error_type = self.results.get()
+            with self.lock:
+                target = self.pending.pop(task_id, None)
+            if target is None:
+                continue
+            conn, conn_lock, request_id = target
+            try:
+                with conn_lock:
+                    conn.send((request_id, status, reason, error_type))
+            except (OSError, EOFError):
+                pass
+
+    def _serve_client(self, conn):
+        conn_lock = threading.Lock()
+        try:
+            while True:
+                request_id, kind, url, timeout_ms, deadline = conn.recv()
+                task_id = next(self.task_ids)
+                with self.lock:
+                    self.pending[task_id] = (conn, conn_lock, request_id)
+                try:
+                    self.tasks.put_nowait((task_id, kind, url, timeout_ms, deadline))
+                except queue.Full:
+                    # Answer straight away rather than queueing renders the client would give up on anyway
+                    with self.lock:
+                        self.pending.pop(task_id, None)
+                    with conn_lock:
+                        conn.send((request_id, None, f"Browser pool queue is full ({BROWSER_POOL_QUEUE_SIZE})",
+                                   "BrowserPoolBusy"))
+        except (OSError, EOFError):
+            pass
+        finally:
+            with self.lock:
+                for task_id in [t for t, target in self.pending.items() if target[0] is conn]:
+                    del self.pending[task_id]
+            conn.close()
+
+    def serve_forever(self):
+        authkey = _authkey()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        # SIGTERM (from the owner's stop(), or a dyno shutdown) unwinds through the finally below
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        self.workers = [self._start_worker() for _ in range(self.size)]
+        threading.Thread(target=self._watch_workers, args=(os.getppid(),), daemon=True).start()
+        threading.Thread(target=self._dispatch_results, daemon=True).start()
+
+        listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        os.chmod(self.address, 0o600)
+        logging.warning(f"Browser pool listening on {self.address} with {self.size} browser worker(s)")
+
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logging.error(f"Browser pool accept failed: {e}")
+                    continue
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            self.closing = True
+            listener.close()
+            for proc in self.workers:
+                proc.terminate()
+            for proc in self.workers:
+                proc.join(5)
+
+
+class PoolServerProcess:
+    """
+    Runs the pool server as a child of the current process and restarts it whenever it exits, until stop().
+    """
+
+    def __init__(self):
+        self.proc = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def start(self):
+        ensure_authkey()
+        self._spawn()
+        threading.Thread(target=self._supervise, name="browser-pool-supervisor", daemon=True).start()
+
+    def _spawn(self):
+        with self.lock:
+            if not self.stopping.is_set():
+                self.proc = subprocess.Popen([sys.executable, "-m", "backend.browser_pool"], cwd=PROJECT_ROOT)
+
+    def _supervise(self):
+        while not self.stopping.wait(SERVER_RESTART_DELAY):
+            code = self.proc.poll()
+            if code is not None and not self.stopping.is_set():
+                logging.warning(f"Browser pool server exited ({code}), restarting")
+                self._spawn()
+
+    def stop(self, timeout=10):
+        self.stopping.set()
+        with self.lock:
+            proc = self.proc
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+_server_process = None
+
+
+def start_server():
+    """
+    Starts the supervised pool server owned by this process (no-op if the pool is disabled or already started).
+    """
+    global _server_process
+    if BROWSER_POOL_ENABLED and _server_process is None:
+        _server_process = PoolServerProcess()
+        _server_process.start()
+
+
+def stop_server():
+    global _server_process
+    if _server_process is not None:
+        _server_process.stop()
+        _server_process = None
+
+
+@contextmanager
+def serving():
+    """
+    Runs the pool server for the duration of the block (for scripts; under gunicorn the master owns it).
+    """
+    start_server()
+    try:
+        yield
+    finally:
+        stop_server()
+
+
+# ============================================================
+# Client side
+# ============================================================
+
+class BrowserPoolClient:
+    """
+    Per-process connection to the pool server. Thread safe; requests are multiplexed over one socket and matched to
+    their results by id. Reconnects after a fork or a dropped connection, waiting briefly for a server that is
+    restarting.
+    """
+
+    def __init__(self, address=BROWSER_POOL_ADDRESS):
+        self.address = address
+        self.conn = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.request_ids = itertools.count()
+        self.in_flight = 0
+
+    def _connect(self):
+        authkey = _authkey()
+        ends_at = time.monotonic() + SERVER_CONNECT_TIMEOUT
+        while True:
+            try:
+                return Client(self.address, family="AF_UNIX", authkey=authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= ends_at:
+                    raise BrowserPoolError(f"Browser pool is not running at {self.address}")
+                time.sleep(0.2)
+
+    def _ensure_connected(self):
+        # Caller holds self.lock
+        if self.conn is not None and self.pid == os.getpid():
+            return
+
+        # New process (fork) or dropped connection: never reuse an inherited socket
+        self.conn = self._connect()
+        self.pid = os.getpid()
+        self.futures = {}
+        threading.Thread(target=self._read_results, args=(self.conn,), daemon=True).start()
+
+    def _read_results(self, conn):
+        try:
+            while True:
+                request_id, status, reason, error_type = conn.recv()
+                with self.lock:
+                    fut = self.futures.pop(request_id, None)
+                if fut is not None:
+                    fut.set_result((status, reason, error_type))
+        except (OSError, EOFError):
+            with self.lock:
+                if self.conn is conn:
+                    self.conn = None
+                futures, self.futures = self.futures, {}
+            for fut in futures.values():
+                fut.set_exception(BrowserPoolError("Connection to browser pool lost"))
+
+    def render(self, kind, url, timeout_ms):
+        """
+        Runs a render in the pool and returns (status, reason).
+
+        Raises playwright's TimeoutError for navigation timeouts inside the worker (so callers can treat them like
+        in-process timeouts) and BrowserPoolError for everything else, including a full queue (answered right away).
+        """
+        fut = Future()
+        wait_seconds = timeout_ms / 1000 + RESULT_GRACE_SECONDS
+        with self.lock:
+            try:
+                self._ensure_connected()
+            except OSError as e:
+                raise BrowserPoolError(f"Browser pool unavailable: {e}")
+            request_id = next(self.request_ids)
+            self.futures[request_id] = fut
+            try:
+                self.conn.send((request_id, kind, url, timeout_ms, time.time() + wait_seconds))
+            except (OSError, EOFError) as e:
+                self.futures.pop(request_id, None)
+                self.conn = None
+                raise BrowserPoolError(f"Browser pool send failed: {e}")
+            self.in_flight += 1
+
+        try:
+            status, reason, error_type = fut.result(timeout=wait_seconds)
+        except FutureTimeoutError:
+            with self.lock:
+                self.futures.pop(request_id, None)
+            raise BrowserPoolError("Browser pool did not answer in time")
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+        if error_type == "TimeoutError":
+            from playwright.sync_api import TimeoutError as PWTimeoutError
+            raise PWTimeoutError(reason)
+        if error_type:
+            raise BrowserPoolError(f"{error_type}: {reason}")
+
+        return status, reason
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+
+
+pool_client = BrowserPoolClient()
+metrics.BROWSER_POOL_IN_FLIGHT.set_function(lambda: pool_client.in_flight)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        BrowserPoolServer().serve_forever()
+    except BrowserPoolError as e:
+        sys.exit(f"Browser pool not started: {e}")
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from backend.database_config import Session
+from backend.tables import link_checks_table
+
+"""
+check_queue.py contains the background worker pool behind the asynchronous /check_job/submit API.
+
+A submitted check gets an id straight away and runs on a background thread pool, so web workers never sit on the
+outbound requests / Chromium render themselves. Check state lives in the link_checks table (not in memory), because
+with several gunicorn workers the poll or SSE request usually lands on a different process than the submit did.
+The table is created by schema.sql.
+
+Every unfinished check holds a lease (lease_until) that the process running it keeps renewing. If that process dies
+(worker recycled, dyno restarted) the lease runs out, and the next read of the check re-runs it in the reading
+process, or after CHECK_MAX_ATTEMPTS tries finishes it as a KEEP, so no check stays queued / running forever.
+"""
+
+CHECK_QUEUE_WORKERS = int(os.getenv('CHECK_QUEUE_WORKERS', '4'))
+CHECK_RETENTION_HOURS = 24
+CHECK_LEASE_SECONDS = 60  # renewed every third of this while the check is queued / running here
+CHECK_MAX_ATTEMPTS = 2
+
+
+class CheckQueue:
+    """
+    Submits link checks to a background pool and tracks them in the link_checks table.
+
+    :param check_fn: Function(final_url) -> result dict (check_single_link)
+    :param max_workers: Background threads in this process
+    """
+
+    def __init__(self, check_fn, max_workers=CHECK_QUEUE_WORKERS):
+        self.check_fn = check_fn
+        self.max_workers = max_workers
+        self.executor = None
+        self.in_flight = set()  # ids of the checks queued / running in this process
+        self.lock = threading.Lock()
+        self.submitted = 0
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="check-queue")
+                threading.Thread(target=self._renew_leases, name="check-queue-leases", daemon=True).start()
+
+    @property
+    def depth(self):
+        """
+        Number of checks submitted by this process that haven't finished yet.
+        """
+        with self.lock:
+            return len(self.in_flight)
+
+    def submit(self, final_url):
+        """
+        Records a queued check and hands it to the background pool.
+
+        :return: check_id (str)
+        """
+        self._ensure_started()
+        check_id = uuid.uuid4().hex
+
+        session = Session
+        try:
+            session.execute(
+                text(f'''
+                    INSERT INTO {link_checks_table} (id, final_url, status, created_at, lease_until, attempts)
+                    VALUES (:id, :final_url, 'queued', CURRENT_TIMESTAMP,
+                            CURRENT_TIMESTAMP + :lease * INTERVAL '1 second', 0)
+                '''),
+                {'id': check_id, 'final_url': final_url, 'lease': CHECK_LEASE_SECONDS}
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.remove()
+
+        with self.lock:
+            self.in_flight.add(check_id)
+            self.submitted += 1
+            prune = self.submitted % 500 == 0
+
+        self.executor.submit(self._run, check_id, final_url)
+        if prune:
+            self.executor.submit(self._prune)
+
+        return check_id
+
+    def _update(self, check_id, status, result=None):
+        session = Session
+        try:
+            if status == 'running':
+                session.execute(
+                    text(f'''
+                        UPDATE {link_checks_table}
+                        SET status = 'running', started_at = CURRENT_TIMESTAMP, attempts = attempts + 1,
+                            lease_until = CURRENT_TIMESTAMP + :lease * INTERVAL '1 second'
+                        WHERE id = :id
+                    '''),
+                    {'id': check_id, 'lease': CHECK_LEASE_SECONDS}
+                )
+            elif result is None:
+                session.execute(
+                    text(f"UPDATE {link_checks_table} SET status = :status WHERE id = :id"),
+                    {'id': check_id, 'status': status}
+                )
+            else:
+                session.execute(
+                    text(f'''
+                        UPDATE {link_checks_table}
+                        SET status = :status, result = :result, finished_at = CURRENT_TIMESTAMP
+                        WHERE id = :id
+                    '''),
+                    {'id': check_id, 'status': status, 'result': json.dumps(result)}
+                )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Error updating link check {check_id}: {e}")
+        finally:
+            session.remove()
+
+    def _run(self, check_id, final_url):
+        try:
+            self._update(check_id, 'running')
+            try:
+                result = self.check_fn(final_url)
+            except Exception as e:
+                result = {
+                    "final_url": final_url,
+                    "decision": "KEEP",
+                    "reason": f"Server error: {type(e).__name__}: {e}",
+                    "used": "route_error",
+                }
+            self._update(check_id, 'done', result)
+        finally:
+            with self.lock:
+                self.in_flight.discard(check_id)
+
+    def _renew_leases(self):
+        while True:
+            time.sleep(CHECK_LEASE_SECONDS / 3)
+            with self.lock:
+                ids = list(self.in_flight)
+            if not ids:
+                continue
+
+            session = Session
+            try:
+                session.execute(
+                    text(f'''
+                        UPDATE {link_checks_table}
+                        SET lease_until = CURRENT_TIMESTAMP + :lease * INTERVAL '1 second'
+                        WHERE id = ANY(:ids) AND status <> 'done'
+                    '''),
+                    {'ids': ids, 'lease': CHECK_LEASE_SECONDS}
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logging.error(f"Error renewing link check leases: {e}")
+            finally:
+                session.remove()
+
+    def _recover(self, check_id):
+        """
+        Takes over a check whose lease ran out (the process running it is gone): runs it again here, or finishes it
+        as a KEEP once it has been tried CHECK_MAX_ATTEMPTS times. The UPDATE only matches while the lease is expired,
+        so a check is recovered by one reader only.
+        """
+        self._ensure_started()
+        session = Session
+        try:
+            row = session.execute(
+                text(f'''
+                    UPDATE {link_checks_table}
+                    SET status = 'queued', lease_until = CURRENT_TIMESTAMP + :lease * INTERVAL '1 second'
+                    WHERE id = :id AND status <> 'done'
+                      AND COALESCE(lease_until, created_at + :lease * INTERVAL '1 second') < CURRENT_TIMESTAMP
+                    RETURNING final_url, attempts
+                '''),
+                {'id': check_id, 'lease': CHECK_LEASE_SECONDS}
+            ).fetchone()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Error recovering link check {check_id}: {e}")
+            return
+        finally:
+            session.remove()
+
+        if not row:
+            return
+        final_url, attempts = row
+        if (attempts or 0) >= CHECK_MAX_ATTEMPTS:
+            self._update(check_id, 'done', {
+                "final_url": final_url,
+                "decision": "KEEP",
+                "reason": f"Check abandoned after {attempts} attempts (the worker running it stopped)",
+                "used": "route_error",
+            })
+            return
+
+        with self.lock:
+            self.in_flight.add(check_id)
+        self.executor.submit(self._run, check_id, final_url)
+
+    def _prune(self):
+        session = Session
+        try:
+            cutoff = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(time.time() - CHECK_RETENTION_HOURS * 3600))
+            session.execute(text(f"DELETE FROM {link_checks_table} WHERE created_at < :cutoff"), {'cutoff': cutoff})
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Error pruning link checks: {e}")
+        finally:
+            session.remove()
+
+    def get(self, check_id):
+        """
+        Returns {"check_id", "status", "final_url", "result"} or None if the id is unknown. An unfinished check whose
+        lease has expired is recovered first (see _recover).
+        """
+        self._ensure_started()
+        row = self._read(check_id)
+        if row and row[1] != 'done' and row[4]:
+            self._recover(check_id)
+            row = self._read(check_id)
+
+        if not row:
+            return None
+
+        return {
+            "check_id": row[0],
+            "status": row[1],
+            "final_url": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+        }
+
+    def _read(self, check_id):
+        session = Session
+        try:
+            return session.execute(
+                text(f'''
+                    SELECT id, status, final_url, result,
+                           COALESCE(lease_until, created_at + :lease * INTERVAL '1 second') < CURRENT_TIMESTAMP
+                    FROM {link_checks_table}
+                    WHERE id = :id
+                '''),
+                {'id': check_id, 'lease': CHECK_LEASE_SECONDS}
+            ).fetchone()
+        finally:
+            session.remove()
@@ -1,12 +1,19 @@
 from backend.database_config import Session
 from sqlalchemy import text
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta, timezone
 import requests
 from bs4 import BeautifulSoup
 from sentry_sdk import capture_exception, capture_message
+from backend import metrics
+from backend.cleaning_stats import CleaningRun, cleaning_phase
+from backend.error_aggregator import ErrorAggregator
+from backend.url_canonical import canonical_url
 from backend.tables import deleted_internships_ids_table, deleted_entry_level_ids_table, internships_table, entry_level_table, \
-    internships_cleaning_hist_table, entry_level_cleaning_hist_table
+    internships_cleaning_hist_table, entry_level_cleaning_hist_table, cleaning_run_details_table
 
 """
 clean_job_tables.py contains functions to clean and maintain the jobs database.
@@ -340,6 +347,87 @@ def clean_indeed_jobs(table):
         return count
 
 
+# SQL conditions the clean_*_table functions delete on, with the reason logged for each
+DELETION_CONDITIONS = [
+    ("company = 'RippleMatch'", "RippleMatch"),
+    ("company = 'Jobs via Dice'", "Jobs via Dice"),
+    ("LOWER(company) LIKE '%xxx%'", "Company contains 'xxx'"),
+    ("final_url LIKE '%lensa.com%'", "lensa.com duplicates"),
+    ("company = 'Jobright.ai'", "Jobright.ai"),
+    ("final_url IS NULL", "final_url is NULL")
+]
+
+
+def count_sql_rule_deletions(table, exclude_ids=()):
+    """
+    Counts the rows the SQL rules of clean_internships_table / clean_entry_level_table would delete, without deleting
+    anything. The rules are applied in the same order as a real run (age, deletion conditions, duplicates, LinkedIn,
+    Indeed), each to the rows the previous ones left, so a row is only counted once, under the first rule that takes it.
+
+    :param table: Which table to count for - either 'internships' or 'entry_level'
+    :param exclude_ids: Job ids the link checks already delete (or would), left out as a real run would have
+    :return: Dict with the same keys as the clean_*_table functions return, or None for an unknown table
+    """
+    if table == 'internships':
+        table = internships_table
+    elif table == 'entry_level':
+        table = entry_level_table
+    else:
+        return
+
+    jobs_limit_str = (datetime.now() - timedelta(days=70)).strftime('%Y-%m-%d')
+    one_month_ago_str = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    three_days_ago_str = (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
+
+    condition_cases = "\n".join(f"WHEN {condition} THEN 'deletion_cond'" for condition, _ in DELETION_CONDITIONS)
+    small_company = "(company_employee_count_range IS NULL OR company_employee_count_range IN ('1-10', '11-50'))"
+
+    session = Session
+    results = session.execute(
+        text(f'''
+            WITH remaining AS (
+                SELECT * FROM {table}
+                WHERE NOT (id = ANY(:exclude_ids))
+            ),
+            first_rules AS (
+                SELECT id, title, company, location, final_url, company_employee_count_range, date_posted,
+                       CASE
+                           WHEN date_posted < :two_months_ago THEN 'age'
+                           {condition_cases}
+                       END AS rule
+                FROM remaining
+            ),
+            ranked_jobs AS (
+                SELECT *,
+                       ROW_NUMBER() OVER (PARTITION BY title, company, location ORDER BY date_posted DESC, id) AS rn
+                FROM first_rules
+                WHERE rule IS NULL
+            ),
+            last_rules AS (
+                SELECT CASE
+                           WHEN rn > 1 THEN 'deduplicate'
+                           WHEN final_url LIKE '%www.linkedin.com%'
+                                AND (date_posted < :one_month_ago
+                                     OR ({small_company} AND date_posted < :three_days_ago)) THEN 'linkedin'
+                           WHEN final_url LIKE '%www.indeed.com%'
+                                AND {small_company} AND date_posted < :one_month_ago THEN 'indeed'
+                       END AS rule
+                FROM ranked_jobs
+            )
+            SELECT rule, COUNT(*) FROM first_rules WHERE rule IS NOT NULL GROUP BY rule
+            UNION ALL
+            SELECT rule, COUNT(*) FROM last_rules WHERE rule IS NOT NULL GROUP BY rule
+        '''),
+        {'exclude_ids': list(exclude_ids), 'two_months_ago': jobs_limit_str,
+         'one_month_ago': one_month_ago_str, 'three_days_ago': three_days_ago_str}
+    ).fetchall()
+
+    counts = {rule: count for rule, count in results}
+    return {'deduplicate_del_count': counts.get('deduplicate', 0), 'linkedin_del_count': counts.get('linkedin', 0),
+            'indeed_del_count': counts.get('indeed', 0), 'age_del_count': counts.get('age', 0),
+            'deletion_cond_del_count': counts.get('deletion_cond', 0)}
+
+
 def clean_internships_table():
     """
     This is the main function to clean the internships table. It calls the other functions such as clean_linkedin_jobs,
@@ -381,18 +469,8 @@ def clean_internships_table():
         )
         session.commit()
 
-        # Helper list of conditions to apply with messages for logging
-        deletion_conditions = [
-            ("company = 'RippleMatch'", "RippleMatch"),
-            ("company = 'Jobs via Dice'", "Jobs via Dice"),
-            ("LOWER(company) LIKE '%xxx%'", "Company contains 'xxx'"),
-            ("final_url LIKE '%lensa.com%'", "lensa.com duplicates"),
-            ("company = 'Jobright.ai'", "Jobright.ai"),
-            ("final_url IS NULL", "final_url is NULL")
-        ]
-
         deletion_cond_count = 0
-        for condition, reason in deletion_conditions:
+        for condition, reason in DELETION_CONDITIONS:
             try:
                 # Step 1: Select matching job IDs and date_posted
                 results = session.execute(
@@ -423,9 +501,12 @@ def clean_internships_table():
                 session.rollback()
                 capture_exception(e)
 
-        dedup_count = deduplicate_jobs_in_db('internships')  # Remove duplicates based on title, company, and location
-        linkedin_count = clean_linkedin_jobs('internships')  # Cleans LinkedIn jobs based on special LinkedIn criteria
-        indeed_count = clean_indeed_jobs('internships')  # Clean Indeed jobs based on special Indeed criteria
+        with cleaning_phase("dedup"):
+            dedup_count = deduplicate_jobs_in_db('internships')  # Remove duplicates based on title, company, and location
+        with cleaning_phase("linkedin"):
+            linkedin_count = clean_linkedin_jobs('internships')  # Cleans LinkedIn jobs based on special LinkedIn criteria
+        with cleaning_phase("indeed"):
+            indeed_count = clean_indeed_jobs('internships')  # Clean Indeed jobs based on special Indeed criteria
 
         del_counts = {'deduplicate_del_count': dedup_count, 'linkedin_del_count': linkedin_count, 'indeed_del_count': indeed_count,
                 'age_del_count': age_count, 'deletion_cond_del_count': deletion_cond_count}
@@ -483,18 +564,8 @@ def clean_entry_level_table():
         )
         session.commit()
 
-        # Helper list of conditions to apply with messages for logging
-        deletion_conditions = [
-            ("company = 'RippleMatch'", "RippleMatch"),
-            ("company = 'Jobs via Dice'", "Jobs via Dice"),
-            ("LOWER(company) LIKE '%xxx%'", "Company contains 'xxx'"),
-            ("final_url LIKE '%lensa.com%'", "lensa.com duplicates"),
-            ("company = 'Jobright.ai'", "Jobright.ai"),
-            ("final_url IS NULL", "final_url is NULL")
-        ]
-
         deletion_cond_count = 0
-        for condition, reason in deletion_conditions:
+        for condition, reason in DELETION_CONDITIONS:
             try:
                 # Step 1: Select matching job IDs and date_posted
                 results = session.execute(
@@ -525,9 +596,12 @@ def clean_entry_level_table():
                 session.rollback()
                 capture_exception(e)
 
-        dedup_count = deduplicate_jobs_in_db('entry_level')  # Remove duplicates based on title, company, and location
-        linkedin_count = clean_linkedin_jobs('entry_level')  # Cleans LinkedIn jobs based on special LinkedIn criteria
-        indeed_count = clean_indeed_jobs('entry_level')  # Clean Indeed jobs based on special Indeed criteria
+        with cleaning_phase("dedup"):
+            dedup_count = deduplicate_jobs_in_db('entry_level')  # Remove duplicates based on title, company, and location
+        with cleaning_phase("linkedin"):
+            linkedin_count = clean_linkedin_jobs('entry_level')  # Cleans LinkedIn jobs based on special LinkedIn criteria
+        with cleaning_phase("indeed"):
+            indeed_count = clean_indeed_jobs('entry_level')  # Clean Indeed jobs based on special Indeed criteria
 
         del_counts = {'deduplicate_del_count': dedup_count, 'linkedin_del_count': linkedin_count, 'indeed_del_count': indeed_count,
                 'age_del_count': age_count, 'deletion_cond_del_count': deletion_cond_count}
@@ -544,16 +618,109 @@ def clean_entry_level_table():
         return del_counts
 
 
-def job_cleaning(jobs, table):
+EXPIRED_KEYWORDS = [
+    "not found", "404 error", "page missing", "does not exist", "no longer available",
+    "no longer exists", "unavailable", "job expired", "no longer accepting",
+    "position has been filled", "no longer open"
+]
+
+
+def fetch_posting_verdict(final_url):
+    """
+    Fetches one posting and returns (expired, detector): detector is "status_code" for a 404 / 410 / 301 and
+    "keywords" when the visible text was searched for EXPIRED_KEYWORDS. Raises requests' RequestException.
+    """
+    response = requests.get(final_url, allow_redirects=True, timeout=10)
+
+    if response.status_code in [404, 410, 301]:
+        return True, "status_code"
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    for script in soup(["script", "style"]):
+        script.extract()
+
+    visible_text = soup.get_text(separator=" ", strip=True).lower()
+    return any(kw in visible_text for kw in EXPIRED_KEYWORDS), "keywords"
+
+
+def iter_posting_verdicts(postings, workers=1, ends_at=None):
+    """
+    Runs fetch_posting_verdict over postings ([(key, final_url, job_ids)]) and yields
+    (key, final_url, job_ids, expired, detector, error) as each finishes; expired and detector are None when the
+    request failed (error is the exception then). With workers > 1 the fetches run on a thread pool, at most
+    2 * workers submitted at a time. Once time.monotonic() passes ends_at no new fetch is started; the postings
+    left are yielded with detector "time_budget" and no verdict.
+    """
+    def check(posting):
+        key, final_url, job_ids = posting
+        try:
+            expired, detector = fetch_posting_verdict(final_url)
+            return key, final_url, job_ids, expired, detector, None
+        except requests.exceptions.RequestException as req_err:
+            return key, final_url, job_ids, None, None, req_err
+
+    def out_of_time():
+        return ends_at is not None and time.monotonic() >= ends_at
+
+    postings = iter(postings)
+
+    if workers <= 1:
+        for posting in postings:
+            if out_of_time():
+                yield (*posting, None, "time_budget", None)
+                continue
+            yield check(posting)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-cleaning") as ex:
+        in_flight = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < 2 * workers:
+                posting = next(postings, None)
+                if posting is None:
+                    exhausted = True
+                elif out_of_time():
+                    yield (*posting, None, "time_budget", None)
+                else:
+                    in_flight.add(ex.submit(check, posting))
+
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+
+def job_cleaning(jobs, table, shared_verdicts=None, errors=None, dry_run=False, workers=1, time_budget=None):
     """
     Deletes jobs from the database where:
     - The job's URL returns a 404, 410, or 301 status code.
     - The job's page contains keywords indicating the listing is expired or unavailable.
 
+    Jobs are grouped by canonical URL (see url_canonical.py), so each posting is fetched once no matter how many rows
+    link to it with different tracking parameters, and the verdict is applied to every row in the group.
+
     :param jobs: List of job dictionaries to check.
     :param table: Which table to clean - either 'internships' or 'entry_level'
+    :param shared_verdicts: Optional dict of canonical URL -> True (expired) / False (live). Verdicts already in it
+                            are reused without a request, and new ones are added, so passing the same dict to the
+                            internships and entry_level runs checks a posting listed in both tables only once.
+    :param errors: Optional ErrorAggregator that failed requests are counted in. The caller flushes it; without one,
+                   a fresh aggregator is used and flushed (one summary, plus one Sentry event unless
+                   dry_run) when this run ends.
+    :param dry_run: Fetch and decide every posting but delete nothing: the SQL rules are only counted (see
+                    count_sql_rule_deletions), no history row is written and failures are logged, not sent to Sentry.
+                    The report says what would have been deleted.
+    :param workers: Postings fetched in parallel (deletions still happen one at a time on this thread)
+    :param time_budget: Optional seconds for the link checks; postings not started by then are left for the next run
 
     Logs the reason for each deletion.
+
+    :return: Report dict: the run's CleaningRun.as_dict() plus "dry_run", "deleted" (rows deleted, or that would be
+             in a dry run), "skipped_time_budget", "samples" (up to 20 (final_url, detector) that were / would be
+             deleted) and, in a dry run, "sql_rule_counts" (rows each SQL rule would delete). None for an unknown table.
     """
 
     if table == 'internships':
@@ -565,63 +732,91 @@ def job_cleaning(jobs, table):
     else:
         return
 
-    keywords = [
-        "not found", "404 error", "page missing", "does not exist", "no longer available",
-        "no longer exists", "unavailable", "job expired", "no longer accepting",
-        "position has been filled", "no longer open"
-    ]
+    verdicts = shared_verdicts if shared_verdicts is not None else {}
+    run = CleaningRun(job_type)
+    run.jobs = len(jobs)
+    owns_errors = errors is None
+    if owns_errors:
+        errors = ErrorAggregator(f"job_cleaning {job_type}", to_sentry=not dry_run)
 
-    session = Session
+    # canonical URL -> [final_url to fetch (first row seen), [job ids]]
+    groups = {}
+    for job in jobs:
+        final_url = job.get('final_url')
+        job_id = job.get('id')
 
-    try:
-        link_html_count = 0
-        for job in jobs:
-            final_url = job.get('final_url')
-            job_id = job.get('id')
-            title = job.get('title', 'N/A')
-            company = job.get('company', 'N/A')
-
-            if not final_url or not job_id:
-                continue
+        if not final_url or not job_id:
+            continue
 
-            try:
-                response = requests.get(final_url, allow_redirects=True, timeout=10)
+        group = groups.setdefault(canonical_url(final_url), [final_url, []])
+        group[1].append(job_id)
 
-                if response.status_code in [404, 410, 301]:
-                    session.execute(
-                        text(f'DELETE FROM {table} WHERE id = :job_id'),
-                        {'job_id': job_id}
-                    )
-                    session.commit()
-                    link_html_count += 1
-                    continue
+    session = Session
+    report = {"dry_run": dry_run, "deleted": 0, "skipped_time_budget": 0, "samples": []}
+    would_delete_ids = []  # dry run: rows the link checks would delete, left out of the SQL rule counts
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                for script in soup(["script", "style"]):
-                    script.extract()
+    def apply_verdict(final_url, job_ids, expired, detector):
+        if not expired:
+            return
+        if not dry_run:
+            session.execute(
+                text(f'DELETE FROM {table} WHERE id IN :job_ids'),
+                {'job_ids': tuple(job_ids)}
+            )
+            session.commit()
+        else:
+            would_delete_ids.extend(job_ids)
+        report["deleted"] += len(job_ids)
+        if len(report["samples"]) < 20:
+            report["samples"].append((final_url, detector))
 
-                visible_text = soup.get_text(separator=" ", strip=True).lower()
+    try:
+        ends_at = time.monotonic() + time_budget if time_budget is not None else None
+        with run.phase("link_checks"):
+            to_fetch = []
+            for key, (final_url, job_ids) in groups.items():
+                expired = verdicts.get(key)
+                if expired is None:
+                    to_fetch.append((key, final_url, job_ids))
+                else:
+                    run.count_detector("shared_verdict")
+                    apply_verdict(final_url, job_ids, expired, "shared_verdict")
+
+            for key, final_url, job_ids, expired, detector, req_err in iter_posting_verdicts(to_fetch, workers, ends_at):
+                if detector == "time_budget":
+                    report["skipped_time_budget"] += 1
+                    run.unknown_count += 1
+                    continue
 
-                if any(kw in visible_text for kw in keywords):
-                    session.execute(
-                        text(f'DELETE FROM {table} WHERE id = :job_id'),
-                        {'job_id': job_id}
-                    )
-                    session.commit()
-                    link_html_count += 1
+                run.links_checked += 1
+                if req_err is not None:
+                    # Not recorded as a verdict, so a later run (or table) tries the posting again
+                    errors.record(req_err, url=final_url, detector="status_keywords")
+                    run.error_count += 1
+                    run.unknown_count += 1
+                    run.count_detector("error")
+                    continue
 
-            except requests.exceptions.RequestException as req_err:
-                capture_exception(req_err)
-                continue
+                run.count_detector(detector)
+                verdicts[key] = expired
+                apply_verdict(final_url, job_ids, expired, detector)
 
+        link_html_count = report["deleted"]
         logging.debug("Completed deletion of jobs with broken links or expired listings.")
 
-        if job_type == 'internships':
-            del_counts = clean_internships_table()
-        elif job_type == 'entry_level':
-            del_counts = clean_entry_level_table()
-        else:
-            del_counts = {}
+        if dry_run:
+            with run.phase("sql_rules"):
+                report["sql_rule_counts"] = count_sql_rule_deletions(job_type, exclude_ids=would_delete_ids)
+            run.finish()
+            return {**run.as_dict(), **report}
+
+        with run.phase("sql_rules"):
+            if job_type == 'internships':
+                del_counts = clean_internships_table()
+            elif job_type == 'entry_level':
+                del_counts = clean_entry_level_table()
+            else:
+                del_counts = {}
         del_counts['link_html_del_count'] = link_html_count
         total_count = 0
         for label in del_counts:
@@ -631,21 +826,38 @@ def job_cleaning(jobs, table):
 
         final_del_counts = del_counts
 
-        record_jobs_cleaning_hist(final_del_counts, job_type)
+        run.finish()
+        with metrics.phase("history"):
+            record_jobs_cleaning_hist(final_del_counts, job_type, run=run)
 
     except Exception as e:
         session.rollback()
-        capture_exception(e)
+        if dry_run:
+            logging.exception("Dry run of job_cleaning for %s failed", job_type)
+        else:
+            capture_exception(e)
 
     finally:
         session.remove()
+        if owns_errors:
+            errors.flush()
+
+    run.finish()
+    return {**run.as_dict(), **report}
+
+
+# cleaning_run_details column holding the id of the run's history row, per job type
+RUN_DETAILS_HIST_COLUMNS = {'internships': 'internship_hist_id', 'entry_level': 'entry_level_hist_id'}
+
 
-def record_jobs_cleaning_hist(final_del_counts: dict, table):
+def record_jobs_cleaning_hist(final_del_counts: dict, table, run=None):
     """
     Insert a single history row into jobs_cleaning_hist using values from final_del_counts.
 
     :param final_del_counts: Dictionary with deletion counts.
     :param table: Which table to log for - either 'internships' or 'entry_level'
+    :param run: Optional CleaningRun. Its duration, throughput, phase times, error counts and detector mix go into a
+                cleaning_run_details row that references the history row (and is deleted with it).
 
     Maps:
       - time -> NOW() (DB timestamp at insert time)
@@ -655,6 +867,7 @@ def record_jobs_cleaning_hist(final_del_counts: dict, table):
       - and so on
     """
 
+    job_type = table
     if table == 'internships':
         table = internships_cleaning_hist_table
     elif table == 'entry_level':
@@ -681,10 +894,11 @@ def record_jobs_cleaning_hist(final_del_counts: dict, table):
         linkedin_deleted = int(final_del_counts.get('linkedin_del_count', 0))
         indeed_deleted = int(final_del_counts.get('indeed_del_count', 0))
 
-        this_session.execute(
+        hist_id = this_session.execute(
             text(f"""
                 INSERT INTO {table} (time, total_deleted, link_html_deleted, age_deleted, deduplicate_deleted, deletion_condition_deleted, linkedin_deleted, indeed_deleted)
                 VALUES (NOW(), :total_deleted, :link_html_deleted, :age_deleted, :deduplicate_deleted, :deletion_condition_deleted, :linkedin_deleted, :indeed_deleted)
+                RETURNING id
             """),
             {
                 'total_deleted': total_deleted,
@@ -695,7 +909,23 @@ def record_jobs_cleaning_hist(final_del_counts: dict, table):
                 'linkedin_deleted': linkedin_deleted,
                 'indeed_deleted': indeed_deleted
             }
-        )
+        ).scalar()
+
+        if run is not None:
+            details = run.as_dict()
+            this_session.execute(
+                text(f"""
+                    INSERT INTO {cleaning_run_details_table} (time, job_type, {RUN_DETAILS_HIST_COLUMNS[job_type]}, duration_seconds, jobs, links_checked, links_per_second, phase_seconds, error_count, unknown_count, detectors)
+                    VALUES (NOW(), :job_type, :hist_id, :duration_seconds, :jobs, :links_checked, :links_per_second, :phase_seconds, :error_count, :unknown_count, :detectors)
+                """),
+                {
+                    **details,
+                    'job_type': job_type,
+                    'hist_id': hist_id,
+                    'phase_seconds': json.dumps(details['phase_seconds']),
+                    'detectors': json.dumps(details['detectors']),
+                }
+            )
         this_session.commit()
 
     except Exception as e:
@@ -706,6 +936,94 @@ def record_jobs_cleaning_hist(final_del_counts: dict, table):
         this_session.remove()
 
 
+def get_cleaning_trends(table, days=30, baseline_runs=7, slowdown=1.5):
+    """
+    Returns the cleaning runs of the last `days` days for table ('internships' or 'entry_level'), oldest first, with
+    their deletion counts and performance details:
+
+      {"time", "total_deleted", "link_html_deleted", "duration_seconds", "jobs", "links_checked", "links_per_second",
+       "phase_seconds": {phase: seconds}, "error_count", "unknown_count", "detectors": {rule: count},
+       "regressions": [str, ...]}
+
+    "regressions" compares each run with the median of the `baseline_runs` runs before it and lists what got more
+    than `slowdown` times worse (throughput, duration, a phase's time, the error rate), so a slow night shows up in
+    the next morning's numbers instead of weeks later.
+    """
+    if table == 'internships':
+        hist_table = internships_cleaning_hist_table
+    elif table == 'entry_level':
+        hist_table = entry_level_cleaning_hist_table
+    else:
+        return []
+
+    session = Session
+    try:
+        results = session.execute(
+            text(f'''
+                SELECT d.time, h.total_deleted, h.link_html_deleted, d.duration_seconds, d.jobs, d.links_checked,
+                       d.links_per_second, d.phase_seconds, d.error_count, d.unknown_count, d.detectors
+                FROM {cleaning_run_details_table} d
+                LEFT JOIN {hist_table} h ON h.id = d.{RUN_DETAILS_HIST_COLUMNS[table]}
+                WHERE d.job_type = :job_type AND d.time >= NOW() - make_interval(days => :days)
+                ORDER BY d.time
+            '''),
+            {'job_type': table, 'days': days}
+        ).fetchall()
+    except Exception as e:
+        session.rollback()
+        capture_exception(e)
+        return []
+    finally:
+        session.remove()
+
+    runs = []
+    for row in results:
+        runs.append({
+            "time": row[0],
+            "total_deleted": row[1],
+            "link_html_deleted": row[2],
+            "duration_seconds": row[3] or 0.0,
+            "jobs": row[4] or 0,
+            "links_checked": row[5] or 0,
+            "links_per_second": row[6] or 0.0,
+            "phase_seconds": json.loads(row[7]) if row[7] else {},
+            "error_count": row[8] or 0,
+            "unknown_count": row[9] or 0,
+            "detectors": json.loads(row[10]) if row[10] else {},
+        })
+
+    def median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else 0.0
+
+    for i, run in enumerate(runs):
+        baseline = runs[max(0, i - baseline_runs):i]
+        run["regressions"] = []
+        if len(baseline) < 3:
+            continue  # not enough history to judge
+
+        base_lps = median(r["links_per_second"] for r in baseline)
+        if run["links_per_second"] and base_lps and run["links_per_second"] * slowdown < base_lps:
+            run["regressions"].append(f"links/s {run['links_per_second']:.2f} vs median {base_lps:.2f}")
+
+        base_duration = median(r["duration_seconds"] for r in baseline)
+        if base_duration and run["duration_seconds"] > base_duration * slowdown:
+            run["regressions"].append(f"duration {run['duration_seconds']:.0f}s vs median {base_duration:.0f}s")
+
+        for phase_name, seconds in run["phase_seconds"].items():
+            base = median(r["phase_seconds"].get(phase_name, 0.0) for r in baseline)
+            if base >= 1 and seconds > base * slowdown:
+                run["regressions"].append(f"{phase_name} {seconds:.0f}s vs median {base:.0f}s")
+
+        base_error_rate = median(r["error_count"] / r["links_checked"] for r in baseline if r["links_checked"])
+        if run["links_checked"] and base_error_rate:
+            error_rate = run["error_count"] / run["links_checked"]
+            if error_rate > base_error_rate * slowdown:
+                run["regressions"].append(f"error rate {error_rate:.1%} vs median {base_error_rate:.1%}")
+
+    return runs
+
+
 
 def test_check_jobs_for_expiry(jobs):
     """
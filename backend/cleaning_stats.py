@@ -0,0 +1,96 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from backend import metrics
+
+"""
+cleaning_stats.py keeps the throughput numbers of one job_cleaning run: wall time, time per phase, links checked,
+error / unknown counts and which rule decided each link. record_jobs_cleaning_hist() stores them in the
+cleaning_run_details table next to the deletion counts.
+
+Phases nest (dedup runs inside the SQL rules, for example); each phase is booked its own time only, so no second is
+counted twice.
+"""
+
+PHASES = ("link_checks", "sql_rules", "dedup", "linkedin", "indeed")
+
+_local = threading.local()
+
+
+class CleaningRun:
+    def __init__(self, job_type):
+        self.job_type = job_type
+        self.started = time.perf_counter()
+        self.finished = None
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.jobs = 0  # rows handed to job_cleaning
+        self.links_checked = 0  # distinct postings fetched (cached verdicts excluded)
+        self.error_count = 0
+        self.unknown_count = 0  # postings left undecided (kept) this run
+        self.detectors = {}  # rule that decided a posting -> count
+        self._stack = []  # [name, started, seconds spent in nested phases]
+
+    def count_detector(self, detector):
+        self.detectors[detector] = self.detectors.get(detector, 0) + 1
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the block as phase `name` and labels the SQL it runs with it (see metrics.phase).
+        """
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        previous, _local.run = getattr(_local, 'run', None), self
+        try:
+            with metrics.phase(name):
+                yield
+        finally:
+            _local.run = previous
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def links_per_second(self):
+        # Throughput of the checking itself, not of the SQL around it
+        seconds = self.phase_seconds.get("link_checks", 0.0)
+        return self.links_checked / seconds if seconds > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "job_type": self.job_type,
+            "duration_seconds": round(self.duration, 3),
+            "jobs": self.jobs,
+            "links_checked": self.links_checked,
+            "links_per_second": round(self.links_per_second, 3),
+            "phase_seconds": {name: round(seconds, 3) for name, seconds in self.phase_seconds.items()},
+            "error_count": self.error_count,
+            "unknown_count": self.unknown_count,
+            "detectors": dict(self.detectors),
+        }
+
+
+@contextmanager
+def cleaning_phase(name):
+    """
+    Phase of the run active on this thread, if any (for helpers like deduplicate_jobs_in_db that don't get the run
+    passed in); just labels the SQL otherwise.
+    """
+    run = getattr(_local, 'run', None)
+    if run is None:
+        with metrics.phase(name):
+            yield
+        return
+    with run.phase(name):
+        yield
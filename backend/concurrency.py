@@ -0,0 +1,192 @@
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+concurrency.py contains the adaptive (AIMD) concurrency control used by the link checker.
+
+Instead of a hand-tuned max_workers, the number of checks in flight grows by one per window while throughput keeps
+rising and errors/latency stay low, and is cut multiplicatively as soon as latency or the failure rate jumps. Plain
+HTTP checks and Playwright renders each get their own controller since their costs are very different, and a
+controller fed several kinds of work keeps a latency baseline per kind so a slow kind doesn't read as a regression.
+"""
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    :param name: Label used in summaries
+    :param initial: Starting limit
+    :param min_limit: Never go below this
+    :param max_limit: Never go above this (e.g. the thread pool size)
+    :param increase: Added to the limit after a healthy window
+    :param decrease: Multiplier applied after an unhealthy window
+    :param max_error_rate: Failure rate in a window above which the limit backs off
+    :param latency_factor: Back off when a window's average latency for a kind of work exceeds that kind's
+        baseline * latency_factor
+    :param min_window: Minimum completions per evaluation window
+    """
+
+    def __init__(self, name, initial, min_limit, max_limit, increase=1, decrease=0.7, max_error_rate=0.2,
+                 latency_factor=2.0, min_window=5):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.max_error_rate = max_error_rate
+        self.latency_factor = latency_factor
+        self.min_window = min_window
+
+        self.baseline_latency = {}  # kind -> seconds
+        self.prev_throughput = None
+        self.lock = threading.Lock()
+        self._reset_window()
+
+        # [(monotonic time, limit, reason)] every time the limit changes
+        self.history = [(time.monotonic(), int(self.limit), "initial")]
+
+    def _reset_window(self):
+        self.window_started = time.monotonic()
+        self.window_count = 0
+        self.window_failures = 0
+        self.window_latency = {}  # kind -> [total seconds, count]
+
+    @property
+    def value(self):
+        return int(self.limit)
+
+    def record(self, latency, failed, kind="default"):
+        """
+        Records one finished unit of work and re-evaluates the limit once the window is full.
+
+        :param latency: Seconds the work took
+        :param failed: True if it errored or timed out
+        :param kind: Class of work, compared only against its own latency baseline
+        """
+        with self.lock:
+            self.window_count += 1
+            totals = self.window_latency.setdefault(kind, [0.0, 0])
+            totals[0] += latency
+            totals[1] += 1
+            if failed:
+                self.window_failures += 1
+
+            if self.window_count >= max(self.min_window, int(self.limit)):
+                self._evaluate()
+
+    def _evaluate(self):
+        duration = max(time.monotonic() - self.window_started, 1e-6)
+        throughput = self.window_count / duration
+        error_rate = self.window_failures / self.window_count
+        avg_latency = {kind: total / count for kind, (total, count) in self.window_latency.items()}
+        old = int(self.limit)
+
+        for kind, avg in avg_latency.items():
+            if kind not in self.baseline_latency or avg < self.baseline_latency[kind]:
+                self.baseline_latency[kind] = avg
+        slow = [
+            kind for kind, avg in avg_latency.items() if avg > self.baseline_latency[kind] * self.latency_factor
+        ]
+
+        if error_rate > self.max_error_rate:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            reason = f"errors {error_rate:.0%}"
+        elif slow:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            reason = "latency " + ", ".join(
+                f"{kind} {avg_latency[kind]:.2f}s vs {self.baseline_latency[kind]:.2f}s" for kind in slow
+            )
+        elif self.prev_throughput is None or throughput >= self.prev_throughput * 0.95:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+            reason = f"throughput {throughput:.2f}/s"
+        else:
+            reason = None  # throughput dipped without errors: hold
+
+        # Let the baselines drift up slowly so one lucky window doesn't pin them forever
+        for kind, avg in avg_latency.items():
+            self.baseline_latency[kind] = self.baseline_latency[kind] * 0.9 + avg * 0.1
+        self.prev_throughput = throughput
+        self._reset_window()
+
+        if reason and int(self.limit) != old:
+            self.history.append((time.monotonic(), int(self.limit), reason))
+
+    def timeline(self, since=None, max_points=20):
+        """
+        Returns [(seconds since `since`, limit, reason)] for limit changes after `since` (monotonic), thinned to at
+        most max_points entries (the last change is always kept).
+        """
+        with self.lock:
+            points = [p for p in self.history if since is None or p[0] >= since]
+
+        if not points:
+            return []
+        start = since if since is not None else points[0][0]
+
+        if len(points) > max_points:
+            step = len(points) / (max_points - 1)
+            points = [points[int(i * step)] for i in range(max_points - 1)] + [points[-1]]
+
+        return [(t - start, limit, reason) for t, limit, reason in points]
+
+
+class AdaptiveLimiter:
+    """
+    Semaphore whose size follows an AIMDController.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.in_use = 0
+        self.cond = threading.Condition()
+        self.waits = threading.local()
+
+    def acquire(self):
+        start = time.monotonic()
+        with self.cond:
+            while self.in_use >= self.controller.value:
+                self.cond.wait(timeout=1.0)
+            self.in_use += 1
+        self.waits.seconds = getattr(self.waits, "seconds", 0.0) + time.monotonic() - start
+
+    def take_wait(self):
+        """
+        Returns the seconds the calling thread spent waiting for a slot since its last call, and resets it. Lets an
+        outer controller leave this limiter's queueing out of its own latency.
+        """
+        seconds = getattr(self.waits, "seconds", 0.0)
+        self.waits.seconds = 0.0
+        return seconds
+
+    def release(self, latency, failed, record=True):
+        if record:
+            self.controller.record(latency, failed)
+        with self.cond:
+            self.in_use -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds one slot for the duration of the block and records its latency. Set `slot.failed = True` inside the
+        block to count it as a failure (exceptions count automatically), or `slot.record = False` if the work was
+        skipped and shouldn't be recorded at all.
+        """
+        self.acquire()
+        slot = _Slot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except Exception:
+            slot.failed = True
+            raise
+        finally:
+            self.release(time.monotonic() - start, slot.failed, slot.record)
+
+
+class _Slot:
+    failed = False
+    record = True
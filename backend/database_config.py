@@ -1,7 +1,9 @@
 import os
+import threading
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
+from backend import metrics
 from backend.tables import sessions_table, sessions_data_table
 
 """
@@ -10,6 +12,9 @@ Session that can be used to query and make changes to teh database. This Session
 Any function to do with the sessions table should be in this file.
 
 Any new functions or updates to the database or sessions table should be added here.
+
+The engine is created on first use rather than at import, so a gunicorn master running with --preload never opens
+a connection that its forked workers would then share. dispose_engine() drops any pooled connections after a fork.
 """
 
 sessions_name = sessions_table
@@ -19,8 +24,42 @@ load_dotenv()
 
 # Initialize database connection to postgress database in heroku
 DATABASE_URL = os.getenv('SQL_DATABASE_URL')
-engine = create_engine(DATABASE_URL, pool_size=30, max_overflow=35, pool_pre_ping=True)
 # IMPORTANT: READ
 # (Optional): Replace DATABASE_URL with 'sqlite:////tmp/session.db' when running locally to save money and data space
 # BEFORE PUSHING - MAKE SURE TO USE SQL_ DATABASE_URL
-Session = scoped_session(sessionmaker(bind=engine))
\ No newline at end of file
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Returns the process-wide engine, creating it on first call.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(DATABASE_URL, pool_size=30, max_overflow=35, pool_pre_ping=True)
+                metrics.instrument_engine(engine)  # statement times per cleaning phase
+                _engine = engine
+    return _engine
+
+
+def dispose_engine():
+    """
+    Forgets connections inherited from a parent process (call in a worker right after fork). The parent's sockets
+    are left open for the parent; this process opens its own on next use.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
+def __getattr__(name):
+    # Keeps `from backend.database_config import engine` working without creating the engine at import
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_session_factory = sessionmaker()
+Session = scoped_session(lambda: _session_factory(bind=get_engine()))
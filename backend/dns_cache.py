@@ -0,0 +1,162 @@
+import socket
+import ssl
+import threading
+import time
+
+from backend import stage_timings
+
+"""
+dns_cache.py contains the shared resolver cache and the dead-host negative cache used by the link checker.
+
+Tens of thousands of checks go to a few hundred hosts, so getaddrinfo() results are cached for a TTL instead of being
+re-resolved for every new connection. Only the link checker's own connections use the cache (http_client's connection
+classes resolve through it); socket.getaddrinfo itself is left alone for the rest of the process. Hosts that fail with
+NXDOMAIN, connection refused or a TLS error are remembered as dead, so every remaining link on that host gets an
+immediate answer instead of waiting for its own connect timeout. Temporary resolver failures (EAI_AGAIN) are neither
+cached nor counted as dead.
+"""
+
+DNS_TTL = 300
+DNS_NEGATIVE_TTL = 600
+DEAD_HOST_TTL = 900
+
+# getaddrinfo errors that mean the name doesn't exist (as opposed to the resolver being unreachable / overloaded)
+NXDOMAIN_ERRNOS = (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME))
+
+
+class DNSCache:
+    """
+    TTL cache in front of socket.getaddrinfo. NXDOMAIN answers are cached too (for negative_ttl).
+    """
+
+    def __init__(self, ttl=DNS_TTL, negative_ttl=DNS_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = {}  # key -> (expires_at, result or gaierror)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        started = time.perf_counter()
+        try:
+            return self._getaddrinfo(host, port, family, type, proto, flags)
+        finally:
+            stage_timings.add("dns", time.perf_counter() - started)
+
+    def _getaddrinfo(self, host, port, family, type, proto, flags):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                if isinstance(entry[1], socket.gaierror):
+                    raise entry[1]
+                return list(entry[1])
+            self.misses += 1
+
+        try:
+            result = socket.getaddrinfo(host, port, family, type, proto, flags)
+        except socket.gaierror as e:
+            if e.errno in NXDOMAIN_ERRNOS:
+                with self.lock:
+                    self.entries[key] = (now + self.negative_ttl, e)
+            raise
+
+        with self.lock:
+            self.entries[key] = (now + self.ttl, result)
+        return list(result)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class DeadHosts:
+    """
+    Negative cache of hosts that are known to be unreachable.
+    """
+
+    def __init__(self, ttl=DEAD_HOST_TTL):
+        self.ttl = ttl
+        self.hosts = {}  # host -> (expires_at, reason)
+        self.lock = threading.Lock()
+        self.short_circuited = 0
+
+    def mark(self, host, reason):
+        if not host:
+            return
+        with self.lock:
+            self.hosts[host.lower()] = (time.monotonic() + self.ttl, reason)
+
+    def is_dead(self, host):
+        """
+        Returns the reason the host was marked dead, or None if it isn't (or the entry expired).
+        """
+        if not host:
+            return None
+        with self.lock:
+            entry = self.hosts.get(host.lower())
+            if not entry:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.hosts[host.lower()]
+                return None
+            self.short_circuited += 1
+            return entry[1]
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            return {host: reason for host, (expires, reason) in self.hosts.items() if expires > now}
+
+
+def _walk_exception(exc):
+    """
+    Yields exc and everything it wraps (__cause__, __context__, urllib3's .reason, exceptions passed in args).
+    requests hides the underlying socket error a few levels down.
+    """
+    seen = set()
+    stack = [exc]
+    while stack:
+        e = stack.pop()
+        if e is None or id(e) in seen or not isinstance(e, BaseException):
+            continue
+        seen.add(id(e))
+        yield e
+        stack.append(e.__cause__)
+        stack.append(e.__context__)
+        stack.append(getattr(e, 'reason', None))
+        stack.extend(a for a in e.args if isinstance(a, BaseException))
+
+
+def dead_host_reason(exc):
+    """
+    Returns a short reason if exc means the host itself is dead (NXDOMAIN, connection refused, TLS failure),
+    or None for errors that say nothing about the host (timeouts, resets, temporary DNS failures, HTTP errors).
+    """
+    for e in _walk_exception(exc):
+        name = type(e).__name__
+        if isinstance(e, socket.gaierror):
+            if e.errno in NXDOMAIN_ERRNOS:
+                return "NXDOMAIN"
+            continue
+        if isinstance(e, ConnectionRefusedError):
+            return "connection refused"
+        if isinstance(e, ssl.SSLError) or name == 'SSLError':
+            return "TLS failure"
+
+    return None
+
+
+def is_temporary_dns_failure(exc):
+    """
+    True if exc comes from a resolver that couldn't answer right now (EAI_AGAIN), which is worth one retry.
+    """
+    return any(isinstance(e, socket.gaierror) and e.errno == socket.EAI_AGAIN for e in _walk_exception(exc))
+
+
+dns_cache = DNSCache()
+dead_hosts = DeadHosts()
@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+"""
+error_aggregator.py buckets expected, per-link failures (timeouts, connection errors, ...) instead of sending each one
+to Sentry from the hot loop.
+
+Failures are counted per (exception type, host, detector) with a few sample URLs and the first message seen. flush()
+logs a compact summary and, optionally, sends it to Sentry as a single event, so a night with thousands of timeouts
+costs one event instead of thousands. With flush_interval set, record() also flushes on its own every that many
+seconds, so a long run reports before it ends.
+"""
+
+ERROR_FLUSH_TO_SENTRY = os.getenv('ERROR_FLUSH_TO_SENTRY', '1') != '0'
+MAX_BUCKETS = 500  # past this, new buckets are counted under ("other", "other", "other")
+MAX_SAMPLES = 3
+SUMMARY_ROWS = 25  # buckets listed in the logged summary / Sentry event
+
+
+def _host(url):
+    host = (urlparse(url).hostname or "") if url else ""
+    return host.removeprefix("www.") or "unknown"
+
+
+def _rows(buckets):
+    rows = [
+        {"error": error, "host": host, "detector": detector, **bucket, "samples": list(bucket["samples"])}
+        for (error, host, detector), bucket in buckets.items()
+    ]
+    rows.sort(key=lambda r: r["count"], reverse=True)
+    return rows
+
+
+class ErrorAggregator:
+    """
+    :param name: What the errors came from (e.g. "job_cleaning"), used in the summary
+    :param flush_interval: Seconds between automatic flushes from record(), or None to flush only when asked
+    :param to_sentry: Send each non-empty flush to Sentry as one event
+    """
+
+    def __init__(self, name, flush_interval=None, to_sentry=ERROR_FLUSH_TO_SENTRY):
+        self.name = name
+        self.flush_interval = flush_interval
+        self.to_sentry = to_sentry
+        self.lock = threading.Lock()
+        self.buckets = {}  # (error, host, detector) -> {"count", "message", "samples", "first_seen", "last_seen"}
+        self.total = 0
+        self.last_flush = time.monotonic()
+
+    def record(self, exc, url=None, detector=None):
+        key = (type(exc).__name__, _host(url), detector or "unknown")
+        now = time.time()
+
+        with self.lock:
+            if key not in self.buckets and len(self.buckets) >= MAX_BUCKETS:
+                key = ("other", "other", "other")
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = {
+                    "count": 0, "message": str(exc)[:300], "samples": [], "first_seen": now, "last_seen": now,
+                }
+            bucket["count"] += 1
+            bucket["last_seen"] = now
+            if url and len(bucket["samples"]) < MAX_SAMPLES and url not in bucket["samples"]:
+                bucket["samples"].append(url)
+            self.total += 1
+
+            # Claim the flush under the lock so only one of the threads crossing the interval starts it
+            due = self.flush_interval is not None and time.monotonic() - self.last_flush > self.flush_interval
+            if due:
+                self.last_flush = time.monotonic()
+
+        if due:
+            self.flush()
+
+    def summary(self):
+        """
+        Rows sorted by count: {"error", "host", "detector", "count", "message", "samples", "first_seen", "last_seen"}.
+        """
+        with self.lock:
+            return _rows(self.buckets)
+
+    def flush(self):
+        """
+        Logs (and optionally sends to Sentry) what was recorded since the last flush, then starts over. Returns the
+        rows that were flushed.
+        """
+        # Swap the buckets and total out together so an error recorded meanwhile lands in the next flush, not nowhere
+        with self.lock:
+            buckets, self.buckets = self.buckets, {}
+            total, self.total = self.total, 0
+            self.last_flush = time.monotonic()
+        rows = _rows(buckets)
+
+        if not rows:
+            return rows
+
+        by_error = {}
+        for row in rows:
+            by_error[row["error"]] = by_error.get(row["error"], 0) + row["count"]
+
+        headline = f"{self.name}: {total} errors in {len(rows)} buckets (" + ", ".join(
+            f"{error}={count}" for error, count in sorted(by_error.items(), key=lambda kv: -kv[1])
+        ) + ")"
+        lines = [headline] + [
+            f"  {r['count']:>6d}  {r['error']:24s} {r['host'][:40]:40s} {r['detector']:16s} e.g. {r['samples'][:1]}"
+            for r in rows[:SUMMARY_ROWS]
+        ]
+        logging.warning("\n".join(lines))
+
+        if self.to_sentry:
+            self._send_to_sentry(headline, rows, by_error)
+        return rows
+
+    def _send_to_sentry(self, headline, rows, by_error):
+        try:
+            import sentry_sdk
+        except ImportError:
+            return
+
+        with sentry_sdk.new_scope() as scope:
+            scope.fingerprint = ["error-aggregate", self.name]  # one issue per source, not per night
+            scope.set_context("errors_by_type", by_error)
+            scope.set_context("error_buckets", {
+                f"{i:02d} {r['error']} {r['host']} {r['detector']}": {
+                    "count": r["count"], "message": r["message"], "samples": r["samples"],
+                }
+                for i, r in enumerate(rows[:SUMMARY_ROWS])
+            })
+            sentry_sdk.capture_message(headline, level="warning")
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import Counter, deque
+
+"""
+host_scheduler.py contains the work scheduler used by the parallel link checker.
+
+Links come out of the database clustered by source, so submitting them in order sends every worker to the same host
+at once. The scheduler keeps one queue per host and hands out work round-robin across hosts, never letting more than
+`per_host_cap` checks for one host be in flight. Work that can't start yet (its host is rate limited) is handed back
+with defer() and the host sits out of the rotation until it may be tried again.
+"""
+
+
+class HostScheduler:
+    """
+    Round-robin scheduler over per-host queues.
+
+    :param items: Iterable of (idx, url) tuples
+    :param key: Function mapping a url to its host key (e.g. extract_base_domain)
+    :param per_host_cap: Max items handed out for one host that haven't been marked done yet
+    """
+
+    def __init__(self, items, key, per_host_cap=5):
+        self.per_host_cap = per_host_cap
+        self.queues = {}
+        self.ring = deque()
+        self.in_flight = Counter()
+        self.not_before = {}  # host -> monotonic time it may be handed out again (see defer)
+        self.lock = threading.Lock()
+        self.remaining = 0
+
+        for idx, url in items:
+            host = key(url)
+            if host not in self.queues:
+                self.queues[host] = deque()
+                self.ring.append(host)
+            self.queues[host].append((idx, url))
+            self.remaining += 1
+
+    def next(self):
+        """
+        Returns the next (host, idx, url) to run, or None if every host with queued work is at its in-flight cap or
+        deferred (or nothing is left).
+        """
+        now = time.monotonic()
+        with self.lock:
+            for _ in range(len(self.ring)):
+                host = self.ring[0]
+                self.ring.rotate(-1)
+
+                queue = self.queues[host]
+                if not queue:
+                    continue
+                if self.in_flight[host] >= self.per_host_cap:
+                    continue
+                if self.not_before.get(host, 0.0) > now:
+                    continue
+
+                idx, url = queue.popleft()
+                self.in_flight[host] += 1
+                self.remaining -= 1
+
+                if not queue:
+                    # Drop exhausted hosts so the ring only holds hosts with work left
+                    self.ring.remove(host)
+                    del self.queues[host]
+
+                return host, idx, url
+
+            return None
+
+    def done(self, host):
+        """
+        Marks one item for host as finished, freeing an in-flight slot.
+        """
+        with self.lock:
+            self.in_flight[host] -= 1
+            if self.in_flight[host] <= 0:
+                del self.in_flight[host]
+
+    def defer(self, host, idx, url, seconds):
+        """
+        Hands back an item next() returned without running it: it goes to the front of its host's queue, its
+        in-flight slot is freed, and the host isn't handed out again for `seconds`.
+        """
+        with self.lock:
+            self.in_flight[host] -= 1
+            if self.in_flight[host] <= 0:
+                del self.in_flight[host]
+
+            if host not in self.queues:
+                self.queues[host] = deque()
+                self.ring.append(host)
+            self.queues[host].appendleft((idx, url))
+            self.remaining += 1
+            self.not_before[host] = time.monotonic() + seconds
+
+    def ready_in(self):
+        """
+        Seconds until the next deferred host with queued work may be handed out again, or None if no queued host is
+        being held back.
+        """
+        now = time.monotonic()
+        with self.lock:
+            waits = [self.not_before[host] - now for host in self.ring if self.not_before.get(host, 0.0) > now]
+        return min(waits) if waits else None
+
+    def drain(self):
+        """
+        Removes and returns every queued (idx, url) that was never handed out.
+        """
+        with self.lock:
+            out = [item for host in self.ring for item in self.queues[host]]
+            self.queues.clear()
+            self.ring.clear()
+            self.not_before.clear()
+            self.remaining = 0
+            return out
+
+    def __len__(self):
+        return self.remaining
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from collections import Counter
+
+"""
+host_throttle.py contains the per-host rate limiting and circuit breaking used by the parallel link checker.
+
+Every hostname (e.g. acme.wd5.myworkdayjobs.com, not the whole ATS) gets its own token bucket so a burst of checks
+against one board can't trigger throttling, and its own circuit breaker so a host that keeps failing or timing out stops
+eating workers for a full timeout on every queued link, without taking the ATS's other tenants down with it.
+"""
+
+HOST_RATE = float(os.getenv('LINK_CHECK_HOST_RATE', '2'))  # requests/sec per hostname
+HOST_BURST = int(os.getenv('LINK_CHECK_HOST_BURST', '5'))
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# HostGuard.acquire() outcomes
+ALLOWED = "allowed"
+CIRCUIT_OPEN = "circuit_open"
+RATE_LIMITED = "rate_limited"
+
+
+class TokenBucket:
+    """
+    Simple thread-safe token bucket. Tokens refill continuously at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def try_acquire(self):
+        """
+        Takes one token if one is available, without waiting.
+
+        :return: 0.0 if a token was taken, otherwise the seconds until the next one is available
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures/timeouts. While open, calls are rejected until `cooldown`
+    seconds have passed, then a single trial call is let through (half open). A success closes the breaker again, a
+    failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=120):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns True if a call may go through right now.
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record(self, failed):
+        """
+        Records the outcome of a call that was allowed through.
+
+        :param failed: True if the call failed or timed out
+        """
+        with self.lock:
+            if failed:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                    if self.state != OPEN:
+                        self.times_opened += 1
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+            else:
+                self.successes += 1
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                self.trial_in_flight = False
+
+
+class HostGuard:
+    """
+    Registry of a token bucket and a circuit breaker per host. Key it on the hostname (urlparse(url).hostname): the
+    base domain would put every tenant of an ATS behind one bucket and one breaker.
+
+    :param rate: Requests per second allowed per host
+    :param burst: Token bucket capacity per host
+    :param failure_threshold: Consecutive failures before a host's breaker opens
+    :param cooldown: Seconds a breaker stays open before a trial request is allowed
+    """
+
+    def __init__(self, rate=HOST_RATE, burst=HOST_BURST, failure_threshold=5, cooldown=120):
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.buckets = {}
+        self.breakers = {}
+        self.rate_limited = Counter()  # host -> times a check had to wait for a token
+        self.lock = threading.Lock()
+
+    def _get(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            return self.buckets[host], self.breakers[host]
+
+    def acquire(self, host):
+        """
+        Checks the host's breaker and takes a rate-limit token, without waiting for one.
+
+        :return: (outcome, detail): (ALLOWED, None); (CIRCUIT_OPEN, reason) when the breaker rejects the call; or
+                 (RATE_LIMITED, seconds until a token is available), in which case the caller should retry later
+        """
+        bucket, breaker = self._get(host)
+
+        if not breaker.allow():
+            return CIRCUIT_OPEN, f"Circuit open for {host}: link deferred after repeated failures/timeouts"
+
+        wait = bucket.try_acquire()
+        if wait:
+            # Give back the half-open trial slot, we never made the call
+            with breaker.lock:
+                breaker.trial_in_flight = False
+            with self.lock:
+                self.rate_limited[host] += 1
+            return RATE_LIMITED, wait
+
+        return ALLOWED, None
+
+    def record(self, host, failed):
+        _, breaker = self._get(host)
+        breaker.record(failed)
+
+    def summary(self):
+        """
+        Returns {host: {...breaker stats, "rate_limited"...}} for every host whose breaker has opened or rejected
+        calls, or whose checks had to wait for a rate-limit token.
+        """
+        with self.lock:
+            items = list(self.breakers.items())
+            rate_limited = dict(self.rate_limited)
+
+        out = {}
+        for host, b in items:
+            if b.times_opened or b.rejected or b.state != CLOSED or rate_limited.get(host):
+                out[host] = {
+                    "state": b.state,
+                    "times_opened": b.times_opened,
+                    "rejected": b.rejected,
+                    "rate_limited": rate_limited.get(host, 0),
+                    "successes": b.successes,
+                    "failures": b.failures,
+                }
+        return out
+
+
+def is_failed_check(res):
+    """
+    Returns True if a check_single_link result came from an error or timeout rather than a real answer from the host.
+    Detectors report errors as "unknown" with an "Error in ..." / "timed out" reason, which check_single_link turns
+    into a KEEP, so the reason text is what tells them apart.
+    """
+    if not res:
+        return True
+
+    if (res.get("used") or "") == "error_handling":
+        return True
+
+    reason = (res.get("reason") or "").lower()
+    return reason.startswith("error") or "error in " in reason or "timed out" in reason or "timeout" in reason
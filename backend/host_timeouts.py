@@ -0,0 +1,248 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+"""
+host_timeouts.py keeps streaming latency histograms per source domain and turns them into per-host timeouts.
+
+Most ATS hosts answer in 1-2s, so instead of giving every request the same 60s, each host gets connect/read timeouts
+of its observed p99 plus headroom, capped by a global ceiling. Histograms are saved to the link_latency_histograms
+table so the next run starts from what the last one learned (Heroku Scheduler starts every run on a fresh dyno, so a
+local file wouldn't survive). Set LINK_CHECK_LATENCY_PATH to keep them in a JSON file instead, e.g. for the offline
+benchmarks or a run without a database.
+"""
+
+LATENCY_PATH = os.getenv('LINK_CHECK_LATENCY_PATH')
+TIMEOUT_CEILING = float(os.getenv('LINK_CHECK_TIMEOUT_CEILING', '60'))
+
+HEADROOM = 2.0  # multiplier applied to the p99
+PAD = 1.0  # seconds added on top of p99 * HEADROOM
+MIN_CONNECT = 3.0
+MIN_READ = 5.0
+MIN_RENDER = 10.0
+MIN_SAMPLES = 20  # below this a host keeps the caller's timeout
+MAX_SAMPLES = 5000  # counts are halved past this so old behaviour fades out
+AUTOSAVE_SECONDS = 300
+
+# Log-spaced bucket upper bounds from 10ms to ~150s (25% apart)
+BUCKETS = [0.01 * (1.25 ** i) for i in range(44)]
+
+
+class LatencyHistogram:
+    """
+    Fixed log-bucket histogram. Cheap to update, mergeable and small enough to persist per host.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts and len(counts) == len(BUCKETS) + 1 else [0] * (len(BUCKETS) + 1)
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def observe(self, seconds):
+        if seconds <= 0:
+            idx = 0
+        else:
+            idx = int(math.ceil(math.log(seconds / BUCKETS[0], 1.25))) if seconds > BUCKETS[0] else 0
+            idx = min(max(idx, 0), len(BUCKETS))
+        self.counts[idx] += 1
+
+        if self.total > MAX_SAMPLES:
+            self.counts = [c // 2 for c in self.counts]
+
+    def quantile(self, q):
+        """
+        Returns the bucket upper bound that covers the q-th quantile (None when empty).
+        """
+        total = self.total
+        if not total:
+            return None
+
+        target = q * total
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1] * 1.25
+        return BUCKETS[-1] * 1.25
+
+
+class HostTimeouts:
+    """
+    Per-host latency histograms ("http" for plain requests, "render" for Playwright) and the timeouts derived from
+    them. Thread safe; one module-level instance is shared by every detector.
+    """
+
+    def __init__(self, path=LATENCY_PATH, ceiling=TIMEOUT_CEILING):
+        self.path = path  # None: stored in the database
+        self.ceiling = ceiling
+        self.hists = {}
+        self.dirty = set()  # (host, kind) changed since the last save
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.last_save = time.monotonic()
+
+    def _hist(self, host, kind):
+        if not self.loaded:
+            self.load()
+        with self.lock:
+            key = (host or "unknown", kind)
+            if key not in self.hists:
+                self.hists[key] = LatencyHistogram()
+            return self.hists[key]
+
+    def observe(self, host, seconds, kind="http"):
+        hist = self._hist(host, kind)
+        with self.lock:
+            hist.observe(seconds)
+            self.dirty.add((host or "unknown", kind))
+
+        if time.monotonic() - self.last_save > AUTOSAVE_SECONDS:
+            self.save()
+
+    def p99(self, host, kind="http"):
+        hist = self._hist(host, kind)
+        with self.lock:
+            if hist.total < MIN_SAMPLES:
+                return None
+            return hist.quantile(0.99)
+
+    def timeout_for(self, host, timeout=60):
+        """
+        Returns (connect, read) timeouts in seconds for a plain HTTP request to host.
+
+        :param timeout: The caller's timeout, used as-is until the host has enough samples and never exceeded
+        """
+        cap = min(float(timeout), self.ceiling)
+        p99 = self.p99(host, "http")
+        if p99 is None:
+            return min(cap, max(MIN_CONNECT, cap / 3)), cap
+
+        budget = p99 * HEADROOM + PAD
+        return min(cap, max(MIN_CONNECT, budget)), min(cap, max(MIN_READ, budget))
+
+    def render_timeout_ms(self, host, timeout=60):
+        """
+        Returns the Playwright navigation timeout in ms for host.
+        """
+        cap = min(float(timeout), self.ceiling)
+        p99 = self.p99(host, "render")
+        if p99 is None:
+            return int(cap * 1000)
+
+        return int(min(cap, max(MIN_RENDER, p99 * HEADROOM + PAD)) * 1000)
+
+    def load(self):
+        """
+        Loads persisted histograms (a missing / corrupt file or an unreachable database just means starting empty).
+        """
+        data = {}
+        try:
+            data = self._read_file() if self.path else self._read_db()
+        except Exception as e:
+            logging.warning(f"Could not load link latency histograms: {type(e).__name__}: {e}")
+
+        with self.lock:
+            for host, kinds in (data or {}).items():
+                for kind, counts in (kinds or {}).items():
+                    self.hists.setdefault((host, kind), LatencyHistogram(counts))
+            self.loaded = True
+
+    def save(self):
+        """
+        Writes the histograms out: every one to the JSON file, or the ones that changed since the last save to the
+        database.
+        """
+        with self.lock:
+            if self.path:
+                keys = list(self.hists)
+            else:
+                keys = [key for key in self.dirty if key in self.hists]
+            data = {}
+            for host, kind in keys:
+                data.setdefault(host, {})[kind] = list(self.hists[(host, kind)].counts)
+            self.dirty.clear()
+            self.last_save = time.monotonic()
+
+        if not data:
+            return
+        try:
+            if self.path:
+                self._write_file(data)
+            else:
+                self._write_db(data)
+        except Exception as e:
+            logging.warning(f"Could not save link latency histograms: {type(e).__name__}: {e}")
+            with self.lock:
+                self.dirty.update((host, kind) for host, kinds in data.items() for kind in kinds)
+
+    def _read_file(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_file(self, data):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _read_db(self):
+        from sqlalchemy import text
+        from backend.database_config import Session
+        from backend.tables import link_latency_table
+
+        session = Session
+        try:
+            rows = session.execute(text(f"SELECT host, kind, counts FROM {link_latency_table}")).fetchall()
+        finally:
+            session.remove()
+
+        data = {}
+        for host, kind, counts in rows:
+            data.setdefault(host, {})[kind] = json.loads(counts)
+        return data
+
+    def _write_db(self, data):
+        from sqlalchemy import text
+        from backend.database_config import Session
+        from backend.tables import link_latency_table
+
+        session = Session
+        try:
+            session.execute(
+                text(f'''
+                    INSERT INTO {link_latency_table} (host, kind, counts, updated_at)
+                    VALUES (:host, :kind, :counts, NOW())
+                    ON CONFLICT (host, kind) DO UPDATE SET counts = EXCLUDED.counts, updated_at = EXCLUDED.updated_at
+                '''),
+                [
+                    {'host': host, 'kind': kind, 'counts': json.dumps(counts)}
+                    for host, kinds in data.items() for kind, counts in kinds.items()
+                ]
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.remove()
+
+    def summary(self, top_n=10):
+        """
+        Returns [(host, samples, p99, (connect, read))] for the hosts with the most samples.
+        """
+        with self.lock:
+            items = [(host, hist.total) for (host, kind), hist in self.hists.items() if kind == "http"]
+
+        items.sort(key=lambda x: x[1], reverse=True)
+        return [(host, n, self.p99(host), self.timeout_for(host, self.ceiling)) for host, n in items[:top_n]]
+
+
+host_timeouts = HostTimeouts()
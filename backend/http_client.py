@@ -0,0 +1,196 @@
+import os
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from backend import stage_timings
+from backend.dns_cache import dns_cache
+
+"""
+http_client.py contains the shared, connection-pooling HTTP client used by every link detector.
+
+All detectors used to call module-level requests.get(), which builds a throwaway Session (and a new TCP+TLS
+connection) per call, so the Workday check, the status check and the request-text check for one URL each paid for
+their own handshake. Here one HTTPAdapter (urllib3 pool manager, thread safe) is shared by the whole process and
+mounted into a lightweight per-thread Session, so keep-alive connections are reused across detectors and threads.
+New connections resolve their host through the shared DNS cache (see dns_cache).
+"""
+
+# Resolve through dns_cache (set LINK_CHECK_DNS_CACHE=0 to use the system resolver on every connection)
+DNS_CACHE = os.getenv('LINK_CHECK_DNS_CACHE', '1') != '0'
+
+# Headers every detector sends
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "text/html",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# How many hosts keep a pool, and how many idle keep-alive connections each host's pool may hold
+POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '500'))
+POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '10'))
+
+# Per-host overrides, e.g. HTTP_POOL_SIZES="myworkdayjobs.com=20,greenhouse.io=15" (matched on the hostname suffix)
+POOL_SIZES = {
+    host.strip().lower(): int(size)
+    for host, _, size in (item.partition("=") for item in os.getenv('HTTP_POOL_SIZES', '').split(",") if "=" in item)
+}
+
+
+def _timed_connect(connect):
+    # Books TCP (+ TLS) setup time as "connect", net of the DNS lookup it includes (booked as "dns" by dns_cache)
+    def timed(self):
+        recorder = stage_timings.current()
+        if recorder is None:
+            return connect(self)
+        dns_before = recorder.seconds.get("dns", 0.0)
+        started = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            dns_spent = recorder.seconds.get("dns", 0.0) - dns_before
+            recorder.add("connect", time.perf_counter() - started - dns_spent)
+    return timed
+
+
+def _cached_new_conn(new_conn):
+    # Resolves the host through dns_cache, then lets urllib3 connect to each address in turn (as its
+    # create_connection would). _dns_host is only swapped for the socket connect; TLS still uses the hostname.
+    def cached(self):
+        if not DNS_CACHE:
+            return new_conn(self)
+        host = self._dns_host
+        try:
+            addresses = dns_cache.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+
+        error = NewConnectionError(self, f"Failed to establish a new connection: no addresses for {host}")
+        for *_, sockaddr in addresses:
+            self._dns_host = sockaddr[0]
+            try:
+                return new_conn(self)
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+    return cached
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    _new_conn = _cached_new_conn(HTTPConnection._new_conn)
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    _new_conn = _cached_new_conn(HTTPSConnection._new_conn)
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose per-host pool size can be overridden (busy ATS hosts get more keep-alive connections), and
+    whose connections resolve through dns_cache and report their setup time to stage_timings.
+    """
+
+    def __init__(self, pool_sizes=None, **kwargs):
+        self.pool_sizes = pool_sizes or {}
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        hostname = (host_params.get("host") or "").lower()
+        for suffix, size in self.pool_sizes.items():
+            if hostname == suffix or hostname.endswith("." + suffix):
+                pool_kwargs["maxsize"] = size
+                break
+        return host_params, pool_kwargs
+
+
+_adapter = PooledAdapter(
+    pool_sizes=POOL_SIZES,
+    pool_connections=POOL_HOSTS,
+    pool_maxsize=POOL_PER_HOST,
+    pool_block=False,
+    max_retries=0,
+)
+_local = threading.local()
+
+
+def get_session():
+    """
+    Returns this thread's Session. Sessions share the process-wide adapter (and so its connection pools), but each
+    thread gets its own cookie jar and settings, since requests.Session itself isn't thread safe.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    if session.adapters.get("https://") is not _adapter:  # first use, or set_adapter() swapped it
+        session.mount("http://", _adapter)
+        session.mount("https://", _adapter)
+    return session
+
+
+def get_adapter():
+    return _adapter
+
+
+def set_adapter(adapter):
+    """
+    Replaces the process-wide adapter every detector request goes through (used by the record/replay tooling in
+    benchmarks/ to capture or serve responses). Returns the previous adapter so it can be restored.
+    """
+    global _adapter
+    previous, _adapter = _adapter, adapter
+    return previous
+
+
+def get(url, headers=None, default_headers=True, **kwargs):
+    """
+    Drop-in for requests.get() over the pooled connections.
+
+    Cookies are cleared before every call so one job's cookies never leak into the next check (module-level
+    requests.get() started each call with an empty jar too); cookies set during a redirect chain still apply.
+
+    :param headers: Extra headers, merged over DEFAULT_HEADERS
+    :param default_headers: Send DEFAULT_HEADERS (False sends only requests' own defaults, like a bare requests.get)
+    """
+    session = get_session()
+    session.cookies.clear()
+
+    merged = dict(DEFAULT_HEADERS) if default_headers else {}
+    if headers:
+        merged.update(headers)
+
+    return session.get(url, headers=merged or None, **kwargs)
+
+
+def close():
+    """
+    Closes every pooled connection (e.g. after fork, or at the end of a run).
+    """
+    _adapter.close()
@@ -3,8 +3,10 @@ import json
 import os
 import re
 import threading
+import time
 from collections import Counter, defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timezone
 from html import unescape
 from urllib.parse import urlparse, parse_qs, unquote
@@ -14,10 +16,66 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
 from sqlalchemy import text
 
+from backend.concurrency import AIMDController, AdaptiveLimiter
 from backend.database_config import Session
+from backend import browser_pool, dns_cache, http_client, metrics, stage_timings
+from backend.dns_cache import dead_hosts, dead_host_reason, is_temporary_dns_failure
+from backend.host_scheduler import HostScheduler
+from backend.host_throttle import CIRCUIT_OPEN, RATE_LIMITED, HostGuard, is_failed_check
+from backend.host_timeouts import host_timeouts
+from backend.result_sinks import RunningSummary, as_sinks, close_sinks
+from backend.source_breakdown import print_source_breakdown
 
 HEROKU_CHROME = "/app/.chrome-for-testing/chrome-linux64/chrome"
 
+# Pause before the one retry of a request whose DNS lookup failed temporarily (EAI_AGAIN)
+DNS_RETRY_DELAY = 1.0
+
+
+class DeadHostError(requests.ConnectionError):
+    """
+    Raised by http_get() for a host already known to be dead, without touching the network.
+    """
+
+
+class CheckCancelled(requests.RequestException):
+    """
+    Raised by http_get() when the check it belongs to ran out of time or was cancelled (see check_deadline).
+    """
+
+
+_check_limits = threading.local()
+
+
+@contextmanager
+def check_deadline(ends_at=None, cancelled=None):
+    """
+    Bounds the checks run inside the block (on this thread): http_get and the Playwright renders cap their timeouts to
+    the time left before ends_at (monotonic), and once it has passed or `cancelled` (a threading.Event) is set, further
+    requests raise CheckCancelled and renders are skipped, so an abandoned check winds down instead of running on.
+    """
+    previous = getattr(_check_limits, 'limits', None)
+    _check_limits.limits = (ends_at, cancelled)
+    try:
+        yield
+    finally:
+        _check_limits.limits = previous
+
+
+def check_time_left():
+    """
+    Seconds the current check may still spend: None without a deadline, 0 once it has passed or was cancelled.
+    """
+    limits = getattr(_check_limits, 'limits', None)
+    if limits is None:
+        return None
+    ends_at, cancelled = limits
+    if cancelled is not None and cancelled.is_set():
+        return 0.0
+    if ends_at is None:
+        return None
+    return max(0.0, ends_at - time.monotonic())
+
 
 def launch_browser(p):
     if os.path.exists(HEROKU_CHROME):
@@ -30,6 +88,106 @@ def launch_browser(p):
     return p.chromium.launch(headless=True)
 
 
+def http_get(url, timeout=60, dns_retries=1, **kwargs):
+    """
+    GET over the shared connection pools (http_client.get, which also adds the common headers) with per-host
+    adaptive timeouts. The caller's timeout is treated as a ceiling; once the host has
+    enough latency samples the (connect, read) timeouts come from its observed p99 plus headroom (see host_timeouts).
+    Every response time is fed back into the host's histogram. Timeouts are recorded as a sample at the timeout
+    value, so a host that starts timing out more than 1% of the time gets its timeout raised again.
+
+    Hosts that fail with NXDOMAIN, connection refused or a TLS error are added to dead_hosts (the host of the hop
+    that failed, which after a redirect isn't the one in url), and later calls for them raise DeadHostError straight
+    away. A temporary DNS failure (EAI_AGAIN) is retried up to dns_retries times after a short pause instead.
+
+    Inside check_deadline() the timeouts are also capped to the time the check has left, and a check that is out of
+    time raises CheckCancelled without sending anything.
+
+    When a stage recorder is active (inside check_single_link) the request's redirect hops, time to first byte,
+    body download and bytes are booked to it (see stage_timings).
+    """
+    hostname = urlparse(url).hostname
+    dead_reason = dead_hosts.is_dead(hostname)
+    if dead_reason:
+        raise DeadHostError(f"{hostname} is known dead ({dead_reason})")
+
+    host = extract_base_domain(url)
+    connect_timeout, read_timeout = host_timeouts.timeout_for(host, timeout)
+
+    left = check_time_left()
+    capped = left is not None and left < read_timeout
+    if left is not None:
+        if left <= 0:
+            raise CheckCancelled(f"Check cancelled before requesting {hostname}")
+        connect_timeout, read_timeout = min(connect_timeout, left), min(read_timeout, left)
+
+    recorder = stage_timings.current()
+    setup_before = _setup_seconds(recorder)
+    started = time.perf_counter()
+
+    try:
+        resp = http_client.get(url, timeout=(connect_timeout, read_timeout), **kwargs)
+    except requests.RequestException as e:
+        metrics.HTTP_ERRORS.inc(error=type(e).__name__)
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host=host)
+        if recorder is not None:
+            # Time spent waiting on a request that never answered
+            recorder.add("ttfb", time.perf_counter() - started - (_setup_seconds(recorder) - setup_before))
+        if isinstance(e, requests.Timeout):
+            if not capped:  # a timeout cut short by the check's deadline says nothing about the host
+                host_timeouts.observe(host, read_timeout)
+            raise
+        if dns_retries > 0 and is_temporary_dns_failure(e):
+            time.sleep(DNS_RETRY_DELAY)
+            return http_get(url, timeout=timeout, dns_retries=dns_retries - 1, **kwargs)
+        dead_reason = dead_host_reason(e)
+        if dead_reason:
+            failed_url = e.request.url if e.request is not None and e.request.url else url
+            dead_hosts.mark(urlparse(failed_url).hostname, dead_reason)
+        raise
+
+    host_timeouts.observe(host, resp.elapsed.total_seconds())
+    metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host=host)
+    if recorder is not None:
+        _record_http_stages(recorder, resp, time.perf_counter() - started, _setup_seconds(recorder) - setup_before)
+    return resp
+
+
+def response_text(resp):
+    """
+    resp.text, with its decoding (charset detection included) booked as parse. The parse_* functions book the view
+    they build from it (soup, visible text, JSON) as parse too, and the decision itself as match.
+    """
+    with stage_timings.stage("parse"):
+        return resp.text
+
+
+def _setup_seconds(recorder):
+    if recorder is None:
+        return 0.0
+    return recorder.seconds.get("dns", 0.0) + recorder.seconds.get("connect", 0.0)
+
+
+def _record_http_stages(recorder, resp, wall, setup):
+    """
+    Splits one http_get() into redirect hops, time to first byte of the final response, and body download.
+    resp.elapsed (per hop) runs from sending the request to the headers being parsed, so it includes any DNS /
+    connect time, which was already booked separately; that is taken out of the earliest hops.
+    """
+    hops = [h.elapsed.total_seconds() for h in resp.history]
+    ttfb = resp.elapsed.total_seconds()
+
+    redirect = sum(hops)
+    taken = min(setup, redirect)
+    redirect -= taken
+    ttfb = max(0.0, ttfb - (setup - taken))
+
+    recorder.add("redirect", redirect)
+    recorder.add("ttfb", ttfb)
+    recorder.add("download", wall - sum(hops) - resp.elapsed.total_seconds())
+    recorder.bytes += sum(len(h.content or b"") for h in resp.history) + len(resp.content or b"")
+
+
 def get_links(limit=None, source=None):
     """
     Returns a list of final_url strings from internships where final_url is not null.
@@ -112,31 +270,15 @@ def extract_recruitics_redirect(url: str) -> str:
         return url
 
 
-def extract_redirect_url_appcast(url, timeout=60):
+def parse_appcast_redirect(html):
     """
-    Extracts a JS/meta redirect URL from HTML.
-    Falls back to url if none found.
+    Finds the JS/meta redirect target in an Appcast wrapper page. Returns the URL, or None if there isn't one.
     """
-
-    try:
-
-        resp = requests.get(
-            url,
-            allow_redirects=True,
-            timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-        )
-
-        if not resp.text:
-            return url
-
+    with stage_timings.stage("parse"):
         # Normalize HTML
-        html = unescape(resp.text)
+        html = unescape(html)
 
+    with stage_timings.stage("match"):
         # --------------------------------------------------
         # 1) Appcast / JS setTimeout navigateTo(...)
         # --------------------------------------------------
@@ -170,9 +312,29 @@ def extract_redirect_url_appcast(url, timeout=60):
         if m:
             return m.group(1).strip()
 
-        # No redirect found; return original URL
-        return url
+    # No redirect found
+    return None
+
+
+def extract_redirect_url_appcast(url, timeout=60):
+    """
+    Extracts a JS/meta redirect URL from HTML.
+    Falls back to url if none found.
+    """
+
+    try:
+
+        resp = http_get(
+            url,
+            allow_redirects=True,
+            timeout=timeout,
+        )
+
+        html = response_text(resp)
+        if not html:
+            return url
 
+        return parse_appcast_redirect(html) or url
 
     except Exception as e:
         return url
@@ -186,15 +348,10 @@ def extract_redirect_url(url, timeout=60):
 
     try:
 
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
 
         if not resp.url:
@@ -206,6 +363,33 @@ def extract_redirect_url(url, timeout=60):
         return url
 
 
+def parse_workday(html):
+    """
+    Decision logic of is_workday_job_expired() on a response body. Returns (status, reason).
+    """
+    # Search for the postingAvailable flag in the HTML, and return the result accordingly
+    if not html:
+        return "unknown", "Workday.com custom cleaning: No HTML content"
+
+    # A regex over the raw body, no view to build: all of it is match
+    with stage_timings.stage("match"):
+        m = re.search(
+            r'postingAvailable"\s*:\s*(true|false)|postingAvailable\s*:\s*(true|false)',
+            html,
+            flags=re.IGNORECASE
+        )
+
+    if not m:  # Flag not found
+        return "unknown", "Workday.com custom cleaning: response tag postingAvailable flag not found"
+
+    if (m.group(1) or m.group(2)).lower() == "true":
+        return "active", "Workday.com custom cleaning: response tag postingAvailable=true"
+    elif (m.group(1) or m.group(2)).lower() == "false":
+        return "expired", "Workday.com custom cleaning: response tag postingAvailable=false"
+    else:
+        return "unknown", "Workday.com custom cleaning: response tag postingAvailable flag unrecognized"
+
+
 def is_workday_job_expired(url: str, timeout=60):
     """
     Custom Workday expired detector.
@@ -215,36 +399,13 @@ def is_workday_job_expired(url: str, timeout=60):
 
     try:
         # Make the request
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-        )
-
-        # Search for the postingAvailable flag in the HTML, and return the result accordingly
-        if not resp.text:
-            return "unknown", "Workday.com custom cleaning: No HTML content"
-
-        m = re.search(
-            r'postingAvailable"\s*:\s*(true|false)|postingAvailable\s*:\s*(true|false)',
-            resp.text,
-            flags=re.IGNORECASE
         )
 
-        if not m:  # Flag not found
-            return "unknown", "Workday.com custom cleaning: response tag postingAvailable flag not found"
-
-        if (m.group(1) or m.group(2)).lower() == "true":
-            return "active", "Workday.com custom cleaning: response tag postingAvailable=true"
-        elif (m.group(1) or m.group(2)).lower() == "false":
-            return "expired", "Workday.com custom cleaning: response tag postingAvailable=false"
-        else:
-            return "unknown", "Workday.com custom cleaning: response tag postingAvailable flag unrecognized"
+        return parse_workday(response_text(resp))
 
     except Exception as e:
         return "unknown", f"Error in workday.com custom cleaning: {type(e).__name__}: {e}"
@@ -259,7 +420,7 @@ def is_job_expired_greenhouse(url: str, timeout=60):
         if 'error=true' in url:
             return 'expired', "Greenhouse link redirected with error=true present"
 
-        resp = requests.get(url, allow_redirects=False, timeout=timeout)
+        resp = http_get(url, allow_redirects=False, timeout=timeout, default_headers=False)
 
         if 'location' in resp.headers:
             if 'error=true' in resp.headers['location']:
@@ -278,7 +439,7 @@ def is_job_expired_redirect(url: str, source: str, timeout=60):
     is different from the original URL.
     """
     try:
-        resp = requests.get(url, allow_redirects=True, timeout=timeout)
+        resp = http_get(url, allow_redirects=True, timeout=timeout, default_headers=False)
 
         if resp.url != url:
             return 'expired', (f"{source} redirect detected, meaning job is expired. Custom testing indicates that"
@@ -290,6 +451,23 @@ def is_job_expired_redirect(url: str, source: str, timeout=60):
         return 'unknown', f"Error in {source} redirect cleaning: {type(e).__name__}: {e}"
 
 
+def parse_ultipro(html):
+    """
+    Decision logic of is_ultipro_job_expired() on a response body. Returns (status, reason).
+    """
+    if not html:
+        return "unknown", "Ultipro.com custom cleaning: No HTML content for Ultipro job"
+
+    # Search for the OpportunityUnavailable flag in the HTML, and return the result accordingly
+    with stage_timings.stage("match"):
+        unavailable = 'Opportunity.OpportunityError.OpportunityUnavailableMessage' in html
+
+    if unavailable:
+        return "expired", "Ultipro.com custom cleaning: OpportunityUnavailableMessage found in HTML response, indicating expired job"
+    else:
+        return "active", "Ultipro.com custom cleaning: job active, OpportunityUnavailableMessage not found in HTML response"
+
+
 def is_ultipro_job_expired(url: str, timeout=60):
     """
     Custom Ultipro expired detector.
@@ -299,36 +477,23 @@ def is_ultipro_job_expired(url: str, timeout=60):
 
     try:
         # Make the request
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
 
-        if not resp.text:
-            return "unknown", "Ultipro.com custom cleaning: No HTML content for Ultipro job"
-
-        # Search for the OpportunityUnavailable flag in the HTML, and return the result accordingly
-        if 'Opportunity.OpportunityError.OpportunityUnavailableMessage' in resp.text:
-            return "expired", "Ultipro.com custom cleaning: OpportunityUnavailableMessage found in HTML response, indicating expired job"
-        else:
-            return "active", "Ultipro.com custom cleaning: job active, OpportunityUnavailableMessage not found in HTML response"
+        return parse_ultipro(response_text(resp))
 
     except Exception as e:
         return "unknown", f"Error in Ultipro.com custom cleaning: {type(e).__name__}: {e}"
 
 
-def is_oracle_job_expired(url: str, timeout_ms: int = 15000):
+def oracle_page_check(browser, url: str, timeout_ms: int):
     """
-    Returns (expired: bool, reason: str, time: float).
-    Detects Oracle CE "job-expired" via browser console logs.
+    Renders an Oracle CE page in `browser` and looks for "job-expired" in the console/page errors.
+    Returns (status, reason); raises on browser errors.
     """
-    start_time = datetime.now(timezone.utc)
     found = {"expired": False, "reason": ""}
 
     def on_console(msg):
@@ -345,38 +510,48 @@ def is_oracle_job_expired(url: str, timeout_ms: int = 15000):
             found["expired"] = True
             found["reason"] = f"pageerror:{t}"
 
+    context = browser.new_context()
     try:
+        page = context.new_page()
 
-        with sync_playwright() as p:
-            browser = launch_browser(p)
-            context = browser.new_context()
-            page = context.new_page()
+        page.on("console", on_console)
+        page.on("pageerror", on_page_error)
 
-            page.on("console", on_console)
-            page.on("pageerror", on_page_error)
+        try:
+            # IMPORTANT: don't use networkidle for Oracle CE
+            page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
 
-            try:
-                # IMPORTANT: don't use networkidle for Oracle CE
-                page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+            # Give JS a moment to run and log
+            page.wait_for_timeout(1500)
 
-                # Give JS a moment to run and log
-                page.wait_for_timeout(1500)
+        except PWTimeoutError:
+            # If we already saw "job-expired", it's fine. Otherwise treat as unknown.
+            pass
+    finally:
+        context.close()
 
-            except PWTimeoutError:
-                # If we already saw "job-expired", it's fine. Otherwise treat as unknown.
-                pass
-            finally:
-                context.close()
-                browser.close()
+    if found["expired"]:
+        return 'expired', f"{found.get('reason')}"
 
-        if found["expired"]:
-            end_time = datetime.now(timezone.utc)
-            elapsed = (end_time - start_time).total_seconds()
-            return 'expired', f"{found.get('reason')}"
+    return 'active', f"Oraclecloud custom cleaning: job-expired not found in console/pageerror logs, indicating active job"
+
+
+def is_oracle_job_expired(url: str, timeout_ms: int = 15000):
+    """
+    Returns (expired: bool, reason: str, time: float).
+    Detects Oracle CE "job-expired" via browser console logs.
+    """
+    start_time = datetime.now(timezone.utc)
+
+    try:
+        with stage_timings.stage("render"):
+            status, reason = render_page_check("oracle", url, timeout_ms)
 
         end_time = datetime.now(timezone.utc)
         elapsed = (end_time - start_time).total_seconds()
-        return 'active', f"Oraclecloud custom cleaning: job-expired not found in console/pageerror logs, indicating active job"
+        host_timeouts.observe(extract_base_domain(url), elapsed, kind="render")
+
+        return status, reason
 
     except Exception as e:
         err_str = str(e)
@@ -392,15 +567,10 @@ def is_job_expired_icims(url: str, timeout=60):
     Custom iCIMS expired detector.
     """
     try:
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
 
         if resp.status_code in (404, 410):
@@ -412,27 +582,15 @@ def is_job_expired_icims(url: str, timeout=60):
         return 'unknown', f"Error in iCIMS.com custom cleaning: {type(e).__name__}: {e}"
 
 
-def is_job_expired_dayforce(url: str, timeout: int = 60):
+def parse_dayforce(html):
     """
-
+    Decision logic of is_job_expired_dayforce() on a response body (reads jobData from __NEXT_DATA__).
+    Returns (status, reason); may raise on malformed data.
     """
-    try:
-        resp = requests.get(
-            url,
-            allow_redirects=True,
-            timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-        )
-
-        if not resp.text:
-            return "unknown", "DayforceHCM jobData not found"
-        else:
-            html = resp.text
+    if not html:
+        return "unknown", "DayforceHCM jobData not found"
 
+    with stage_timings.stage("parse"):
         # 1) Prefer parsing the script tag by id
         soup = BeautifulSoup(html, "html.parser")
         script = soup.find("script", id="__NEXT_DATA__")
@@ -477,6 +635,7 @@ def is_job_expired_dayforce(url: str, timeout: int = 60):
         if not isinstance(job_data, dict) or not job_data:
             return "unknown", "DayforceHCM jobData not found"
 
+    with stage_timings.stage("match"):
         posting_status = job_data.get("postingStatus") or ""
         postingExpiryTimestampUTC = job_data.get("postingExpiryTimestampUTC") or None
 
@@ -489,41 +648,43 @@ def is_job_expired_dayforce(url: str, timeout: int = 60):
             if posting_status != 1:
                 return 'expired', "DayforceHCM custom cleaning: postingStatus indicates closed, meaning job is expired"
 
-        return 'active', "DayforceHCM custom cleaning: job active based on postingExpiryTimestampUTC and postingStatus"
+    return 'active', "DayforceHCM custom cleaning: job active based on postingExpiryTimestampUTC and postingStatus"
 
-    except Exception as e:
-        return "unknown", f"Error in DayforceHCM custom cleaning: {type(e).__name__}: {e}"
 
-
-def is_job_expired_taleo(url: str, timeout: int = 60):
+def is_job_expired_dayforce(url: str, timeout: int = 60):
     """
-    Taleo job availability detector (request/HTML-based).
-
-    Returns:
-      ("active" | "expired" | "unknown", reason)
+    Custom DayforceHCM expired detector.
     """
     try:
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
 
-        html = resp.text or ""
-        if not html.strip():
-            return "unknown", "Talea custom cleaning: Empty response body"
+        return parse_dayforce(response_text(resp))
 
+    except Exception as e:
+        return "unknown", f"Error in DayforceHCM custom cleaning: {type(e).__name__}: {e}"
+
+
+def parse_taleo(html):
+    """
+    Decision logic of is_job_expired_taleo() on a response body. Returns (status, reason).
+    """
+    html = html or ""
+    if not html.strip():
+        return "unknown", "Talea custom cleaning: Empty response body"
+
+    with stage_timings.stage("parse"):
         # --- Build a visible-text view (helps catch plain phrases) ---
         soup = BeautifulSoup(html, "html.parser")
         for tag in soup(["script", "style", "noscript"]):
             tag.extract()
         visible_text = soup.get_text(" ", strip=True).lower()
+        html_lower = html.lower()
 
+    with stage_timings.stage("match"):
         # --- Quick phrase-based signals (works even if scripts differ) ---
         phrase_signals = [
             "the job is no longer available",
@@ -538,7 +699,6 @@ def is_job_expired_taleo(url: str, timeout: int = 60):
 
         # --- Script/JS signals specific to Taleo _ftl object ---
         # Instead of parsing JS fully, we search for robust markers.
-        html_lower = html.lower()
 
         # 1) Interface set differs: unavailable has requisitionUnavailableInterface
         if "requisitionunavailableinterface" in html_lower:
@@ -565,6 +725,23 @@ def is_job_expired_taleo(url: str, timeout: int = 60):
         # If we can't confidently decide, return unknown
         return "unknown", "Taleo custom cleaning: Could not confidently classify Taleo page"
 
+
+def is_job_expired_taleo(url: str, timeout: int = 60):
+    """
+    Taleo job availability detector (request/HTML-based).
+
+    Returns:
+      ("active" | "expired" | "unknown", reason)
+    """
+    try:
+        resp = http_get(
+            url,
+            allow_redirects=True,
+            timeout=timeout,
+        )
+
+        return parse_taleo(response_text(resp))
+
     except requests.Timeout:
         return "unknown", f"Taleo custom cleaning: request timed out after {timeout}s"
     except Exception as e:
@@ -614,6 +791,94 @@ REDIRECT_SOURCES = [
     'bamboohr.com'
 ]
 
+# Playwright renders get their own adaptive limit (separate from plain HTTP checks), shared by every caller
+render_limiter = AdaptiveLimiter(AIMDController(
+    "playwright",
+    initial=2,
+    min_limit=1,
+    max_limit=int(os.getenv('PLAYWRIGHT_MAX_CONCURRENCY', '4')),
+    decrease=0.5,
+))
+
+# Detectors whose checks include a browser render; the HTTP controller keeps a separate latency baseline for them
+BROWSER_DETECTORS = ("playwright", "oraclecloud")
+
+
+def render_check(is_expired, url, timeout):
+    """
+    Runs a Playwright detector (is_expired(url, timeout_ms=...)) in a render_limiter slot with the host's adaptive
+    render timeout, capped by the time the check has left (see check_deadline). A check that is out of time once it
+    gets a slot skips the render and answers 'unknown'.
+    """
+    with render_limiter.slot() as slot:
+        timeout_ms = host_timeouts.render_timeout_ms(extract_base_domain(url), timeout)
+        left = check_time_left()
+        if left is not None:
+            if left <= 0:
+                slot.record = False
+                return 'unknown', "Check cancelled before the render started"
+            timeout_ms = min(timeout_ms, int(left * 1000))
+
+        expired, reason = is_expired(url, timeout_ms=timeout_ms)
+        slot.failed = expired == 'unknown'
+        return expired, reason
+
+
+def playwright_page_check(browser, url: str, timeout_ms: int):
+    """
+    Renders url in `browser` and searches the body text for closed job patterns.
+    Returns (status, reason); raises on browser errors (including navigation timeouts).
+    """
+    context = browser.new_context()
+    try:
+        page = context.new_page()
+        # domcontentloaded / networkidle
+        page.goto(url, wait_until="networkidle", timeout=timeout_ms)
+
+        text = (page.inner_text("body") or "").lower()
+    finally:
+        context.close()
+
+    for pat in CLOSED_PATTERNS:
+        if re.search(pat, text):
+            return 'expired', f"Playwright: Job is expired because the following pattern was found: {pat}"
+
+    return 'active', f"Playwright: No closed patterns found, job is active"
+
+
+# Page checks that can run inside a browser worker (see browser_pool)
+RENDERERS = {
+    "playwright": playwright_page_check,
+    "oracle": oracle_page_check,
+}
+
+
+def render_page_check(kind: str, url: str, timeout_ms: int):
+    """
+    Runs a RENDERERS page check, in the shared browser pool when it's enabled, or in a browser launched just for
+    this call otherwise. Returns (status, reason); raises on errors.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        if browser_pool.BROWSER_POOL_ENABLED:
+            status, reason = browser_pool.pool_client.render(kind, url, timeout_ms)
+        else:
+            with sync_playwright() as p:
+                browser = launch_browser(p)
+                try:
+                    status, reason = RENDERERS[kind](browser, url, timeout_ms)
+                finally:
+                    browser.close()
+        outcome = status
+        return status, reason
+    except PWTimeoutError:
+        outcome = "timeout"
+        raise
+    finally:
+        metrics.BROWSER_RENDERS.inc(kind=kind, outcome=outcome)
+        metrics.BROWSER_RENDER_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
 
 def is_job_expired_playwright(url: str, timeout_ms: int = 60000):
     """
@@ -622,26 +887,22 @@ def is_job_expired_playwright(url: str, timeout_ms: int = 60000):
 
     try:
         start_time = datetime.now(timezone.utc)
-        with sync_playwright() as p:
-            browser = launch_browser(p)
-            page = browser.new_page()
-            # domcontentloaded / networkidle
-            page.goto(url, wait_until="networkidle", timeout=timeout_ms)
-
-            text = (page.inner_text("body") or "").lower()
+        with stage_timings.stage("render"):
+            status, reason = render_page_check("playwright", url, timeout_ms)
 
-            for pat in CLOSED_PATTERNS:
-                if re.search(pat, text):
-                    browser.close()
-                    end_time = datetime.now(timezone.utc)
-                    elapsed = (end_time - start_time).total_seconds()
-                    return 'expired', f"Playwright: Job is expired because the following pattern was found: {pat}"
+        end_time = datetime.now(timezone.utc)
+        elapsed = (end_time - start_time).total_seconds()
+        host_timeouts.observe(extract_base_domain(url), elapsed, kind="render")
+        return status, reason
 
-            end_time = datetime.now(timezone.utc)
-            elapsed = (end_time - start_time).total_seconds()
-            browser.close()
-            return 'active', f"Playwright: No closed patterns found, job is active"
+    except PWTimeoutError as e:
+        host_timeouts.observe(extract_base_domain(url), timeout_ms / 1000, kind="render")
+        err_str = str(e)
+        cutoff = err_str.find("Call")
+        if cutoff != -1:
+            err_str = err_str[:cutoff].strip()
 
+        return "unknown", f"Error in Playwright cleaning: {type(e).__name__}: {err_str}"
     except Exception as e:
         err_str = str(e)
         cutoff = err_str.find("Call")
@@ -658,48 +919,66 @@ REQUEST_TEXT_SOURCES = [
 ]
 
 
+def parse_request_text(html):
+    """
+    Decision logic of is_job_expired_request_text() on a response body: CLOSED_PATTERNS over the visible text.
+    Returns (status, reason).
+    """
+    with stage_timings.stage("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+        for script in soup(["script", "style"]):
+            script.extract()
+
+        visible_text = soup.get_text(" ", strip=True).lower()
+        visible_text = re.sub(r"\s+", " ", visible_text)
+
+    with stage_timings.stage("match"):
+        for pat in CLOSED_PATTERNS:
+            if re.search(pat, visible_text):
+                return 'expired', (f"The job is deemed expired because the following pattern was found: {pat}. This "
+                                   f"came from the HTML request text, playwright was not used.")
+
+    return 'active', f"The job is deemed active because no closed patterns were found in the HTML request text, playwright was not used."
+
+
 def is_job_expired_request_text(url: str, timeout: int = 60):
     """
     Generic expired detector using request to render the page and search for closed job patterns.
     """
 
     try:
-        start_time = datetime.now(timezone.utc)
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
 
         # print(f"REQUEST HTML: {resp.text}")
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for script in soup(["script", "style"]):
-            script.extract()
+        return parse_request_text(response_text(resp))
 
-        visible_text = soup.get_text(" ", strip=True).lower()
-        visible_text = re.sub(r"\s+", " ", visible_text)
+    except Exception as e:
+        return 'unknown', f"Error in request text cleaning: {type(e).__name__}: {e}"
 
-        # print(f"REQUEST HTML TEXT: {visible_text}")
 
-        for pat in CLOSED_PATTERNS:
-            if re.search(pat, visible_text):
-                end_time = datetime.now(timezone.utc)
-                elapsed = (end_time - start_time).total_seconds()
-                return 'expired', (f"The job is deemed expired because the following pattern was found: {pat}. This came "
-                                   f"from the HTML request text, playwright was not used.")
+# Markers of sources check_single_link answers with plain requests (no browser)
+REQUEST_ONLY_MARKERS = [
+    'workdayjobs', 'workdaysite', 'greenhouse.io', 'ultipro.com', 'icims.com', 'dayforcehcm.com', 'taleo.net',
+    'taleo.com', 'recruitics.com',
+] + REDIRECT_SOURCES + REQUEST_TEXT_SOURCES
 
-        end_time = datetime.now(timezone.utc)
-        elapsed = (end_time - start_time).total_seconds()
-        return 'active', f"The job is deemed active because no closed patterns were found in the HTML request text, playwright was not used."
 
-    except Exception as e:
-        return 'unknown', f"Error in request text cleaning: {type(e).__name__}: {e}"
+def uses_browser(final_url: str) -> bool:
+    """
+    Best guess, from the URL alone, of whether check_single_link will need Playwright (Oracle Cloud, or any source
+    without a request-based detector that may fall through to the Playwright fallback). Used for admission control.
+    """
+    url = (final_url or "").strip().lower()
+    if not url:
+        return False
+    if 'oraclecloud.com' in url:
+        return True
+    return not any(marker in url for marker in REQUEST_ONLY_MARKERS)
 
 
 # ============================================================
@@ -721,10 +1000,24 @@ def check_single_link(final_url, timeout=60):
         "final_url": str,
         "decision": "DELETE" | "KEEP",
         "reason": str,
-        "used": "workday" | "status_code" | "playwright"
+        "used": "workday" | "status_code" | "playwright",
+        "timings": {"total_ms", "redirect_ms", "dns_ms", "connect_ms", "ttfb_ms", "download_ms", "parse_ms",
+                    "match_ms", "render_ms", "bytes"}  (see stage_timings)
       }
     """
+    recorder = stage_timings.start()
+    try:
+        result = _check_single_link(final_url, timeout=timeout)
+    finally:
+        stage_timings.stop()
+
+    result["timings"] = recorder.as_dict()
+    metrics.LINK_CHECKS.inc(detector=result.get("used"), decision=result.get("decision"))
+    metrics.LINK_CHECK_SECONDS.observe(result["timings"]["total_ms"] / 1000, detector=result.get("used"))
+    return result
 
+
+def _check_single_link(final_url, timeout=60):
     try:
 
         result = {
@@ -741,22 +1034,24 @@ def check_single_link(final_url, timeout=60):
 
         url = final_url.strip()
 
-        if 'appcast.io' in url:
-            # Extract redirect URL from Appcast wrapper
-            url = extract_redirect_url_appcast(url, timeout=timeout)
-        elif 'grnh.se' in url:
-            # Extract redirect URL from Greenhouse short link
-            url = extract_redirect_url(url, timeout=timeout)
-        elif 'recruitics.com' in url:
-            # Extract redirect URL from Recruitics link
-            url = extract_recruitics_redirect(url)
+        # Everything spent unwrapping counts as redirect time
+        with stage_timings.attribute("redirect"):
+            if 'appcast.io' in url:
+                # Extract redirect URL from Appcast wrapper
+                url = extract_redirect_url_appcast(url, timeout=timeout)
+            elif 'grnh.se' in url:
+                # Extract redirect URL from Greenhouse short link
+                url = extract_redirect_url(url, timeout=timeout)
+            elif 'recruitics.com' in url:
+                # Extract redirect URL from Recruitics link
+                url = extract_recruitics_redirect(url)
 
         # --------------------------------------------------
         # STEP 1) Source-specific handling
         # --------------------------------------------------
 
         # 1: Workday handling
-        if 'workdayjobs' in url or 'workdaysite':
+        if 'workdayjobs' in url or 'workdaysite' in url:
             expired, reason = is_workday_job_expired(url, timeout=timeout)
             result["used"] = "workday"
 
@@ -804,7 +1099,7 @@ def check_single_link(final_url, timeout=60):
 
         # 4: Oracle Cloud handling
         if 'oraclecloud.com' in url:
-            expired, reason = is_oracle_job_expired(url, timeout_ms=int(timeout * 1000))
+            expired, reason = render_check(is_oracle_job_expired, url, timeout)
             result["used"] = "oraclecloud"
             result["reason"] = reason
 
@@ -898,15 +1193,10 @@ def check_single_link(final_url, timeout=60):
         # 2) Status code handling and redirect url check
         # --------------------------------------------------
         # resp = requests.get(url, allow_redirects=True, timeout=timeout)
-        resp = requests.get(
+        resp = http_get(
             url,
             allow_redirects=True,
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "text/html",
-                "Accept-Language": "en-US,en;q=0.9",
-            },
         )
         # print(f"RESPONSE HTML: {resp.text}")
 
@@ -942,7 +1232,7 @@ def check_single_link(final_url, timeout=60):
         # --------------------------------------------------
         # 4) Playwright fallback
         # --------------------------------------------------
-        expired, reason = is_job_expired_playwright(url, timeout_ms=int(timeout * 1000))
+        expired, reason = render_check(is_job_expired_playwright, url, timeout)
         result["used"] = "playwright"
         result["reason"] = reason
 
@@ -1008,6 +1298,9 @@ def group_count_by_source(urls, examples_per_source=3):
     Groups job URLs by base domain, prints counts + percentages,
     and returns the structured result.
 
+    To break down a whole table, use source_breakdown.source_breakdown() instead: it does the same grouping in SQL
+    and returns the same dict without pulling the URLs over.
+
     :param urls: list[str]
     :param examples_per_source: how many example URLs to print per domain
     :return: dict with totals, counts, percentages, examples
@@ -1031,28 +1324,15 @@ def group_count_by_source(urls, examples_per_source=3):
         for dom, cnt in counts_sorted.items()
     }
 
-    # ---- PRINT RESULTS ----
-    print("\n=== Job Source Breakdown ===")
-    print(f"Total URLs: {total}\n")
-
-    for domain, count in counts_sorted.items():
-        if count > 100:
-            pct = percentages[domain]
-            print(f"{domain:25s} {count:7d} ({pct:6.2f}%)")
-
-            for ex in examples[domain]:
-                print(f"   - {ex}")
-            print()
-
-    print("=== End Breakdown ===\n")
-    # ------------------------
-
-    return {
+    result = {
         "total": total,
         "counts": counts_sorted,
         "percentages": percentages,
         "examples": dict(examples),
     }
+    print_source_breakdown(result)
+
+    return result
 
 
 def run_link_checks(
@@ -1060,6 +1340,8 @@ def run_link_checks(
         timeout=60,
         show_per_link=True,
         show_fail_reasons_top_n=10,
+        sink=None,
+        keep_results=True,
 ):
     """
     Runs check_single_link() on a list of URLs, prints per-link results as it runs,
@@ -1069,88 +1351,250 @@ def run_link_checks(
       - kept vs deleted counts + %
       - used-method counts + %
       - top reasons (optional)
+      - stage timings per detector / domain
       - elapsed time
 
+    Each result is also passed to `sink` (a ResultSink or a list of them, see result_sinks) as soon as it's ready.
+    For very large runs pass keep_results=False and read the results from a sink instead; the summary is kept in
+    constant memory either way. On Ctrl-C the sinks are flushed and the summary of what finished is printed before
+    the KeyboardInterrupt is re-raised.
+
     Returns:
-      results: list[dict] of the check_single_link outputs
+      results: list[dict] of the check_single_link outputs ([] with keep_results=False)
     """
     links = [l for l in (links or []) if l and str(l).strip()]
     total = len(links)
 
-    start_ts = datetime.now(timezone.utc)
-
     if total == 0:
         print("No links provided.")
         return []
 
     results = []
-    decision_counts = Counter()
-    used_counts = Counter()
-    reason_counts = Counter()
+    summary = RunningSummary(total, domain_key=extract_base_domain)
+    sinks = as_sinks(sink)
 
     print("\n" + "=" * 80)
     print(f"Running job link checks: {total} link(s) | timeout={timeout}s")
     print("=" * 80)
 
-    for i, url in enumerate(links, start=1):
-        url = str(url).strip()
+    interrupted = False
+    try:
+        for i, url in enumerate(links, start=1):
+            url = str(url).strip()
+
+            # ---- run check ----
+            res = check_single_link(url, timeout=timeout)
+            if keep_results:
+                results.append(res)
+            summary.write(i - 1, url, res)
+            for s in sinks:
+                s.write(i - 1, url, res)
+
+            # ---- per-link print ----
+            if show_per_link:
+                decision = (res.get("decision") or "UNKNOWN").upper()
+                used = (res.get("used") or "unknown").lower()
+                reason = (res.get("reason") or "").strip()
+                # compact, consistent print format
+                # Example:
+                # [003/250] DELETE | used=playwright      | Pattern found: ...
+                #           https://...
+                print(f"\n[{i:03d}/{total}] {decision:<6} | used={used:<14} | {reason}")
+                print(f"          {url}")
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        close_sinks(sinks)
 
-        # ---- run check ----
-        res = check_single_link(url, timeout=timeout)
-        results.append(res)
+    # ---- summary ----
+    summary.print(show_fail_reasons_top_n)
+    print_timing_tables(summary)
 
-        decision = (res.get("decision") or "UNKNOWN").upper()
-        used = (res.get("used") or "unknown").lower()
-        reason = (res.get("reason") or "").strip()
+    print(f"\nElapsed: {summary.elapsed:.2f}s")
+    print("=" * 80 + "\n")
 
-        decision_counts[decision] += 1
-        used_counts[used] += 1
-        if reason:
-            reason_counts[reason] += 1
+    host_timeouts.save()
 
-        # ---- per-link print ----
-        if show_per_link:
-            # compact, consistent print format
-            # Example:
-            # [003/250] DELETE | used=playwright      | Pattern found: ...
-            #           https://...
-            print(f"\n[{i:03d}/{total}] {decision:<6} | used={used:<14} | {reason}")
-            print(f"          {url}")
+    if interrupted:
+        raise KeyboardInterrupt
+    return results
 
-    # ---- summary ----
-    elapsed = (datetime.now(timezone.utc) - start_ts).total_seconds()
-    kept = decision_counts.get("KEEP", 0)
-    deleted = decision_counts.get("DELETE", 0)
 
-    def pct(n):  # safe percentage helper
-        return (n / total * 100.0) if total else 0.0
+print_lock = threading.Lock()
 
-    print("\n" + "=" * 80)
-    print("SUMMARY")
-    print("=" * 80)
-    print(f"Total:   {total}")
-    print(f"KEEP:    {kept:6d} ({pct(kept):6.2f}%)")
-    print(f"DELETE:  {deleted:6d} ({pct(deleted):6.2f}%)")
-    other = total - kept - deleted
-    if other:
-        print(f"OTHER:   {other:6d} ({pct(other):6.2f}%)")
-
-    print("\n--- Method Used Breakdown ---")
-    for method, cnt in used_counts.most_common():
-        print(f"{method:20s} {cnt:6d} ({pct(cnt):6.2f}%)")
-
-    if show_fail_reasons_top_n and reason_counts:
-        print(f"\n--- Top Reasons (top {show_fail_reasons_top_n}) ---")
-        for reason, cnt in reason_counts.most_common(show_fail_reasons_top_n):
-            print(f"{cnt:6d} ({pct(cnt):6.2f}%)  {reason}")
-
-    print(f"\nElapsed: {elapsed:.2f}s")
-    print("=" * 80 + "\n")
 
-    return results
+def print_timing_tables(summary, top_n=15):
+    """
+    Prints per-detector and per-domain percentile tables of the stage timings (ms) from a RunningSummary.
+    """
+    columns = [("total", "total_p50"), ("p95", "total_p95"), ("p99", "total_p99")] + \
+              [(s, f"{s}_p50") for s in stage_timings.STAGES]
 
+    for title, timing_summary in (("detector", summary.by_detector), ("domain", summary.by_domain)):
+        rows = timing_summary.rows()
+        if not rows:
+            continue
 
-print_lock = threading.Lock()
+        print(f"\n--- Stage Timings by {title} (p50 ms unless noted, top {top_n} by total time) ---")
+        print(f"{title:25s} {'n':>5} " + " ".join(f"{name:>8}" for name, _ in columns) + f" {'KiB p50':>8}")
+        for row in rows[:top_n]:
+            print(f"{str(row['group'])[:25]:25s} {row['n']:>5d} "
+                  + " ".join(f"{row[field]:>8.0f}" for _, field in columns)
+                  + f" {row['bytes_p50'] / 1024:>8.0f}")
+
+
+def iter_link_checks_parallel(
+        links,
+        timeout=60,
+        max_workers=20,
+        host_guard=None,
+        per_host_cap=5,
+        window=None,
+        controller=None,
+        deadline=None,
+):
+    """
+    Runs check_single_link() over links on a thread pool and yields (idx, url, result) as each check finishes.
+
+    Work is handed out by a HostScheduler (round-robin across hosts, at most per_host_cap in flight per host), and at
+    most `window` checks are submitted at a time, so memory stays flat no matter how many links are passed in.
+    The number of checks actually in flight follows an AIMDController, with max_workers as its ceiling. Each host's
+    rate limit and circuit breaker are checked before a check is submitted: a link whose host has no token yet is
+    requeued until one is due, and a link whose host's breaker is open is yielded straight away (used="circuit_open").
+    The scheduler groups links by base domain, but the guard is keyed on the hostname, so one Workday or Greenhouse
+    tenant that keeps timing out doesn't open the breaker for the rest of the ATS.
+
+    :param links: List of URL strings (idx in the yielded tuples is the position in this list)
+    :param max_workers: Thread pool size, the most checks that can ever run at once
+    :param host_guard: HostGuard for per-host rate limiting / circuit breaking (a fresh one is used if None)
+    :param per_host_cap: Max concurrent checks against one host
+    :param window: Max submitted-but-unfinished checks (defaults to max_workers)
+    :param controller: AIMDController for the in-flight limit (a fresh one is used if None)
+    :param deadline: Optional overall time budget in seconds. When it runs out, every link still queued or in flight
+                     is yielded straight away as a KEEP with used="deadline" and the pool is abandoned. Checks run
+                     under check_deadline(), so their requests and renders are cut off at the deadline, and the ones
+                     still running then (or when the consumer stops early) are cancelled and counted in
+                     rezify_link_checks_abandoned_total.
+    """
+    if host_guard is None:
+        host_guard = HostGuard()
+    if window is None:
+        window = max_workers
+    if controller is None:
+        controller = AIMDController("http", initial=max(2, max_workers // 4), min_limit=2, max_limit=max_workers)
+
+    scheduler = HostScheduler(
+        ((i, str(url).strip()) for i, url in enumerate(links)),
+        key=extract_base_domain,
+        per_host_cap=per_host_cap,
+    )
+
+    ends_at = time.monotonic() + deadline if deadline is not None else None
+    cancelled = threading.Event()
+
+    def _do_one(idx, url, hostname):
+        if cancelled.is_set():
+            return _deadline_result(idx, url)
+
+        dead_reason = dead_hosts.is_dead(hostname)
+        if dead_reason:
+            return idx, url, {
+                "final_url": url,
+                "decision": "KEEP",
+                "reason": f"Host known dead ({dead_reason}), skipped without a request",
+                "used": "dead_host",
+            }
+
+        render_limiter.take_wait()
+        start = time.monotonic()
+        with check_deadline(ends_at, cancelled):
+            res = check_single_link(url, timeout=timeout)
+        # Time queued for a render slot is render_limiter's backpressure, not a sign this controller is overloaded
+        latency = time.monotonic() - start - render_limiter.take_wait()
+        failed = is_failed_check(res)
+        host_guard.record(hostname, failed)
+        controller.record(latency, failed, kind="browser" if res.get("used") in BROWSER_DETECTORS else "http")
+        return idx, url, res
+
+    def _deadline_result(idx, url):
+        return idx, url, {
+            "final_url": url,
+            "decision": "KEEP",
+            "reason": f"Deadline of {deadline}s reached before the check finished",
+            "used": "deadline",
+        }
+
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight = {}  # future -> (host, idx, url)
+    abandoned = False
+    unfinished = len(links)  # queued or in flight, for the queue depth gauge
+    metrics.QUEUE_DEPTH.inc(unfinished, queue="link_checks")
+    try:
+        while True:
+            # Top the window up with the next host in the rotation that is under its cap
+            while len(in_flight) < min(window, controller.value):
+                item = scheduler.next()
+                if item is None:
+                    break
+                host, idx, url = item
+                hostname = urlparse(url).hostname or host
+
+                outcome, detail = host_guard.acquire(hostname)
+                if outcome == RATE_LIMITED:
+                    # Back in the host's queue until a token is due; no worker waits for it
+                    scheduler.defer(host, idx, url, detail)
+                    metrics.LINK_CHECK_DEFERRALS.inc(reason=RATE_LIMITED)
+                    continue
+                if outcome == CIRCUIT_OPEN:
+                    scheduler.done(host)
+                    unfinished -= 1
+                    metrics.QUEUE_DEPTH.dec(queue="link_checks")
+                    metrics.LINK_CHECK_DEFERRALS.inc(reason=CIRCUIT_OPEN)
+                    yield idx, url, {
+                        "final_url": url,
+                        "decision": "KEEP",
+                        "reason": detail,
+                        "used": "circuit_open",
+                    }
+                    continue
+
+                in_flight[ex.submit(_do_one, idx, url, hostname)] = (host, idx, url)
+
+            if not in_flight and not len(scheduler):
+                break
+
+            remaining = None if ends_at is None else ends_at - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                for host, idx, url in in_flight.values():
+                    yield _deadline_result(idx, url)
+                for idx, url in scheduler.drain():
+                    yield _deadline_result(idx, url)
+                abandoned = True
+                break
+
+            # Wake up in time to hand out work whose host was rate limited
+            ready_in = scheduler.ready_in()
+            if ready_in is not None:
+                remaining = ready_in if remaining is None else min(remaining, ready_in)
+            if not in_flight:
+                time.sleep(remaining if remaining is not None else 0.01)
+                continue
+
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                scheduler.done(in_flight.pop(fut)[0])
+                unfinished -= 1
+                metrics.QUEUE_DEPTH.dec(queue="link_checks")
+                yield fut.result()
+    finally:
+        metrics.QUEUE_DEPTH.dec(unfinished, queue="link_checks")
+        # Don't block on checks nobody is waiting for anymore (deadline hit or the consumer stopped early): the ones
+        # not started are cancelled, the running ones are told to stop at their next request / render
+        cancelled.set()
+        running = sum(1 for fut in in_flight if not fut.cancel() and not fut.done())
+        if running:
+            metrics.LINK_CHECKS_ABANDONED.inc(running, reason="deadline" if abandoned else "stopped")
+        ex.shutdown(wait=not (abandoned or in_flight or len(scheduler)), cancel_futures=True)
 
 
 def run_link_checks_parallel(
@@ -1158,89 +1602,125 @@ def run_link_checks_parallel(
         timeout=60,
         show_per_link=True,
         show_fail_reasons_top_n=10,
-        max_workers=20,  # tune: 10–50 depending on your machine/network
+        max_workers=20,  # ceiling only, the in-flight count is tuned by an AIMD controller
+        host_guard=None,
+        per_host_cap=5,
+        sink=None,
+        keep_results=True,
 ):
+    """
+    Parallel version of run_link_checks().
+
+    Links are interleaved across hosts (see iter_link_checks_parallel) so the workers aren't all waiting on the same
+    slow host. Each host (base domain) is rate limited with a token bucket and has a circuit breaker that opens after
+    consecutive failures/timeouts. A link whose host is out of tokens goes back in the host's queue until the next
+    token is due (no worker sits waiting for it). While a host's breaker is open its queued links are deferred with a
+    fast KEEP (used="circuit_open") instead of each one holding a worker for the full timeout.
+
+    The number of checks in flight is auto-tuned between 2 and max_workers (AIMD), and Playwright renders have their
+    own limit (render_limiter). Both timelines are printed in the summary.
+
+    :param host_guard: Optional HostGuard to share limits/breaker state between runs
+    :param per_host_cap: Max concurrent checks against one host
+    :param sink: ResultSink or list of them that each result is streamed to as it finishes (see run_link_checks)
+    :param keep_results: Return every result in input order; pass False for very large runs
+    """
     links = [l for l in (links or []) if l and str(l).strip()]
     total = len(links)
-    start_ts = datetime.now(timezone.utc)
 
     if total == 0:
         print("No links provided.")
         return []
 
-    results = [None] * total
-    decision_counts = Counter()
-    used_counts = Counter()
-    reason_counts = Counter()
+    results = [None] * total if keep_results else []
+    summary = RunningSummary(total, domain_key=extract_base_domain)
+    sinks = as_sinks(sink)
 
     print("\n" + "=" * 80)
     print(f"Running job link checks (PARALLEL): {total} link(s) | timeout={timeout}s | workers={max_workers}")
     print("=" * 80)
 
-    def _do_one(idx, url):
-        res = check_single_link(url, timeout=timeout)
-        return idx, url, res
+    if host_guard is None:
+        host_guard = HostGuard()
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = {
-            ex.submit(_do_one, i, str(url).strip()): i
-            for i, url in enumerate(links)
-        }
-
-        for fut in as_completed(futures):
-            idx, url, res = fut.result()
-            results[idx] = res  # preserve original ordering
+    run_started = time.monotonic()
+    controller = AIMDController("http", initial=max(2, max_workers // 4), min_limit=2, max_limit=max_workers)
 
-            decision = (res.get("decision") or "UNKNOWN").upper()
-            used = (res.get("used") or "unknown").lower()
-            reason = (res.get("reason") or "").strip()
-
-            decision_counts[decision] += 1
-            used_counts[used] += 1
-            if reason:
-                reason_counts[reason] += 1
+    interrupted = False
+    checks = iter_link_checks_parallel(
+        links,
+        timeout=timeout,
+        max_workers=max_workers,
+        host_guard=host_guard,
+        per_host_cap=per_host_cap,
+        controller=controller,
+    )
+    try:
+        for idx, url, res in checks:
+            if keep_results:
+                results[idx] = res  # preserve original ordering
+            summary.write(idx, url, res)
+            for s in sinks:
+                s.write(idx, url, res)
 
             if show_per_link:
+                decision = (res.get("decision") or "UNKNOWN").upper()
+                used = (res.get("used") or "unknown").lower()
+                reason = (res.get("reason") or "").strip()
                 with print_lock:
                     # idx is 0-based; display 1-based
                     print(f"\n[{idx + 1:03d}/{total}] {decision:<6} | used={used:<14} | {reason}")
                     print(f"          {url}")
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        checks.close()  # stops handing out work; checks already running are abandoned
+        close_sinks(sinks)
 
-    # ---- summary (same as yours) ----
-    elapsed = (datetime.now(timezone.utc) - start_ts).total_seconds()
-    kept = decision_counts.get("KEEP", 0)
-    deleted = decision_counts.get("DELETE", 0)
-
-    def pct(n):
-        return (n / total * 100.0) if total else 0.0
-
-    print("\n" + "=" * 80)
-    print("SUMMARY")
-    print("=" * 80)
-    print(f"Total:   {total}")
-    print(f"KEEP:    {kept:6d} ({pct(kept):6.2f}%)")
-    print(f"DELETE:  {deleted:6d} ({pct(deleted):6.2f}%)")
-    other = total - kept - deleted
-    if other:
-        print(f"OTHER:   {other:6d} ({pct(other):6.2f}%)")
-
-    print("\n--- Method Used Breakdown ---")
-    for method, cnt in used_counts.most_common():
-        print(f"{method:20s} {cnt:6d} ({pct(cnt):6.2f}%)")
-
-    if show_fail_reasons_top_n and reason_counts:
-        print(f"\n--- Top Reasons (top {show_fail_reasons_top_n}) ---")
-        for reason, cnt in reason_counts.most_common(show_fail_reasons_top_n):
-            print(f"{cnt:6d} ({pct(cnt):6.2f}%)  {reason}")
-
-    print(f"\nElapsed: {elapsed:.2f}s")
+    # ---- summary ----
+    summary.print(show_fail_reasons_top_n)
+
+    breakers = host_guard.summary()
+    if breakers:
+        print("\n--- Rate Limits / Circuit Breakers ---")
+        for host, st in sorted(breakers.items(), key=lambda x: x[1]["rejected"], reverse=True):
+            print(f"{host:25s} state={st['state']:<9} opened={st['times_opened']:3d} "
+                  f"deferred={st['rejected']:5d} rate_limited={st['rate_limited']:5d} "
+                  f"ok={st['successes']:5d} failed={st['failures']:5d}")
+
+    adaptive = [row for row in host_timeouts.summary() if row[2] is not None]
+    if adaptive:
+        print("\n--- Adaptive Timeouts (busiest hosts) ---")
+        for host, n, p99, (connect_t, read_t) in adaptive:
+            print(f"{host:25s} samples={n:6d} p99={p99:6.2f}s connect={connect_t:5.1f}s read={read_t:5.1f}s")
+
+    print_timing_tables(summary)
+
+    dead = dead_hosts.snapshot()
+    if dead:
+        print(f"\n--- Dead Hosts ({len(dead)}) ---")
+        for hostname, why in sorted(dead.items()):
+            print(f"{hostname:40s} {why}")
+    print(f"DNS cache: {dns_cache.dns_cache.hits} hits / {dns_cache.dns_cache.misses} misses")
+
+    print("\n--- Concurrency (AIMD) ---")
+    for ctl in (controller, render_limiter.controller):
+        print(f"{ctl.name}: final limit={ctl.value}")
+        for t, limit, why in ctl.timeline(since=run_started):
+            print(f"   t={t:7.1f}s  limit={limit:3d}  ({why})")
+
+    print(f"\nElapsed: {summary.elapsed:.2f}s")
     print("=" * 80 + "\n")
 
+    host_timeouts.save()
+
+    if interrupted:
+        raise KeyboardInterrupt
     return results
 
 
 if __name__ == "__main__":
-    # group_count_by_source(get_links(50000))
+    # print_source_breakdown(source_breakdown('internships'))
     '''
         Good: [
             'https://jobs.dayforcehcm.com/en-US/ggg/GenesisGlobalGroupClientCareerSite/jobs/8693',
@@ -0,0 +1,304 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+metrics.py is a small in-process metrics registry (counters, gauges, histograms) rendered in the Prometheus text
+format by the /metrics route.
+
+Updates are a dict lookup and an add under a per-metric lock, so they are cheap enough for the link check hot path.
+Every process has its own registry: each gunicorn worker reports what it served itself, and the cleaning job (a
+separate process) can write its registry to a file for a textfile collector at the end of a run (write_textfile).
+
+Label values that could grow without bound (hosts) are capped at MAX_SERIES series per metric; anything past the cap
+is counted under "other".
+"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+MAX_SERIES = int(os.getenv('METRICS_MAX_SERIES', '300'))
+OVERFLOW = "other"
+
+# Seconds, from a fast cached answer to a full Playwright render
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), max_series=MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        self.max_series = max_series
+        self.lock = threading.Lock()
+        self.series = {}
+        self.functions = {}
+
+    def _key(self, labels):
+        # Caller holds self.lock
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        if key not in self.series and len(self.series) >= self.max_series:
+            key = (OVERFLOW,) * len(self.labelnames)
+        return key
+
+    def set_function(self, fn, **labels):
+        """
+        Reads this series from fn() at render time instead (e.g. a queue's current depth, or a count an object
+        already keeps).
+        """
+        with self.lock:
+            self.functions[tuple(str(labels.get(n, "")) for n in self.labelnames)] = fn
+
+    def _values(self):
+        with self.lock:
+            values = dict(self.series)
+            functions = dict(self.functions)
+
+        for key, fn in functions.items():
+            try:
+                values[key] = fn()
+            except Exception:
+                continue  # a broken callback must not take the whole scrape down
+        return sorted((key, value) for key, value in values.items() if value is not None)
+
+    def samples(self):
+        """
+        [(suffix, label values, extra labels, value)] for rendering.
+        """
+        return [("", key, (), value) for key, value in self._values()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        with self.lock:
+            key = self._key(labels)
+            self.series[key] = self.series.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.series[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        with self.lock:
+            key = self._key(labels)
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS, max_series=MAX_SERIES):
+        super().__init__(name, documentation, labels, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            key = self._key(labels)
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self.lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in sorted(self.series.items())]
+
+        out = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                out.append(("_bucket", key, (("le", _format_value(bound)),), cumulative))
+            out.append(("_sum", key, (), total))
+            out.append(("_count", key, (), cumulative))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing  # re-imported module (e.g. the Flask reloader): keep the live one
+            self.metrics[metric.name] = metric
+            return metric
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labels=()):
+    return REGISTRY.register(Counter(name, documentation, labels))
+
+
+def gauge(name, documentation, labels=()):
+    return REGISTRY.register(Gauge(name, documentation, labels))
+
+
+def histogram(name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labels, buckets))
+
+
+def render():
+    return REGISTRY.render()
+
+
+def write_textfile(path):
+    """
+    Writes the registry to path atomically (for node_exporter's textfile collector or a log shipper).
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+# ============================================================
+# Hot path metrics
+# ============================================================
+
+LINK_CHECKS = counter(
+    "rezify_link_checks_total", "Link checks by the detector that decided them and the decision",
+    ("detector", "decision"),
+)
+LINK_CHECK_SECONDS = histogram(
+    "rezify_link_check_seconds", "Wall time of one check_single_link call", ("detector",),
+)
+LINK_CHECK_DEFERRALS = counter(
+    "rezify_link_check_deferrals_total",
+    "Parallel link checks held back by their host's rate limit (requeued) or open circuit breaker (skipped)",
+    ("reason",),
+)
+LINK_CHECKS_ABANDONED = counter(
+    "rezify_link_checks_abandoned_total",
+    "Parallel link checks still running when their batch hit its deadline or its consumer stopped (they are cancelled "
+    "and wind down in the background)",
+    ("reason",),
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "rezify_http_request_seconds", "Time of one http_get call (redirects included) per source domain", ("host",),
+)
+HTTP_ERRORS = counter(
+    "rezify_http_errors_total", "http_get calls that raised, by exception type", ("error",),
+)
+BROWSER_RENDERS = counter(
+    "rezify_browser_renders_total", "Playwright / Oracle page renders by outcome", ("kind", "outcome"),
+)
+BROWSER_RENDER_SECONDS = histogram(
+    "rezify_browser_render_seconds", "Time of one page render, pool round trip included", ("kind",),
+)
+BROWSER_POOL_IN_FLIGHT = gauge(
+    "rezify_browser_pool_in_flight", "Renders this process has waiting on the browser pool",
+)
+QUEUE_DEPTH = gauge(
+    "rezify_queue_depth", "Current depth of this process's work queues", ("queue",),
+)
+ADMISSION_DECISIONS = counter(
+    "rezify_admission_requests_total", "Requests admitted / rejected by /check_job admission control", ("outcome",),
+)
+RESULT_CACHE_LOOKUPS = counter(
+    "rezify_result_cache_lookups_total", "/check_job result cache lookups by status", ("status",),
+)
+DB_STATEMENT_SECONDS = histogram(
+    "rezify_db_statement_seconds", "Time of one SQL statement, by the cleaning phase that ran it", ("phase",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+
+# ============================================================
+# Cleaning phases / DB statement timing
+# ============================================================
+
+_local = threading.local()
+
+
+def current_phase():
+    return getattr(_local, 'phase', None) or "other"
+
+
+@contextmanager
+def phase(name):
+    """
+    Labels the SQL statements run inside the block (on this thread) with the cleaning phase `name`.
+    """
+    previous = getattr(_local, 'phase', None)
+    _local.phase = name
+    try:
+        yield
+    finally:
+        _local.phase = previous
+
+
+def instrument_engine(engine):
+    """
+    Times every statement run on engine into DB_STATEMENT_SECONDS under the current phase.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        DB_STATEMENT_SECONDS.observe(time.perf_counter() - started, phase=current_phase())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+from backend.host_throttle import is_failed_check
+
+"""
+result_cache.py contains the TTL result cache with single-flight coalescing used by /check_job.
+
+The same posting URL is often checked many times within minutes, and each check can launch Chromium. Results are
+cached per normalized URL for a TTL, and concurrent checks of the same URL share one in-flight computation instead
+of each running the whole check_single_link pipeline.
+"""
+
+RESULT_CACHE_TTL = 600
+RESULT_CACHE_MAX_ENTRIES = 5000
+
+# Cache statuses returned with each result (sent back as the X-Cache header)
+HIT = "HIT"
+MISS = "MISS"
+COALESCED = "COALESCED"
+BYPASS = "BYPASS"
+
+
+def normalize_url(url):
+    """
+    Returns the cache key for a URL: trimmed, scheme/host lowercased, default port and fragment dropped.
+    """
+    u = (url or "").strip()
+    try:
+        parts = urlsplit(u)
+    except ValueError:
+        return u
+
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "https" and netloc.endswith(":443")) or (scheme == "http" and netloc.endswith(":80")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of check results with request coalescing.
+
+    :param ttl: Seconds a result stays fresh
+    :param max_entries: LRU bound on cached results
+    :param key_fn: Maps a URL to its cache key
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES, key_fn=normalize_url):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key_fn = key_fn
+        self.entries = OrderedDict()  # key -> (stored_at, result)
+        self.in_flight = {}  # key -> _Call
+        self.lock = threading.Lock()
+        self.stats = {HIT: 0, MISS: 0, COALESCED: 0, BYPASS: 0}
+
+    def lookup(self, key):
+        """
+        Returns (result, age_seconds) for a fresh entry, or (None, None).
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None, None
+            stored_at, result = entry
+            if now - stored_at > self.ttl:
+                del self.entries[key]
+                return None, None
+            self.entries.move_to_end(key)
+            return result, now - stored_at
+
+    def cached(self, url):
+        """
+        Returns (result, age_seconds) for a fresh cached result of url, counted as a HIT, or (None, None). For callers
+        that serve hits before deciding whether to compute (see /check_job), so those hits show up in stats too.
+        """
+        result, age = self.lookup(self.key_fn(url))
+        if result is not None:
+            with self.lock:
+                self.stats[HIT] += 1
+        return result, age
+
+    def store(self, key, result):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_compute(self, url, compute, bypass=False):
+        """
+        Returns (result, cache_status, age_seconds).
+
+        :param url: URL to check
+        :param compute: Function(url) -> result, run at most once at a time per key
+        :param bypass: Skip the cached value and compute a fresh one (still joins a computation already in flight,
+                       and the fresh result replaces the cached one)
+        """
+        key = self.key_fn(url)
+
+        if not bypass:
+            result, age = self.cached(url)
+            if result is not None:
+                return result, HIT, age
+
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            with self.lock:
+                self.stats[COALESCED] += 1
+            if call.error is not None:
+                raise call.error
+            return call.result, COALESCED, 0.0
+
+        try:
+            call.result = compute(url)
+            # Errors and timeouts aren't cached, the next request should try again
+            if not is_failed_check(call.result):
+                self.store(key, call.result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.event.set()
+
+        status = BYPASS if bypass else MISS
+        with self.lock:
+            self.stats[status] += 1
+        return call.result, status, 0.0
@@ -0,0 +1,338 @@
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from backend import stage_timings
+
+"""
+result_sinks.py contains the destinations run_link_checks() / run_link_checks_parallel() stream their results to.
+
+Every result is handed to each sink as soon as its check finishes (sink.write(idx, url, result)), so a 100k-link run
+doesn't have to hold its results in memory and an interrupted run keeps everything it finished:
+
+  - JsonlSink / CsvSink append to a file, flushed every FLUSH_EVERY results
+  - PostgresCopySink batches rows into the link_check_results table with COPY
+  - RunningSummary keeps the end-of-run summary (counts, top reasons, timing percentiles) in constant memory
+  - ProgressSink prints a live progress line (done / total, links/s, ETA, KEEP / DELETE so far)
+
+Sinks are closed (flushed) when the run ends, including when it is interrupted.
+"""
+
+FLUSH_EVERY = 100
+CSV_FIELDS = ["index", "final_url", "decision", "used", "reason"] + \
+             ["total_ms"] + [f"{s}_ms" for s in stage_timings.STAGES] + ["bytes"]
+
+
+class ResultSink(ABC):
+    @abstractmethod
+    def write(self, idx, url, result):
+        ...
+
+    def close(self):
+        pass
+
+
+class JsonlSink(ResultSink):
+    """
+    One JSON object per line: {"index": idx, ...result}. Opened in append mode, so a resumed run adds to the same
+    file (see completed_urls).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def write(self, idx, url, result):
+        line = json.dumps({"index": idx, **result}, default=str) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.pending += 1
+            if self.pending >= FLUSH_EVERY:
+                self.file.flush()
+                self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class CsvSink(ResultSink):
+    """
+    CSV_FIELDS columns (stage timings flattened), header written when the file is new.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(CSV_FIELDS)
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def write(self, idx, url, result):
+        timings = result.get("timings") or {}
+        row = [idx, result.get("final_url") or url, result.get("decision"), result.get("used"), result.get("reason")]
+        row += [timings.get(field) for field in CSV_FIELDS[5:]]
+        with self.lock:
+            self.writer.writerow(row)
+            self.pending += 1
+            if self.pending >= FLUSH_EVERY:
+                self.file.flush()
+                self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class PostgresCopySink(ResultSink):
+    """
+    Buffers results and loads them into the link_check_results table with COPY, batch_size rows at a time (one round
+    trip per batch instead of one INSERT per result). Rows carry run_id, so several runs can share the table
+    (created by schema.sql).
+
+    A batch that fails to load is logged and kept (up to max_retained rows, oldest dropped first) instead of failing
+    the check that happened to fill it; close() retries everything kept along with the last batch.
+    """
+
+    def __init__(self, run_id=None, batch_size=1000, max_retained=50000):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.batch_size = batch_size
+        self.max_retained = max_retained
+        self.buffer = []
+        self.retained = []  # rows from batches that failed to load
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def write(self, idx, url, result):
+        timings = result.get("timings") or {}
+        row = [
+            self.run_id, idx, result.get("final_url") or url, result.get("decision"), result.get("used"),
+            result.get("reason"), timings.get("total_ms"), json.dumps(timings) if timings else None,
+        ]
+        with self.lock:
+            self.buffer.append(row)
+            if len(self.buffer) < self.batch_size:
+                return
+            rows, self.buffer = self.buffer, []
+        try:
+            self._copy(rows)
+        except Exception as e:
+            logging.error(f"COPY of {len(rows)} link check results failed, keeping them for close(): "
+                          f"{type(e).__name__}: {e}")
+            with self.lock:
+                self.retained.extend(rows)
+                overflow = len(self.retained) - self.max_retained
+                if overflow > 0:
+                    del self.retained[:overflow]
+                    self.dropped += overflow
+
+    def _copy(self, rows):
+        from backend.database_config import get_engine
+        from backend.tables import link_check_results_table
+
+        data = io.StringIO()
+        csv.writer(data).writerows(rows)
+        data.seek(0)
+
+        conn = get_engine().raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.copy_expert(
+                f"COPY {link_check_results_table} (run_id, idx, final_url, decision, used, reason, total_ms, timings) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                data,
+            )
+            conn.commit()
+            self.written += len(rows)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def close(self):
+        with self.lock:
+            rows, self.retained, self.buffer = self.retained + self.buffer, [], []
+            dropped = self.dropped
+        if dropped:
+            logging.error(f"{dropped} link check results of run {self.run_id} were dropped after failed COPYs")
+        if rows:
+            try:
+                self._copy(rows)
+            except Exception as e:
+                logging.error(f"Final COPY of {len(rows)} link check results failed: {type(e).__name__}: {e}")
+                raise
+
+
+class RunningSummary(ResultSink):
+    """
+    Counts, top reasons and stage timing percentiles (per detector and per domain) kept in constant memory. Reasons
+    are counted with the space-saving algorithm: the top ones are exact unless there are more than max_reasons
+    distinct reasons, in which case counts are upper bounds.
+    """
+
+    def __init__(self, total, domain_key, max_reasons=500):
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+        self.decisions = Counter()
+        self.used = Counter()
+        self.reasons = Counter()
+        self.max_reasons = max_reasons
+        self.by_detector = stage_timings.TimingSummary(lambda r: r.get("used") or "unknown")
+        self.by_domain = stage_timings.TimingSummary(lambda r: domain_key(r.get("final_url") or ""))
+        self.lock = threading.Lock()
+
+    def write(self, idx, url, result):
+        decision = (result.get("decision") or "UNKNOWN").upper()
+        used = (result.get("used") or "unknown").lower()
+        reason = (result.get("reason") or "").strip()
+
+        with self.lock:
+            self.done += 1
+            self.decisions[decision] += 1
+            self.used[used] += 1
+            if reason:
+                if reason in self.reasons or len(self.reasons) < self.max_reasons:
+                    self.reasons[reason] += 1
+                else:
+                    # Space-saving: the new reason takes over the rarest one's slot (and count)
+                    rarest, count = min(self.reasons.items(), key=lambda kv: kv[1])
+                    del self.reasons[rarest]
+                    self.reasons[reason] = count + 1
+            self.by_detector.add(result)
+            self.by_domain.add(result)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def print(self, show_fail_reasons_top_n=10):
+        """
+        Prints the counts part of the end-of-run summary (percentages are of the links finished).
+        """
+        done = self.done
+
+        def pct(n):  # safe percentage helper
+            return (n / done * 100.0) if done else 0.0
+
+        kept = self.decisions.get("KEEP", 0)
+        deleted = self.decisions.get("DELETE", 0)
+
+        print("\n" + "=" * 80)
+        print("SUMMARY" if done == self.total else f"SUMMARY (interrupted after {done} of {self.total})")
+        print("=" * 80)
+        print(f"Total:   {done}")
+        print(f"KEEP:    {kept:6d} ({pct(kept):6.2f}%)")
+        print(f"DELETE:  {deleted:6d} ({pct(deleted):6.2f}%)")
+        other = done - kept - deleted
+        if other:
+            print(f"OTHER:   {other:6d} ({pct(other):6.2f}%)")
+
+        print("\n--- Method Used Breakdown ---")
+        for method, cnt in self.used.most_common():
+            print(f"{method:20s} {cnt:6d} ({pct(cnt):6.2f}%)")
+
+        if show_fail_reasons_top_n and self.reasons:
+            print(f"\n--- Top Reasons (top {show_fail_reasons_top_n}) ---")
+            for reason, cnt in self.reasons.most_common(show_fail_reasons_top_n):
+                print(f"{cnt:6d} ({pct(cnt):6.2f}%)  {reason}")
+
+
+class ProgressSink(ResultSink):
+    """
+    Rewrites one progress line on stream (stderr by default) at most every `interval` seconds.
+    """
+
+    def __init__(self, total, interval=1.0, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.started = time.monotonic()
+        self.last_print = 0.0
+        self.done = 0
+        self.decisions = Counter()
+        self.lock = threading.Lock()
+
+    def write(self, idx, url, result):
+        with self.lock:
+            self.done += 1
+            self.decisions[(result.get("decision") or "UNKNOWN").upper()] += 1
+            now = time.monotonic()
+            if now - self.last_print >= self.interval or self.done == self.total:
+                self.last_print = now
+                self._print(now)
+
+    def _print(self, now):
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        self.stream.write(
+            f"\r{self.done}/{self.total} ({self.done / self.total:.1%}) | {rate:.1f} links/s | ETA {eta:,.0f}s | "
+            f"KEEP {self.decisions.get('KEEP', 0)} DELETE {self.decisions.get('DELETE', 0)}   "
+        )
+        self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            if self.done and self.done != self.total:
+                self._print(time.monotonic())  # interrupted: show where it stopped
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def as_sinks(sink):
+    """
+    None, a sink or a list of sinks -> list of sinks.
+    """
+    if sink is None:
+        return []
+    if isinstance(sink, ResultSink):
+        return [sink]
+    return list(sink)
+
+
+def close_sinks(sinks):
+    """
+    Closes every sink, even if one fails; re-raises the first error afterwards.
+    """
+    first_error = None
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            first_error = first_error or e
+    if first_error is not None:
+        raise first_error
+
+
+def completed_urls(path):
+    """
+    final_urls already in a JsonlSink file, so an interrupted run can be resumed with the remaining links only.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["final_url"])
+            except (ValueError, KeyError, TypeError):
+                continue  # a line cut off by the interruption
+    return done
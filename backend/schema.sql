@@ -0,0 +1,75 @@
+-- schema.sql creates the tables the link checker and the cleaning job added on top of the existing schema (table
+-- names are in tables.py). The application never creates tables itself; run this once per deploy that changes it:
+--
+--     psql "$SQL_DATABASE_URL" -f backend/schema.sql
+--
+-- Every statement is idempotent, so running it again is safe.
+
+
+-- Asynchronous /check_job/submit checks (check_queue.py)
+CREATE TABLE IF NOT EXISTS link_checks (
+    id TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    started_at TIMESTAMP,
+    lease_until TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+-- Tables created before checks had leases
+ALTER TABLE link_checks ADD COLUMN IF NOT EXISTS started_at TIMESTAMP;
+ALTER TABLE link_checks ADD COLUMN IF NOT EXISTS lease_until TIMESTAMP;
+ALTER TABLE link_checks ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+
+-- Performance details of each cleaning run, one row per history row (record_jobs_cleaning_hist)
+CREATE TABLE IF NOT EXISTS cleaning_run_details (
+    id SERIAL PRIMARY KEY,
+    time TIMESTAMP NOT NULL,
+    job_type TEXT NOT NULL,
+    internship_hist_id INTEGER REFERENCES internship_cleaning_hist (id) ON DELETE CASCADE,
+    entry_level_hist_id INTEGER REFERENCES entry_level_cleaning_hist (id) ON DELETE CASCADE,
+    duration_seconds DOUBLE PRECISION,
+    jobs INTEGER,
+    links_checked INTEGER,
+    links_per_second DOUBLE PRECISION,
+    phase_seconds TEXT,
+    error_count INTEGER,
+    unknown_count INTEGER,
+    detectors TEXT
+);
+-- Tables created before the history ids were added
+ALTER TABLE cleaning_run_details
+    ADD COLUMN IF NOT EXISTS internship_hist_id INTEGER REFERENCES internship_cleaning_hist (id) ON DELETE CASCADE;
+ALTER TABLE cleaning_run_details
+    ADD COLUMN IF NOT EXISTS entry_level_hist_id INTEGER REFERENCES entry_level_cleaning_hist (id) ON DELETE CASCADE;
+CREATE INDEX IF NOT EXISTS cleaning_run_details_job_type_time_idx ON cleaning_run_details (job_type, time);
+CREATE INDEX IF NOT EXISTS cleaning_run_details_internship_hist_id_idx ON cleaning_run_details (internship_hist_id);
+CREATE INDEX IF NOT EXISTS cleaning_run_details_entry_level_hist_id_idx ON cleaning_run_details (entry_level_hist_id);
+
+
+-- Per-host latency histograms the adaptive timeouts are derived from (host_timeouts.py)
+CREATE TABLE IF NOT EXISTS link_latency_histograms (
+    host TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    counts TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (host, kind)
+);
+
+
+-- Link check results streamed by PostgresCopySink (result_sinks.py)
+CREATE TABLE IF NOT EXISTS link_check_results (
+    run_id TEXT NOT NULL,
+    idx INTEGER,
+    final_url TEXT,
+    decision TEXT,
+    used TEXT,
+    reason TEXT,
+    total_ms DOUBLE PRECISION,
+    timings TEXT,
+    checked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS link_check_results_run_id_idx ON link_check_results (run_id);
@@ -1,17 +1,98 @@
-import sentry_sdk
+import json
 import os
-from sentry_sdk.integrations.flask import FlaskIntegration
+import tempfile
+import time
+
+"""
+sentry_config.py sets up Sentry. sentry_sdk is imported inside init_sentry() so importing this module stays cheap;
+sample rates come from SENTRY_TRACES_SAMPLE_RATE / SENTRY_PROFILE_SAMPLE_RATE (default 1.0, as before).
+
+The traces sample rate can be changed at runtime with set_traces_sample_rate() (the /metrics/sentry_sampling route).
+The new rate is written to SENTRY_SAMPLING_PATH, which every process on the machine re-reads at most every
+SAMPLING_RECHECK_SECONDS, so all gunicorn workers follow it, not just the one that served the request. The file is
+local to the dyno, so the override only reaches the dyno that served the request and is lost when that dyno restarts
+(Heroku cycles dynos daily, and every Scheduler run gets a fresh one). To change the rate everywhere, and for good, set
+SENTRY_TRACES_SAMPLE_RATE in the app's config vars. Profiles are only taken for sampled transactions
+(profile_lifecycle="trace"), so lowering the traces rate lowers profiling too.
+"""
+
+SAMPLING_PATH = os.getenv('SENTRY_SAMPLING_PATH', os.path.join(tempfile.gettempdir(), 'rezify_sentry_sampling.json'))
+SAMPLING_RECHECK_SECONDS = 10
+
+_initialized_pid = None
+_traces_sample_rate = float(os.getenv('SENTRY_TRACES_SAMPLE_RATE', '1.0'))
+_checked_at = 0.0
+_sampling_mtime = None
+
+
+def traces_sample_rate():
+    """
+    The current traces sample rate: the runtime override in SAMPLING_PATH if there is one, else the env default.
+    """
+    global _traces_sample_rate, _checked_at, _sampling_mtime
+    now = time.monotonic()
+    if now - _checked_at < SAMPLING_RECHECK_SECONDS:
+        return _traces_sample_rate
+    _checked_at = now
+
+    try:
+        mtime = os.stat(SAMPLING_PATH).st_mtime
+        if mtime != _sampling_mtime:
+            with open(SAMPLING_PATH) as f:
+                _traces_sample_rate = float(json.load(f)["traces_sample_rate"])
+            _sampling_mtime = mtime
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # no override (or a half-written one): keep the current rate
+    return _traces_sample_rate
+
+
+def set_traces_sample_rate(rate):
+    """
+    Sets the traces sample rate (0.0 - 1.0) for every process on this dyno, until it restarts. Raises ValueError if
+    out of range.
+    """
+    global _traces_sample_rate, _checked_at
+    rate = float(rate)
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError("traces_sample_rate must be between 0 and 1")
+
+    tmp_path = f"{SAMPLING_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"traces_sample_rate": rate}, f)
+    os.replace(tmp_path, SAMPLING_PATH)
+
+    _traces_sample_rate = rate
+    _checked_at = 0.0  # pick up our own write (and its mtime) on the next call
+    return rate
+
+
+def _traces_sampler(sampling_context):
+    # Keep distributed traces whole: follow the caller's decision when there is one
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        return float(parent_sampled)
+    return traces_sample_rate()
+
 
 def init_sentry():
+    """
+    Initializes Sentry once per process (safe to call again, e.g. from a gunicorn post_fork hook and a request).
+    """
+    global _initialized_pid
+    if _initialized_pid == os.getpid():
+        return
+
+    import sentry_sdk
+    from sentry_sdk.integrations.flask import FlaskIntegration
 
     sentry_sdk.init(
         dsn=os.getenv('SENTRY_DSN'),
         integrations=[FlaskIntegration()],
         environment="cleaning",
         send_default_pii=True,
-        traces_sample_rate=1.0,
-        profile_session_sample_rate=1.0,
+        traces_sampler=_traces_sampler,
+        profile_session_sample_rate=float(os.getenv('SENTRY_PROFILE_SAMPLE_RATE', '1.0')),
         profile_lifecycle="trace",
         enable_logs=True,
     )
-
+    _initialized_pid = os.getpid()
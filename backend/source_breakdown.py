@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from backend.database_config import Session
+from backend.tables import internships_table, entry_level_table
+
+"""
+source_breakdown.py counts job postings per source domain in the database instead of in Python.
+
+group_count_by_source(get_links(50000)) pulls a random sample of URLs over the wire and parses each one. Here the
+same normalization as extract_base_domain() (host, lowercased, no credentials / port / "www.", last two labels) is a
+SQL expression, so Postgres groups the whole table and only one row per domain comes back. Results are cached per
+process for SOURCE_BREAKDOWN_TTL seconds.
+"""
+
+SOURCE_BREAKDOWN_TTL = float(os.getenv('SOURCE_BREAKDOWN_TTL', '300'))
+
+TABLES = {'internships': internships_table, 'entry_level': entry_level_table}
+
+# Mirrors extract_base_domain(): optional scheme, optional user@, then the host up to a port / path / query
+_HOST_SQL = r"regexp_replace(lower(substring(final_url from '^\s*(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?(?:[^@/?#]*@)?([^:/?#]+)')), '^www\.', '')"
+BASE_DOMAIN_SQL = f"COALESCE(NULLIF(COALESCE(substring({_HOST_SQL} from '([^.]+\\.[^.]+)\\.?$'), {_HOST_SQL}), ''), 'unknown')"
+
+_cache = {}  # args -> (stored_at, result)
+_cache_lock = threading.Lock()
+
+
+def source_breakdown(table='internships', days=None, per_day=False, examples_per_source=3, ttl=SOURCE_BREAKDOWN_TTL):
+    """
+    Postings per source domain over the whole table, in group_count_by_source()'s shape:
+
+      {"total": int, "counts": {domain: n} (descending), "percentages": {domain: pct}, "examples": {domain: [url]}}
+
+    plus, with per_day=True, "by_day": {"YYYY-MM-DD": {domain: n}} bucketed by date_posted.
+
+    :param table: 'internships' or 'entry_level'
+    :param days: Only postings from the last `days` days (by date_posted); the whole table when None
+    :param ttl: Seconds a cached result is reused (0 to always query)
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r} (expected one of {', '.join(TABLES)})")
+
+    key = (table, days, per_day, examples_per_source)
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+    result = _query_breakdown(TABLES[table], days, per_day, examples_per_source)
+
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), result)
+    return result
+
+
+def _query_breakdown(table, days, per_day, examples_per_source):
+    where = "final_url IS NOT NULL"
+    params = {'examples': examples_per_source}
+    if days is not None:
+        where += " AND date_posted >= :since"
+        params['since'] = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    session = Session
+    try:
+        rows = session.execute(
+            text(f'''
+                WITH d AS (
+                    SELECT {BASE_DOMAIN_SQL} AS domain, final_url,
+                           ROW_NUMBER() OVER (PARTITION BY {BASE_DOMAIN_SQL} ORDER BY id DESC) AS rn
+                    FROM {table}
+                    WHERE {where}
+                )
+                SELECT domain, COUNT(*) AS n, ARRAY_AGG(final_url) FILTER (WHERE rn <= :examples) AS examples
+                FROM d
+                GROUP BY domain
+                ORDER BY n DESC, domain
+            '''),
+            params
+        ).fetchall()
+
+        day_rows = []
+        if per_day:
+            day_rows = session.execute(
+                text(f'''
+                    SELECT CAST(date_posted AS DATE) AS day, {BASE_DOMAIN_SQL} AS domain, COUNT(*) AS n
+                    FROM {table}
+                    WHERE {where}
+                    GROUP BY 1, 2
+                    ORDER BY 1, 3 DESC
+                '''),
+                params
+            ).fetchall()
+    finally:
+        session.remove()
+
+    total = sum(row[1] for row in rows)
+    counts = {row[0]: row[1] for row in rows}
+    result = {
+        "total": total,
+        "counts": counts,
+        "percentages": {dom: (cnt / total * 100 if total else 0.0) for dom, cnt in counts.items()},
+        "examples": {row[0]: list(row[2] or []) for row in rows},
+    }
+
+    if per_day:
+        by_day = {}
+        for day, domain, n in day_rows:
+            by_day.setdefault(day.isoformat() if day else "unknown", {})[domain] = n
+        result["by_day"] = by_day
+
+    return result
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def print_source_breakdown(result, min_count=100):
+    """
+    Prints a breakdown dict (from source_breakdown() or group_count_by_source()): every domain with more than
+    min_count postings, with its examples.
+    """
+    print("\n=== Job Source Breakdown ===")
+    print(f"Total URLs: {result['total']}\n")
+
+    for domain, count in result["counts"].items():
+        if count > min_count:
+            pct = result["percentages"][domain]
+            print(f"{domain:25s} {count:7d} ({pct:6.2f}%)")
+
+            for ex in result["examples"].get(domain, []):
+                print(f"   - {ex}")
+            print()
+
+    print("=== End Breakdown ===\n")
@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+stage_timings.py records where the time of one link check goes.
+
+check_single_link() starts a recorder for its thread; the layers underneath add to it as they run: the DNS cache
+(dns), the pooled HTTP connections (connect, net of DNS), http_get() (ttfb, download and redirect hops, plus bytes),
+response_text() and the parse_* functions (parse: decoding the body and building the view a detector searches, e.g.
+the soup, visible text or JSON; match: the decision made on it) and the Playwright/Oracle renders (render). Time
+spent unwrapping Appcast / grnh.se links is all booked as redirect. With no recorder active every call here is a
+cheap no-op.
+"""
+
+STAGES = ("redirect", "dns", "connect", "ttfb", "download", "parse", "match", "render")
+
+_local = threading.local()
+
+
+class StageRecorder:
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.attribute_to = None  # when set, every stage is booked under this one
+
+    def add(self, stage, seconds):
+        stage = self.attribute_to or stage
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + max(0.0, seconds)
+
+    def as_dict(self):
+        """
+        {"total_ms", "<stage>_ms" for each stage, "bytes"}
+        """
+        timings = {"total_ms": round((time.perf_counter() - self.started) * 1000, 1)}
+        for stage, seconds in self.seconds.items():
+            timings[f"{stage}_ms"] = round(seconds * 1000, 1)
+        timings["bytes"] = self.bytes
+        return timings
+
+
+def start():
+    """
+    Starts a fresh recorder for this thread and returns it.
+    """
+    recorder = StageRecorder()
+    _local.recorder = recorder
+    return recorder
+
+
+def stop():
+    _local.recorder = None
+
+
+def current():
+    return getattr(_local, 'recorder', None)
+
+
+def add(stage, seconds):
+    recorder = current()
+    if recorder is not None:
+        recorder.add(stage, seconds)
+
+
+def add_bytes(n):
+    recorder = current()
+    if recorder is not None:
+        recorder.bytes += n
+
+
+@contextmanager
+def stage(name):
+    recorder = current()
+    if recorder is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - started)
+
+
+@contextmanager
+def attribute(name):
+    """
+    Books everything recorded inside the block under `name` (e.g. the requests made to resolve a redirect wrapper).
+    """
+    recorder = current()
+    if recorder is None or recorder.attribute_to is not None:
+        yield
+        return
+    recorder.attribute_to = name
+    try:
+        yield
+    finally:
+        recorder.attribute_to = None
+
+
+# Log-spaced bucket upper bounds (25% apart): ms from 0.01ms to ~20min, bytes from 64B to ~1GiB
+_MS_BUCKETS = [0.01 * (1.25 ** i) for i in range(90)]
+_BYTE_BUCKETS = [64 * (1.25 ** i) for i in range(75)]
+
+
+class _LogHistogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def quantile(self, q, n):
+        target, running = q * n, 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target and running:
+                return self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+        return 0.0
+
+
+class TimingSummary:
+    """
+    Groups results that carry "timings" by key(result). Each group keeps fixed log-bucket histograms instead of every
+    result, so memory stays flat however many results go through. Percentiles are bucket upper bounds (within 25%).
+    Groups past max_groups are counted under "other".
+    """
+
+    def __init__(self, key, max_groups=200):
+        self.key = key
+        self.max_groups = max_groups
+        self.groups = {}
+
+    def add(self, result):
+        timings = (result or {}).get("timings")
+        if not timings:
+            return
+
+        group = self.key(result)
+        stats = self.groups.get(group)
+        if stats is None:
+            if len(self.groups) >= self.max_groups:
+                group = "other"
+                stats = self.groups.get(group)
+            if stats is None:
+                stats = self.groups[group] = {
+                    "n": 0,
+                    "total_sum": 0.0,
+                    "total": _LogHistogram(_MS_BUCKETS),
+                    "bytes": _LogHistogram(_BYTE_BUCKETS),
+                    **{stage_name: _LogHistogram(_MS_BUCKETS) for stage_name in STAGES},
+                }
+
+        stats["n"] += 1
+        stats["total_sum"] += timings.get("total_ms", 0.0)
+        stats["total"].observe(timings.get("total_ms", 0.0))
+        stats["bytes"].observe(timings.get("bytes", 0))
+        for stage_name in STAGES:
+            stats[stage_name].observe(timings.get(f"{stage_name}_ms", 0.0))
+
+    def rows(self):
+        """
+        Rows sorted by total time spent, each {"group", "n", "total_sum", "total_p50", "total_p95", "total_p99",
+        "<stage>_p50", "<stage>_p95", "bytes_p50"} (ms / bytes).
+        """
+        rows = []
+        for group, stats in self.groups.items():
+            n = stats["n"]
+            row = {"group": group, "n": n, "total_sum": stats["total_sum"]}
+            for q in (50, 95, 99):
+                row[f"total_p{q}"] = stats["total"].quantile(q / 100, n)
+            for stage_name in STAGES:
+                row[f"{stage_name}_p50"] = stats[stage_name].quantile(0.50, n)
+                row[f"{stage_name}_p95"] = stats[stage_name].quantile(0.95, n)
+            row["bytes_p50"] = stats["bytes"].quantile(0.50, n)
+            rows.append(row)
+
+        rows.sort(key=lambda r: r["total_sum"], reverse=True)
+        return rows
@@ -0,0 +1,48 @@
+from flask.sessions import SessionInterface
+
+"""
+stateless_session.py contains the session interface that keeps Flask-Session away from stateless routes.
+
+Flask-Session's SQLAlchemy backend reads the session row on every request that carries a session cookie and may
+write it back afterwards. Routes like /check_job never touch the session, so for them that's a wasted Postgres round
+trip (and a pooled connection held) per call. Requests to the configured paths get Flask's null session instead:
+nothing is loaded, nothing is saved, and no cookie is set.
+"""
+
+
+class StatelessPathsSessionInterface(SessionInterface):
+    """
+    Wraps the real session interface and bypasses it for some paths.
+
+    :param wrapped: The interface Flask-Session installed (app.session_interface)
+    :param prefixes: Path prefixes that never use the session, matched on whole segments ("/check_job" matches
+                     "/check_job" and "/check_job/abc", not "/check_jobs")
+    :param extra: Optional function(path) -> bool for stateless paths that don't fit a prefix
+    """
+
+    def __init__(self, wrapped, prefixes, extra=None):
+        self.wrapped = wrapped
+        self.prefixes = tuple(p.rstrip("/") for p in prefixes)
+        self.extra = extra
+
+    def is_stateless(self, path):
+        for prefix in self.prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return True
+        return bool(self.extra and self.extra(path))
+
+    def open_session(self, app, request):
+        if self.is_stateless(request.path):
+            return self.make_null_session(app)
+        return self.wrapped.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        # Flask skips this for null sessions, so only sessions opened by the wrapped interface get here
+        return self.wrapped.save_session(app, session, response)
+
+    def is_null_session(self, obj):
+        return self.wrapped.is_null_session(obj) or super().is_null_session(obj)
+
+    def __getattr__(self, name):
+        # Anything else Flask-Session exposes on its interface (e.g. regenerate) still works
+        return getattr(self.wrapped, name)
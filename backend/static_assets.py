@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used on its own without it
+    brotli = None
+
+"""
+static_assets.py serves the React build (frontend/build) from memory.
+
+At startup every file in the build is read once into a manifest along with its content type, ETag and gzip (and,
+if the brotli package is installed, brotli) variants, so a request never touches the filesystem. Precompressed
+.gz / .br files sitting next to an asset are used as-is instead of compressing at startup.
+
+CRA fingerprints everything under static/ (main.<hash>.js), so those files are cached for a year as immutable;
+everything else (index.html, manifest.json, ...) must be revalidated, which is a cheap 304 thanks to the ETag.
+The manifest isn't refreshed while running, so restart the app after rebuilding the frontend.
+"""
+
+IMMUTABLE_PREFIX = "static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+MIN_COMPRESS_SIZE = 1024  # smaller files aren't worth compressing
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
+
+def _is_compressible(content_type, path):
+    return content_type.startswith(COMPRESSIBLE_TYPES) or path.endswith(".map")
+
+
+class _Asset:
+    def __init__(self, body, content_type, etag, immutable):
+        self.content_type = content_type
+        self.etag = etag
+        self.immutable = immutable
+        self.variants = {"identity": body}  # encoding -> bytes
+
+
+class StaticAssets:
+    """
+    In-memory manifest of a static build directory.
+
+    :param root: Directory to serve (frontend/build)
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.assets = {}  # relative path ("static/js/main.x.js") -> _Asset
+        self.load()
+
+    def load(self):
+        assets = {}
+        if not os.path.isdir(self.root):
+            logging.warning(f"Static build directory {self.root} not found, serving nothing")
+            self.assets = assets
+            return
+
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith((".gz", ".br")):
+                    continue  # picked up as variants of the file they compress
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                assets[rel_path] = self._load_asset(full_path, rel_path)
+
+        self.assets = assets
+
+    def _load_asset(self, full_path, rel_path):
+        with open(full_path, "rb") as f:
+            body = f.read()
+
+        content_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        asset = _Asset(
+            body,
+            content_type,
+            etag=hashlib.sha1(body).hexdigest()[:20],
+            immutable=rel_path.startswith(IMMUTABLE_PREFIX),
+        )
+
+        if len(body) < MIN_COMPRESS_SIZE or not _is_compressible(content_type, rel_path):
+            return asset
+
+        for encoding, suffix, compress in (
+                ("br", ".br", brotli.compress if brotli else None),
+                ("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+        ):
+            if os.path.exists(full_path + suffix):
+                with open(full_path + suffix, "rb") as f:
+                    compressed = f.read()
+            elif compress is not None:
+                compressed = compress(body)
+            else:
+                continue
+            if len(compressed) < len(body):
+                asset.variants[encoding] = compressed
+
+        return asset
+
+    def __contains__(self, path):
+        return path in self.assets
+
+    def response(self, path, request):
+        """
+        Builds the response for a build-relative path, or returns None if the path isn't in the build.
+        Picks br, then gzip, then identity based on Accept-Encoding, and answers 304 when If-None-Match matches.
+        """
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        # Each encoding is a different representation, so it gets its own ETag
+        etag = asset.etag if encoding == "identity" else f"{asset.etag}-{encoding}"
+        cache_control = IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(asset.variants[encoding], mimetype=asset.content_type)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cache_control
+        if len(asset.variants) > 1:
+            response.vary.add("Accept-Encoding")
+        return response
@@ -1,4 +1,5 @@
 admin_list_table = 'admin_user_list'
+cleaning_run_details_table = 'cleaning_run_details'
 deleted_internships_ids_table = 'deleted_internship_ids'
 deleted_entry_level_ids_table = 'deleted_entry_level_ids'
 internships_cleaning_hist_table = 'internship_cleaning_hist'
@@ -6,6 +7,9 @@ entry_level_cleaning_hist_table = 'entry_level_cleaning_hist'
 internships_table = 'internships'
 entry_level_table = 'entry_level_jobs'
 jobs_data_hist_table = 'jobs_data_histv2'
+link_check_results_table = 'link_check_results'
+link_checks_table = 'link_checks'
+link_latency_table = 'link_latency_histograms'
 openai_usage_table = 'openai_usage'
 removed_jobs_global_table = 'removed_jobs_global'
 school_stats_table = 'school_stats'
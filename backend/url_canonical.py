@@ -0,0 +1,146 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+"""
+url_canonical.py maps equivalent job links to one canonical URL.
+
+The same posting shows up in many rows under different URLs: tracking parameters (?src=LinkedIn, ?source=LinkedIn,
+utm_*), a locale segment, a trailing /apply, http vs https, www or not, or a Recruitics wrapper around the real link.
+canonical_url() strips all of that so those rows share one key, and the posting is checked once.
+
+Rules are per ATS (matched on the hostname suffix). Hosts without a rule keep their query string minus known
+tracking parameters. Only transformations that can't change which posting the link points to are applied, and
+wrappers that need a network round trip to resolve (Appcast, grnh.se) are left as they are.
+"""
+
+# Query parameters that only say where the click came from
+TRACKING_PARAMS = {
+    "src", "source", "ref", "referrer", "refid", "trk", "trackingid", "gclid", "fbclid", "msclkid",
+    "gh_src", "lever-source", "lever-origin", "iis", "iisn",
+}
+TRACKING_PREFIXES = ("utm_", "mc_")
+
+LOCALE_SEGMENT = re.compile(r"^[a-z]{2}(-[a-z]{2})?$", re.IGNORECASE)
+
+
+def _is_tracking(param):
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def _strip_locale(path):
+    segments = path.split("/")
+    if len(segments) > 2 and LOCALE_SEGMENT.match(segments[1]):
+        del segments[1]
+    return "/".join(segments)
+
+
+def _strip_suffix(path, suffix):
+    return path[:-len(suffix)] if path.lower().endswith(suffix) else path
+
+
+# --- per-ATS rules: (host, path, query_pairs) -> (host, path, query_pairs) ---
+
+def _workday(host, path, query):
+    # company.wd1.myworkdayjobs.com/en-US/External/job/.../Title_JR-123[/apply]?source=LinkedIn
+    return host, _strip_suffix(_strip_locale(path), "/apply"), []
+
+
+def _greenhouse(host, path, query):
+    params = dict(query)
+    # boards.greenhouse.io/embed/job_app?for=acme&token=123 -> job-boards.greenhouse.io/acme/jobs/123
+    if path.rstrip("/") in ("/embed/job_app", "/embed/job_board") and params.get("for") and params.get("token"):
+        return "job-boards.greenhouse.io", f"/{params['for']}/jobs/{params['token']}", []
+    if host in ("boards.greenhouse.io", "job-boards.greenhouse.io"):
+        host = "job-boards.greenhouse.io"
+    # error=true marks an expired redirect target and must survive (see is_job_expired_greenhouse)
+    return host, path, [(k, v) for k, v in query if k in ("gh_jid", "error")]
+
+
+def _lever(host, path, query):
+    # jobs.lever.co/acme/<uuid>[/apply]
+    return host, _strip_suffix(path, "/apply"), []
+
+
+def _icims(host, path, query):
+    # careers-acme.icims.com/jobs/1234/some-title/job?in_iframe=1 -> /jobs/1234/job
+    m = re.match(r"^/jobs/(\d+)(/|$)", path)
+    if m:
+        return host, f"/jobs/{m.group(1)}/job", []
+    return host, path, [(k, v) for k, v in query if not _is_tracking(k)]
+
+
+def _keep_params(*names):
+    names = {n.lower() for n in names}
+
+    def rule(host, path, query):
+        return host, path, [(k, v) for k, v in query if k.lower() in names]
+    return rule
+
+
+def _drop_query(host, path, query):
+    return host, path, []
+
+
+ATS_RULES = [
+    ("myworkdayjobs.com", _workday),
+    ("myworkdaysite.com", _workday),
+    ("greenhouse.io", _greenhouse),
+    ("lever.co", _lever),
+    ("icims.com", _icims),
+    ("dayforcehcm.com", _drop_query),  # /en-US/acme/CANDIDATEPORTAL/jobs/10019?src=LinkedIn
+    ("oraclecloud.com", _drop_query),  # /hcmUI/CandidateExperience/en/sites/CX/job/12345
+    ("taleo.net", _keep_params("job")),  # jobdetail.ftl?job=12345&lang=en
+    ("ultipro.com", _keep_params("opportunityId")),  # OpportunityDetail?opportunityId=<uuid>
+    ("ashbyhq.com", _drop_query),
+    ("smartrecruiters.com", _drop_query),
+]
+
+
+def _unwrap(url):
+    # Recruitics carries the destination in rx_url, so it can be unwrapped without a request
+    parts = urlsplit(url)
+    if parts.hostname and parts.hostname.endswith("recruitics.com"):
+        for k, v in parse_qsl(parts.query):
+            if k == "rx_url" and v:
+                return unquote(v)
+    return url
+
+
+def canonical_url(url):
+    """
+    Returns the canonical form of a job URL (see module docstring). Unparseable input comes back trimmed.
+    """
+    u = (url or "").strip()
+    if not u:
+        return u
+    if "://" not in u:
+        u = "https://" + u
+
+    try:
+        u = _unwrap(u)
+        parts = urlsplit(u)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return (url or "").strip()
+
+    if host.startswith("www."):
+        host = host[4:]
+
+    # The scheme doesn't change which posting a link points to
+    scheme = "https"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    for suffix, rule in ATS_RULES:
+        if host == suffix or host.endswith("." + suffix):
+            host, path, query = rule(host, path, query)
+            break
+    else:
+        query = [(k, v) for k, v in query if not _is_tracking(k)]
+
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
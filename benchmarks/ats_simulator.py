@@ -0,0 +1,358 @@
+import argparse
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+"""
+ats_simulator.py is a local HTTP server that imitates the ATS families check_single_link() knows about, so the link
+checker can be benchmarked without touching live sites.
+
+Every simulated job URL carries its expected state ("active" or "expired") in the path or query, and the server
+answers the way that ATS does for such a job: Workday's postingAvailable flag, a Greenhouse redirect with
+error=true, UltiPro's OpportunityUnavailableMessage, iCIMS 404s, Dayforce __NEXT_DATA__ postingStatus, Taleo's
+requisition interfaces, BambooHR's redirect to the careers page, Appcast / grnh.se wrappers in front of other
+families, and a page that only says it's closed after JavaScript runs (the Playwright fallback).
+
+The server routes on the Host header, so the URLs use the real ATS hostnames (check_single_link routes on them) on
+the simulator's port; install_dns_override() points those hostnames at 127.0.0.1. The JS family uses a *.localhost
+hostname, which Chromium resolves to loopback on its own.
+
+Latency and failures are injected per request: a base latency with jitter, plus error (HTTP 500), hang (no answer
+for hang_seconds) and reset (connection dropped) rates. Outcomes are seeded from the URL, so a run is repeatable.
+
+    python -m benchmarks.ats_simulator --port 8765 --latency-ms 80 --error-rate 0.02
+"""
+
+STATES = ("active", "expired")
+
+# family -> hostname served for it
+FAMILY_HOSTS = {
+    "workday": "acme.wd1.myworkdayjobs.com",
+    "greenhouse": "job-boards.greenhouse.io",
+    "ultipro": "recruiting.ultipro.com",
+    "icims": "careers-acme.icims.com",
+    "dayforce": "jobs.dayforcehcm.com",
+    "taleo": "acme.taleo.net",
+    "bamboohr": "acme.bamboohr.com",
+    "appcast": "click.appcast.io",
+    "grnh": "grnh.se",
+    "js": "jobs.js-board.localhost",
+}
+FAMILIES = tuple(FAMILY_HOSTS)
+
+
+def job_url(family, state, n, port):
+    """
+    Returns the simulated URL of job n of a family in the given state ("active" / "expired").
+    """
+    host = f"http://{FAMILY_HOSTS[family]}:{port}"
+    job = f"{state}-{n}"
+
+    if family == "workday":
+        return f"{host}/en-US/External/job/Remote/Software-Intern_{job}"
+    if family == "greenhouse":
+        return f"{host}/acme/jobs/{job}"
+    if family == "ultipro":
+        return f"{host}/ACM1000/JobBoard/b1d2/OpportunityDetail?opportunityId={job}"
+    if family == "icims":
+        return f"{host}/jobs/{job}/software-intern/job"
+    if family == "dayforce":
+        return f"{host}/en-US/acme/CANDIDATEPORTAL/jobs/{job}?src=LinkedIn"
+    if family == "taleo":
+        return f"{host}/careersection/2/jobdetail.ftl?job={job}&lang=en"
+    if family == "bamboohr":
+        return f"{host}/careers/{job}"
+    if family == "appcast":
+        return f"{host}/track/{job}"
+    if family == "grnh":
+        return f"{host}/{job}"
+    if family == "js":
+        return f"{host}/job/{job}"
+    raise ValueError(f"Unknown ATS family {family!r}")
+
+
+def expected_decision(url):
+    """
+    The decision check_single_link should reach for a simulated URL.
+    """
+    return "DELETE" if "expired-" in url else "KEEP"
+
+
+def make_links(families, per_family, port, expired_share=0.5, seed=0):
+    """
+    Returns a shuffled list of simulated job URLs, per_family for each family.
+    """
+    rng = random.Random(seed)
+    links = []
+    for family in families:
+        for n in range(per_family):
+            state = "expired" if rng.random() < expired_share else "active"
+            links.append(job_url(family, state, n, port))
+    rng.shuffle(links)
+    return links
+
+
+def install_dns_override(suffixes=None):
+    """
+    Wraps socket.getaddrinfo so the simulated hostnames resolve to 127.0.0.1. The link checker's DNS cache
+    (backend.dns_cache) resolves its misses through socket.getaddrinfo, so it picks this up too.
+    """
+    suffixes = tuple(suffixes or FAMILY_HOSTS.values())
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if isinstance(host, bytes):
+            host = host.decode()
+        if host and host.lower().endswith(suffixes):
+            host = "127.0.0.1"
+        return real_getaddrinfo(host, *args, **kwargs)
+
+    socket.getaddrinfo = getaddrinfo
+
+
+# ============================================================
+# Responses per family
+# ============================================================
+
+def _state(text):
+    return "expired" if "expired-" in text else "active"
+
+
+def _page(title, body):
+    return f"<!DOCTYPE html><html><head><title>{title}</title></head><body>{body}</body></html>"
+
+
+def _filler(n=40):
+    # Roughly the size of a real posting body, so parsers have something to chew on
+    return "<p>" + " ".join(["We are looking for a motivated intern to join our team."] * n) + "</p>"
+
+
+def _workday(handler, path, query):
+    available = "true" if _state(path) == "active" else "false"
+    body = _page("Workday", _filler() + f'<script>window.workday = {{"postingAvailable":{available}}};</script>')
+    return 200, {}, body
+
+
+def _greenhouse(handler, path, query):
+    if _state(path) == "expired":
+        return 302, {"Location": f"http://{handler.headers.get('Host')}/acme?error=true"}, ""
+    return 200, {}, _page("Greenhouse", _filler())
+
+
+def _ultipro(handler, path, query):
+    body = _filler()
+    if _state(query) == "expired":
+        body += '<script>var key = "Opportunity.OpportunityError.OpportunityUnavailableMessage";</script>'
+    return 200, {}, _page("UltiPro", body)
+
+
+def _icims(handler, path, query):
+    if _state(path) == "expired":
+        return 404, {}, _page("iCIMS", "<p>Not found</p>")
+    return 200, {}, _page("iCIMS", _filler())
+
+
+def _dayforce(handler, path, query):
+    status = 1 if _state(path) == "active" else 2
+    data = {"props": {"pageProps": {"jobData": {"jobTitle": "Software Intern", "postingStatus": status,
+                                                "postingExpiryTimestampUTC": None}}}}
+    body = _filler() + f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+    return 200, {}, _page("Dayforce", body)
+
+
+def _taleo(handler, path, query):
+    if _state(query) == "expired":
+        script = "_ftl = {_ints: ['requisitionUnavailableInterface']};"
+    else:
+        script = "_ftl = {_ints: ['requisitionDescriptionInterface'], _lists: ['descRequisition']};"
+    return 200, {}, _page("Taleo", _filler() + f"<script>{script}</script>")
+
+
+def _bamboohr(handler, path, query):
+    if _state(path) == "expired":
+        return 302, {"Location": f"http://{handler.headers.get('Host')}/careers"}, ""
+    return 200, {}, _page("BambooHR", _filler())
+
+
+def _target(handler, family, path):
+    port = handler.server.server_address[1]
+    n = path.rsplit("-", 1)[-1]
+    return job_url(family, _state(path), n, port)
+
+
+def _appcast(handler, path, query):
+    target = _target(handler, "workday", path)
+    body = f'<script>setTimeout(function () {{ navigateTo(a, b, "{target}") }}, 0);</script>'
+    return 200, {}, _page("Redirecting", body)
+
+
+def _grnh(handler, path, query):
+    return 301, {"Location": _target(handler, "greenhouse", path)}, ""
+
+
+def _js(handler, path, query):
+    # The closed notice only exists after JS runs, so only the Playwright fallback can see it
+    message = "This job is no longer available" if _state(path) == "expired" else "Apply now"
+    script = f"setTimeout(function () {{ document.getElementById('app').innerText = '{message}'; }}, 50);"
+    return 200, {}, _page("Careers", f"<div id='app'>Loading...</div><script>{script}</script>")
+
+
+HANDLERS = {
+    "workday": _workday,
+    "greenhouse": _greenhouse,
+    "ultipro": _ultipro,
+    "icims": _icims,
+    "dayforce": _dayforce,
+    "taleo": _taleo,
+    "bamboohr": _bamboohr,
+    "appcast": _appcast,
+    "grnh": _grnh,
+    "js": _js,
+}
+
+
+# ============================================================
+# Server
+# ============================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        sim = self.server.simulator
+        host = (self.headers.get("Host") or "").split(":")[0].lower()
+        family = next((f for f, h in FAMILY_HOSTS.items() if host == h), None)
+        parts = urlsplit(self.path)
+
+        rng = random.Random(hashlib.sha1(f"{sim.seed}:{self.path}:{host}".encode()).digest())
+        sim.record_request(family)
+
+        time.sleep(sim.latency(rng))
+
+        roll = rng.random()
+        if roll < sim.reset_rate:
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        roll -= sim.reset_rate
+        if roll < sim.hang_rate:
+            time.sleep(sim.hang_seconds)
+            self.close_connection = True
+            return
+        roll -= sim.hang_rate
+
+        if family is None:
+            status, headers, body = 404, {}, _page("Unknown host", "")
+        elif roll < sim.error_rate:
+            status, headers, body = 500, {}, _page("Error", "<p>Internal Server Error</p>")
+        else:
+            status, headers, body = HANDLERS[family](self, parts.path, parts.query)
+
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ATSSimulator:
+    """
+    The simulator server, run on a background thread.
+
+    :param port: Port to listen on (0 picks a free one; see .port)
+    :param latency_ms: Base response latency
+    :param jitter_ms: Uniform +/- jitter on the latency
+    :param error_rate: Share of requests answered with HTTP 500
+    :param hang_rate: Share of requests that get no answer for hang_seconds (client timeouts)
+    :param reset_rate: Share of requests whose connection is dropped without an answer
+    :param hang_seconds: How long a hanging request stalls
+    :param seed: Seed for latency / failure draws (each request is seeded from its URL)
+    """
+
+    def __init__(self, port=0, latency_ms=50, jitter_ms=25, error_rate=0.0, hang_rate=0.0, reset_rate=0.0,
+                 hang_seconds=30, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.reset_rate = reset_rate
+        self.hang_seconds = hang_seconds
+        self.seed = seed
+
+        self.requests = {}  # family -> count
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def latency(self, rng):
+        return max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def record_request(self, family):
+        with self.lock:
+            self.requests[family] = self.requests.get(family, 0) + 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_simulator_args(parser):
+    parser.add_argument("--latency-ms", type=float, default=50, help="Base response latency")
+    parser.add_argument("--jitter-ms", type=float, default=25, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of HTTP 500 answers")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests left hanging")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Share of dropped connections")
+    parser.add_argument("--hang-seconds", type=float, default=30, help="How long a hanging request stalls")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def simulator_from_args(args, port=0):
+    return ATSSimulator(
+        port=port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        reset_rate=args.reset_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local ATS simulator for link checker benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    add_simulator_args(parser)
+    args = parser.parse_args()
+
+    simulator = simulator_from_args(args, port=args.port)
+    print(f"ATS simulator on 127.0.0.1:{simulator.port}. Example URLs (resolve the hosts to 127.0.0.1):")
+    for family in FAMILIES:
+        print(f"  {family:10s} {job_url(family, 'expired', 1, simulator.port)}")
+    simulator.server.serve_forever()
@@ -0,0 +1,170 @@
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.ats_simulator import FAMILIES, add_simulator_args, expected_decision, make_links, simulator_from_args
+
+"""
+bench_link_checks.py benchmarks run_link_checks() and run_link_checks_parallel() offline against the ATS simulator.
+
+The simulator runs in this process. Each (runner, concurrency) configuration runs in a fresh subprocess so caches,
+breaker state and peak RSS don't carry over from one configuration to the next. The report has links/sec,
+p50/p95/p99 per-link latency, peak RSS and accuracy against the simulator's ground truth for each one.
+
+    python -m benchmarks.bench_link_checks
+    python -m benchmarks.bench_link_checks --per-family 50 --concurrency 1 4 16 32 --latency-ms 120 --error-rate 0.02
+    python -m benchmarks.bench_link_checks --families workday greenhouse icims   # skip the Playwright family
+
+Peak RSS is the checker process only; with BROWSER_POOL_ENABLED=1 Chromium lives in the browser pool processes.
+The per-host rate limit defaults to effectively off (--host-rate) so the numbers measure the checker, not the
+politeness limits. Pass --host-rate 2 (the LINK_CHECK_HOST_RATE default) to see production's limit for a single
+hostname; the simulator serves each family from one hostname, so that is the worst case of a run whose links are all
+on one tenant, not of one whole ATS.
+"""
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_worker(config):
+    """
+    Runs one configuration in this process and returns its measurements. Expects the simulator to be up already.
+    """
+    from benchmarks.ats_simulator import install_dns_override
+    from backend import job_cleaningtesting
+    from backend.host_throttle import HostGuard
+
+    install_dns_override()
+
+    latencies = []
+    check_single_link = job_cleaningtesting.check_single_link
+
+    def timed_check(url, timeout=60):
+        started = time.perf_counter()
+        try:
+            return check_single_link(url, timeout=timeout)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    # Both runners look check_single_link up as a module global, so this times every check they make
+    job_cleaningtesting.check_single_link = timed_check
+
+    links = config["links"]
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if config["runner"] == "run_link_checks":
+            results = job_cleaningtesting.run_link_checks(links, timeout=config["timeout"], show_per_link=False)
+        else:
+            results = job_cleaningtesting.run_link_checks_parallel(
+                links,
+                timeout=config["timeout"],
+                show_per_link=False,
+                max_workers=config["concurrency"],
+                host_guard=HostGuard(rate=config["host_rate"], burst=max(5, int(config["host_rate"]))),
+                per_host_cap=config["concurrency"],
+            )
+
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    correct = sum(1 for url, res in zip(links, results) if res and res.get("decision") == expected_decision(url))
+    latencies.sort()
+
+    return {
+        "runner": config["runner"],
+        "concurrency": config["concurrency"],
+        "links": len(links),
+        "elapsed": elapsed,
+        "links_per_sec": len(links) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "cpu_ms_per_link": cpu * 1000 / len(links) if links else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+        "accuracy": correct / len(links) if links else 0.0,
+    }
+
+
+def run_config(config):
+    env = dict(os.environ)
+    env.setdefault("LINK_CHECK_LATENCY_PATH", os.path.join(tempfile.gettempdir(), "rezify_bench_latency.json"))
+    env["NO_PROXY"] = "*"  # the simulator is local, never go through a proxy
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+        config_path = f.name
+
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_link_checks", "--worker", config_path],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.unlink(config_path)
+
+    if proc.returncode != 0:
+        raise SystemExit(f"{config['runner']} @ {config['concurrency']} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline link checker benchmark against the ATS simulator")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--families", nargs="+", default=list(FAMILIES), choices=FAMILIES)
+    parser.add_argument("--per-family", type=int, default=20, help="Links per ATS family")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="max_workers levels")
+    parser.add_argument("--sequential-links", type=int, default=None,
+                        help="Cap on links for the sequential run_link_checks run (default all)")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-check timeout passed to the runners")
+    parser.add_argument("--host-rate", type=float, default=1000.0, help="Per-host requests/sec for HostGuard")
+    add_simulator_args(parser)
+    args = parser.parse_args()
+
+    if args.worker:
+        from backend import browser_pool
+
+        with open(args.worker) as f:
+            config = json.load(f)
+        with browser_pool.serving():
+            print(json.dumps(run_worker(config)))
+        return
+
+    with simulator_from_args(args) as simulator:
+        links = make_links(args.families, args.per_family, simulator.port, seed=args.seed)
+        print(f"ATS simulator on port {simulator.port}: {len(links)} links over {len(args.families)} families, "
+              f"latency {args.latency_ms}±{args.jitter_ms}ms, errors {args.error_rate:.0%}, "
+              f"hangs {args.hang_rate:.0%}, resets {args.reset_rate:.0%}")
+
+        configs = [{"runner": "run_link_checks", "concurrency": 1, "links": links[:args.sequential_links]}]
+        configs += [{"runner": "run_link_checks_parallel", "concurrency": c, "links": links} for c in args.concurrency]
+
+        print(f"\n{'runner':26s} {'conc':>4} {'links':>6} {'links/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'cpu ms/link':>11} {'peak RSS MB':>11} {'accuracy':>8}")
+        for config in configs:
+            config.update(timeout=args.timeout, host_rate=args.host_rate)
+            r = run_config(config)
+            print(f"{r['runner']:26s} {r['concurrency']:>4d} {r['links']:>6d} {r['links_per_sec']:>8.1f} "
+                  f"{r['p50'] * 1000:>8.0f} {r['p95'] * 1000:>8.0f} {r['p99'] * 1000:>8.0f} "
+                  f"{r['cpu_ms_per_link']:>11.1f} {r['peak_rss_mb']:>11.0f} {r['accuracy']:>8.1%}")
+
+        print("\nRequests served per family: " + ", ".join(
+            f"{family}={count}" for family, count in sorted(simulator.requests.items(), key=lambda kv: str(kv[0]))
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import time
+import tracemalloc
+
+"""
+bench_parsers.py times only the parsing / decision step of each detector (the parse_* functions in
+job_cleaningtesting), with no network, and reports ns per input byte and memory allocated per call. It also times
+extract_base_domain() and group_count_by_source() over a large URL list.
+
+Fixtures are generated at a realistic-to-large size (--kb), with the marker each parser looks for near the end of
+the page so the whole body is scanned. Real pages can be used instead: --fixtures DIR picks up <parser>*.html files
+(e.g. workday_acme.html), and --cassette takes response bodies from a replay corpus (see replay_corpus.py).
+
+    python -m benchmarks.bench_parsers
+    python -m benchmarks.bench_parsers --kb 1000 --urls 50000 --json results.json
+"""
+
+
+def _filler(size, rng):
+    words = ["intern", "engineering", "team", "responsibilities", "benefits", "qualifications", "experience",
+             "software", "data", "we", "are", "looking", "for", "and", "the", "to", "with", "our"]
+    parts, total = [], 0
+    while total < size:
+        sentence = " ".join(rng.choice(words) for _ in range(14)).capitalize() + "."
+        chunk = f"<div class='section'><p>{sentence}</p><span data-id='{total}'>{sentence}</span></div>\n"
+        parts.append(chunk)
+        total += len(chunk)
+    return "".join(parts)
+
+
+def _page(body, scripts=""):
+    return f"<!DOCTYPE html><html><head><title>Job</title><style>.a{{color:red}}</style></head>" \
+           f"<body>{body}{scripts}</body></html>"
+
+
+def make_fixtures(kb, seed=0):
+    """
+    Returns {parser_name: [html, ...]} of generated pages of roughly kb KiB each.
+    """
+    rng = random.Random(seed)
+    size = kb * 1024
+    filler = _filler(size, rng)
+
+    next_data = {"props": {"pageProps": {"jobData": {
+        "jobTitle": "Software Intern",
+        "postingStatus": 1,
+        "postingExpiryTimestampUTC": None,
+        "jobDescription": _filler(size // 2, rng),
+    }}}}
+
+    return {
+        "workday": [_page(filler, '<script>window.wd = {"postingAvailable":false};</script>')],
+        "ultipro": [_page(filler, '<script>k="Opportunity.OpportunityError.OpportunityUnavailableMessage"</script>')],
+        "dayforce": [_page(filler[: size // 2],
+                           f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script>')],
+        "taleo": [_page(filler, "<script>_ftl = {_ints: ['requisitionDescriptionInterface'], "
+                                "_lists: ['descRequisition']};</script>")],
+        # No closed pattern anywhere, so every CLOSED_PATTERNS regex scans the whole text
+        "request_text": [_page(filler)],
+        "appcast": [_page(filler, '<script>setTimeout(function () { navigateTo(a, b, '
+                                  '"https://acme.wd1.myworkdayjobs.com/job/1") }, 0);</script>')],
+    }
+
+
+def load_fixture_dir(path, names):
+    fixtures = {}
+    for name in names:
+        for file_path in sorted(glob.glob(os.path.join(path, f"{name}*.html"))):
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                fixtures.setdefault(name, []).append(f.read())
+    return fixtures
+
+
+def load_cassette_bodies(path):
+    from benchmarks.cassettes import read_cassette
+
+    markers = {
+        "workday": ("workdayjobs", "workdaysite"), "ultipro": ("ultipro.com",), "dayforce": ("dayforcehcm.com",),
+        "taleo": ("taleo.net", "taleo.com"), "appcast": ("appcast.io",), "request_text": ("",),
+    }
+    fixtures = {}
+    for entry in read_cassette(path):
+        for ex in entry["http"]:
+            if "body" not in ex or not ex["body"]:
+                continue
+            for name, needles in markers.items():
+                if any(n in ex["url"] for n in needles):
+                    fixtures.setdefault(name, []).append(ex["body"])
+                    break
+    return fixtures
+
+
+def time_call(fn, arg, min_time=0.2, repeats=5):
+    """
+    Best per-call time in seconds over `repeats` rounds of at least min_time each.
+    """
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(arg)
+        took = time.perf_counter() - started
+        if took >= min_time / 5:
+            break
+        loops *= 2
+
+    best = took / loops
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(arg)
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best
+
+
+def measure_allocations(fn, arg):
+    """
+    Returns (peak_bytes, blocks) allocated while running fn(arg) once: the peak traced memory above the starting
+    point, and the number of memory blocks still allocated from inside the call when it returns.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    del result
+    retained_blocks = sum(max(0, stat.count_diff) for stat in after.compare_to(before, "filename"))
+    return peak - base, retained_blocks
+
+
+def make_urls(n, seed=0):
+    rng = random.Random(seed)
+    templates = [
+        "https://{c}.wd{d}.myworkdayjobs.com/en-US/External/job/Remote/Intern_JR-{n}?source=LinkedIn",
+        "https://job-boards.greenhouse.io/{c}/jobs/{n}",
+        "https://careers-{c}.icims.com/jobs/{n}/intern/job?in_iframe=1",
+        "https://jobs.dayforcehcm.com/en-US/{c}/CANDIDATEPORTAL/jobs/{n}?src=LinkedIn",
+        "https://www.{c}.com/careers/job/{n}",
+        "https://{c}.taleo.net/careersection/2/jobdetail.ftl?job={n}&lang=en",
+        "https://jobs.lever.co/{c}/{n}",
+    ]
+    companies = [f"company{i}" for i in range(2000)]
+    return [
+        rng.choice(templates).format(c=rng.choice(companies), d=rng.randint(1, 5), n=rng.randint(1000, 999999))
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse-only micro-benchmarks for the link detectors")
+    parser.add_argument("--kb", type=int, default=300, help="Size of generated fixtures in KiB")
+    parser.add_argument("--fixtures", help="Directory of saved <parser>*.html pages to use instead")
+    parser.add_argument("--cassette", help="Replay corpus to take response bodies from instead")
+    parser.add_argument("--urls", type=int, default=50000, help="URLs for the domain grouping benchmark")
+    parser.add_argument("--json", help="Also write the results to this file (for comparing across changes)")
+    args = parser.parse_args()
+
+    from backend import job_cleaningtesting as jc
+
+    parsers = {
+        "workday": jc.parse_workday,
+        "ultipro": jc.parse_ultipro,
+        "dayforce": jc.parse_dayforce,
+        "taleo": jc.parse_taleo,
+        "request_text": jc.parse_request_text,
+        "appcast": jc.parse_appcast_redirect,
+    }
+
+    if args.fixtures:
+        fixtures = load_fixture_dir(args.fixtures, parsers)
+    elif args.cassette:
+        fixtures = load_cassette_bodies(args.cassette)
+    else:
+        fixtures = make_fixtures(args.kb)
+
+    results = []
+    print(f"{'parser':14s} {'pages':>5} {'KiB/page':>9} {'us/call':>10} {'ns/byte':>8} {'peak alloc KiB':>14} "
+          f"{'alloc/byte':>10} {'retained blocks':>15}")
+
+    for name, fn in parsers.items():
+        pages = fixtures.get(name) or []
+        if not pages:
+            continue
+
+        per_call, nbytes, peak, blocks = 0.0, 0, 0, 0
+        for html in pages:
+            per_call += time_call(fn, html)
+            nbytes += len(html.encode("utf-8", "surrogateescape"))
+            page_peak, page_blocks = measure_allocations(fn, html)
+            peak = max(peak, page_peak)
+            blocks += page_blocks
+
+        row = {
+            "parser": name,
+            "pages": len(pages),
+            "kib_per_page": nbytes / len(pages) / 1024,
+            "us_per_call": per_call / len(pages) * 1e6,
+            "ns_per_byte": per_call / nbytes * 1e9,
+            "peak_alloc_kib": peak / 1024,
+            "alloc_per_byte": peak / (nbytes / len(pages)),
+            "retained_blocks": blocks,
+        }
+        results.append(row)
+        print(f"{name:14s} {row['pages']:>5d} {row['kib_per_page']:>9.0f} {row['us_per_call']:>10.0f} "
+              f"{row['ns_per_byte']:>8.1f} {row['peak_alloc_kib']:>14.0f} {row['alloc_per_byte']:>10.1f} "
+              f"{row['retained_blocks']:>15d}")
+
+    urls = make_urls(args.urls)
+    url_bytes = sum(len(u) for u in urls)
+
+    def all_base_domains(items):
+        return [jc.extract_base_domain(u) for u in items]
+
+    def grouped(items):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return jc.group_count_by_source(items)
+
+    print(f"\n{'url function':22s} {'urls':>7} {'ms total':>9} {'ns/url':>8} {'ns/byte':>8} {'peak alloc KiB':>14}")
+    for name, fn in (("extract_base_domain", all_base_domains), ("group_count_by_source", grouped)):
+        took = time_call(fn, urls, min_time=0.5, repeats=3)
+        peak, _ = measure_allocations(fn, urls)
+        row = {
+            "parser": name,
+            "urls": len(urls),
+            "ms_total": took * 1000,
+            "ns_per_url": took / len(urls) * 1e9,
+            "ns_per_byte": took / url_bytes * 1e9,
+            "peak_alloc_kib": peak / 1024,
+        }
+        results.append(row)
+        print(f"{name:22s} {len(urls):>7d} {row['ms_total']:>9.1f} {row['ns_per_url']:>8.0f} "
+              f"{row['ns_per_byte']:>8.1f} {row['peak_alloc_kib']:>14.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
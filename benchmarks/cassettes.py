@@ -0,0 +1,279 @@
+import gzip
+import io
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+"""
+cassettes.py records what a link check sees from the network and plays it back offline.
+
+A cassette is a gzip'd JSONL file with one entry per checked URL: its label (active / expired), every HTTP exchange
+the check made (each redirect hop is its own exchange) and the outcome of every Playwright/Oracle render. Recording
+swaps in an adapter on backend.http_client (every detector request goes through it) and wraps
+job_cleaningtesting.render_page_check. Replay swaps in an adapter that answers from the entry instead, so
+check_single_link runs the same parsing and decision code with no network or browser.
+
+Entries are tracked per thread (requests runs the adapter in the calling thread), so recording can run checks in
+parallel. Bodies are stored as text with surrogateescape so arbitrary bytes round trip.
+"""
+
+# Hop-by-hop / encoding headers that no longer describe the stored (decoded) body
+_DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+_ERRORS = {
+    "ConnectTimeout": requests.ConnectTimeout,
+    "ReadTimeout": requests.ReadTimeout,
+    "Timeout": requests.Timeout,
+    "SSLError": requests.exceptions.SSLError,
+    "ConnectionError": requests.ConnectionError,
+    "TooManyRedirects": requests.TooManyRedirects,
+}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """
+    Raised in replay for a request the cassette has no recording of.
+    """
+
+
+def _encode_body(data):
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _decode_body(text):
+    return text.encode("utf-8", "surrogateescape")
+
+
+def write_cassette(path, entries):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def read_cassette(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _EntryContext:
+    """
+    Holds the cassette entry of the check running on the current thread.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def entry(self):
+        return getattr(self.local, "entry", None)
+
+    def activate(self, entry):
+        self.local.entry = entry
+
+    def deactivate(self):
+        self.local.entry = None
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Passes requests to the real adapter and appends each exchange to the current thread's entry.
+    """
+
+    def __init__(self, inner, context):
+        super().__init__()
+        self.inner = inner
+        self.context = context
+
+    def send(self, request, **kwargs):
+        entry = self.context.entry
+        try:
+            resp = self.inner.send(request, **kwargs)
+            body = resp.content  # reads the stream now; requests serves .content from the cache afterwards
+        except requests.RequestException as e:
+            if entry is not None:
+                entry["http"].append({
+                    "method": request.method, "url": request.url,
+                    "error": type(e).__name__, "message": str(e),
+                })
+            raise
+
+        if entry is not None:
+            entry["http"].append({
+                "method": request.method,
+                "url": request.url,
+                "status": resp.status_code,
+                "reason": resp.reason,
+                "headers": [[k, v] for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS],
+                "body": _encode_body(body),
+                "elapsed": resp.elapsed.total_seconds(),
+            })
+        return resp
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Answers requests from the current thread's entry, in recorded order per (method, url).
+    """
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def send(self, request, **kwargs):
+        entry = self.context.entry
+        exchanges = entry.setdefault("_unplayed", list(entry["http"])) if entry is not None else []
+
+        for i, ex in enumerate(exchanges):
+            if ex["method"] == request.method and ex["url"] == request.url:
+                del exchanges[i]
+                break
+        else:
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+
+        if "error" in ex:
+            raise _ERRORS.get(ex["error"], requests.RequestException)(ex["message"], request=request)
+
+        body = _decode_body(ex["body"])
+        headers = HTTPHeaderDict(ex["headers"])
+        headers["Content-Length"] = str(len(body))
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=ex["status"],
+            reason=ex["reason"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+class Recorder:
+    """
+    Records link checks into cassette entries.
+
+        with Recorder() as recorder:
+            entry = recorder.check(url, label="expired")   # runs check_single_link and records it
+        write_cassette(path, recorder.entries)
+    """
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self.context = _EntryContext()
+        self.entries = []
+        self.lock = threading.Lock()
+        self._restore = None
+
+    def __enter__(self):
+        from backend import http_client, job_cleaningtesting
+        from backend.dns_cache import dead_hosts
+
+        previous_adapter = http_client.set_adapter(RecordingAdapter(http_client.get_adapter(), self.context))
+        dead_hosts.ttl = 0  # every entry should hold its own network evidence, not a short-circuit from another
+        render = job_cleaningtesting.render_page_check
+        context = self.context
+
+        def recording_render(kind, url, timeout_ms):
+            entry = context.entry
+            try:
+                status, reason = render(kind, url, timeout_ms)
+            except Exception as e:
+                if entry is not None:
+                    entry["renders"].append({"kind": kind, "url": url, "error": type(e).__name__, "message": str(e)})
+                raise
+            if entry is not None:
+                entry["renders"].append({"kind": kind, "url": url, "status": status, "reason": reason})
+            return status, reason
+
+        job_cleaningtesting.render_page_check = recording_render
+
+        def restore():
+            http_client.set_adapter(previous_adapter)
+            job_cleaningtesting.render_page_check = render
+        self._restore = restore
+        return self
+
+    def __exit__(self, *exc):
+        self._restore()
+
+    def check(self, url, label):
+        from backend import job_cleaningtesting
+
+        entry = {"url": url, "label": label, "http": [], "renders": []}
+        self.context.activate(entry)
+        try:
+            entry["recorded_result"] = job_cleaningtesting.check_single_link(url, timeout=self.timeout)
+        finally:
+            self.context.deactivate()
+
+        with self.lock:
+            self.entries.append(entry)
+        return entry
+
+
+class Player:
+    """
+    Replays cassette entries through check_single_link without network or browser.
+
+        with Player() as player:
+            result = player.check(entry)
+    """
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self.context = _EntryContext()
+        self._restore = None
+
+    def __enter__(self):
+        from backend import http_client, job_cleaningtesting
+        from backend.dns_cache import dead_hosts
+
+        previous_adapter = http_client.set_adapter(ReplayAdapter(self.context))
+        render = job_cleaningtesting.render_page_check
+        context = self.context
+
+        def replay_render(kind, url, timeout_ms):
+            entry = context.entry
+            renders = entry.setdefault("_unplayed_renders", list(entry["renders"]))
+            for i, r in enumerate(renders):
+                if r["kind"] == kind and r["url"] == url:
+                    del renders[i]
+                    break
+            else:
+                raise RuntimeError(f"No recorded render for {kind} {url}")
+
+            if "error" in r:
+                if r["error"] == "TimeoutError":
+                    from playwright.sync_api import TimeoutError as PWTimeoutError
+                    raise PWTimeoutError(r["message"])
+                raise RuntimeError(f"{r['error']}: {r['message']}")
+            return r["status"], r["reason"]
+
+        job_cleaningtesting.render_page_check = replay_render
+        dead_hosts.ttl = 0  # a host that failed in one entry must not short-circuit the next one
+
+        def restore():
+            http_client.set_adapter(previous_adapter)
+            job_cleaningtesting.render_page_check = render
+        self._restore = restore
+        return self
+
+    def __exit__(self, *exc):
+        self._restore()
+
+    def check(self, entry):
+        from backend import job_cleaningtesting
+
+        entry.pop("_unplayed", None)
+        entry.pop("_unplayed_renders", None)
+        self.context.activate(entry)
+        try:
+            return job_cleaningtesting.check_single_link(entry["url"], timeout=self.timeout)
+        finally:
+            self.context.deactivate()
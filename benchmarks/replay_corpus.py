@@ -0,0 +1,115 @@
+import argparse
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.cassettes import Player, Recorder, read_cassette, write_cassette
+
+"""
+replay_corpus.py builds a labelled cassette corpus from live links and replays it offline to score the checker.
+
+record samples active links (internships, via get_links) and known-removed links (removed_jobs_global, via
+get_expired_links), runs check_single_link on each while recording every HTTP exchange and render outcome, and writes
+the cassette. replay runs check_single_link over the cassette with no network and reports, per detector ("used"),
+precision / recall for DELETE next to CPU time per link, so a speedup that hurts accuracy shows up right away.
+
+    python -m benchmarks.replay_corpus record --active 300 --expired 300 --out corpus.jsonl.gz --workers 8
+    python -m benchmarks.replay_corpus replay corpus.jsonl.gz --repeat 3
+
+Labels are only as good as the tables: an internships row may already be expired but not cleaned yet. Detectors
+that compare against the current time (Dayforce's postingExpiryTimestampUTC) can flip on an old cassette.
+"""
+
+
+def record(args):
+    from backend.job_cleaningtesting import get_expired_links, get_links
+
+    labelled = [(url, "active") for url in get_links(limit=args.active)]
+    labelled += [(url, "expired") for url in get_expired_links(limit=args.expired)]
+    print(f"Recording {len(labelled)} links ({args.active} active, {args.expired} expired requested)")
+
+    started = time.perf_counter()
+    with Recorder(timeout=args.timeout) as recorder:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for i, _ in enumerate(executor.map(lambda item: recorder.check(*item), labelled), start=1):
+                if i % 50 == 0:
+                    print(f"  {i}/{len(labelled)}")
+
+    write_cassette(args.out, recorder.entries)
+    size_kb = os.path.getsize(args.out) / 1024
+    print(f"Wrote {len(recorder.entries)} entries to {args.out} ({size_kb:.0f} KiB) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def replay(args):
+    entries = read_cassette(args.cassette)
+    print(f"Replaying {len(entries)} entries from {args.cassette} x{args.repeat}")
+
+    # detector -> counters; positives are DELETE decisions / expired labels
+    stats = defaultdict(lambda: {"n": 0, "tp": 0, "fp": 0, "fn": 0, "tn": 0, "cpu": [], "changed": 0})
+    misses = 0
+
+    with Player(timeout=args.timeout) as player:
+        for _ in range(args.repeat):
+            for entry in entries:
+                cpu_started = time.process_time()
+                res = player.check(entry)
+                cpu = time.process_time() - cpu_started
+
+                used = res.get("used") or "unknown"
+                if "No recorded" in (res.get("reason") or ""):
+                    misses += 1
+
+                deleted = res.get("decision") == "DELETE"
+                expired = entry["label"] == "expired"
+                for key in (used, "ALL"):
+                    s = stats[key]
+                    s["n"] += 1
+                    s["cpu"].append(cpu)
+                    s["tp" if deleted and expired else "fp" if deleted else "fn" if expired else "tn"] += 1
+                    recorded = entry.get("recorded_result") or {}
+                    if recorded.get("decision") != res.get("decision"):
+                        s["changed"] += 1
+
+    def ratio(a, b):
+        return f"{a / b:8.1%}" if b else f"{'-':>8}"
+
+    print(f"\n{'detector':28s} {'n':>6} {'TP':>5} {'FP':>5} {'FN':>5} {'precision':>9} {'recall':>8} "
+          f"{'cpu ms/link':>11} {'p95 cpu ms':>10} {'changed':>7}")
+    for used, s in sorted(stats.items(), key=lambda kv: (kv[0] == "ALL", -kv[1]["n"])):
+        cpu = sorted(s["cpu"])
+        print(f"{used:28s} {s['n']:>6d} {s['tp']:>5d} {s['fp']:>5d} {s['fn']:>5d} "
+              f"{ratio(s['tp'], s['tp'] + s['fp']):>9} {ratio(s['tp'], s['tp'] + s['fn'])} "
+              f"{sum(cpu) / len(cpu) * 1000:>11.2f} {cpu[int(0.95 * (len(cpu) - 1))] * 1000:>10.2f} "
+              f"{s['changed']:>7d}")
+
+    print("\n'changed' counts decisions that differ from the live run the cassette was recorded from.")
+    if misses:
+        print(f"{misses} check(s) asked for a request or render missing from the cassette (detector logic changed?)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record / replay a labelled link check corpus")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record live checks into a cassette")
+    rec.add_argument("--active", type=int, default=200, help="Active links to sample (internships)")
+    rec.add_argument("--expired", type=int, default=200, help="Removed links to sample (removed_jobs_global)")
+    rec.add_argument("--out", default="link_corpus.jsonl.gz")
+    rec.add_argument("--workers", type=int, default=8)
+    rec.add_argument("--timeout", type=float, default=30)
+    rec.set_defaults(func=record)
+
+    rep = sub.add_parser("replay", help="Score check_single_link offline against a cassette")
+    rep.add_argument("cassette")
+    rep.add_argument("--repeat", type=int, default=1, help="Passes over the corpus (steadier CPU numbers)")
+    rep.add_argument("--timeout", type=float, default=30)
+    rep.set_defaults(func=replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
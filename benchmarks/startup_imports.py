@@ -0,0 +1,88 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+"""
+startup_imports.py measures how long importing a module (backend.app by default) takes in a fresh interpreter, and
+which modules that time goes to, using python -X importtime.
+
+    python benchmarks/startup_imports.py
+    python benchmarks/startup_imports.py --module backend.job_cleaningtesting --top 30
+    PRELOAD_CHECKER=1 python benchmarks/startup_imports.py --runs 5
+"""
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(module):
+    """
+    Imports `module` in a subprocess and returns (wall_seconds, [(self_us, cumulative_us, depth, name), ...]).
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-5:]
+        raise SystemExit(f"import {module} failed:\n" + "\n".join(tail))
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return wall, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per module")
+    parser.add_argument("--module", default="backend.app", help="Module to import (default backend.app)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=20, help="How many modules to list")
+    args = parser.parse_args()
+
+    walls = []
+    cumulative = defaultdict(list)
+    self_time = defaultdict(list)
+    packages = defaultdict(float)
+
+    for _ in range(args.runs):
+        wall, rows = run_once(args.module)
+        walls.append(wall)
+        run_packages = defaultdict(int)
+        for self_us, cumulative_us, depth, name in rows:
+            cumulative[name].append(cumulative_us)
+            self_time[name].append(self_us)
+            run_packages[name.split(".")[0]] += self_us
+        for package, us in run_packages.items():
+            packages[package] += us / args.runs
+
+    def avg(values):
+        return sum(values) / len(values)
+
+    print(f"import {args.module}: {avg(walls) * 1000:.0f} ms wall (interpreter start included), "
+          f"best {min(walls) * 1000:.0f} ms over {args.runs} run(s)")
+
+    print(f"\nTop {args.top} modules by cumulative import time")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name in sorted(cumulative, key=lambda n: avg(cumulative[n]), reverse=True)[:args.top]:
+        print(f"{avg(cumulative[name]) / 1000:>14.1f}  {avg(self_time[name]) / 1000:>8.1f}  {name}")
+
+    print(f"\nTop {args.top} top-level packages by total self time")
+    print(f"{'self ms':>8}  package")
+    for package, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{us / 1000:>8.1f}  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,116 @@
-from backend.clean_job_tables import get_jobs_for_cleaning, job_cleaning
+import argparse
+import logging
+import os
+import time
+
+from sentry_sdk import capture_message
+
+from backend import browser_pool, metrics
+from backend.clean_job_tables import get_cleaning_trends, get_jobs_for_cleaning, job_cleaning
+from backend.error_aggregator import ErrorAggregator
 
 """
 This script is to be ran in Heroku Scheduler (daily) to clean the jobs database. It runs the long process that checks
-the link of each job and removes the ones that are not valid anymore. 
+the link of each job and removes the ones that are not valid anymore.
+
+With no arguments it does the nightly run: both tables, jobs older than 7 days, oldest first. Options narrow or tune
+it, and --dry-run makes every decision without deleting anything, so the cleaner can be benchmarked against
+production-sized data:
+
+    python database_cleaning.py
+    python database_cleaning.py --dry-run --tables internships --limit 2000 --workers 16
+    python database_cleaning.py --dry-run --domain myworkdayjobs.com --time-budget 600
+
+Set METRICS_TEXTFILE to a path to have the run's metrics (DB statement times per phase, ...) written there at the end.
 """
 
-if __name__ == "__main__":
-    # Only check jobs that are older than 7 days, from oldest to newest
-    jobs_to_clean = get_jobs_for_cleaning('internships',7, newest=False)
+METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check job links and delete expired postings")
+    parser.add_argument("--tables", nargs="+", default=["internships", "entry_level"],
+                        choices=["internships", "entry_level"], help="Tables to clean, in order")
+    parser.add_argument("--workers", type=int, default=1, help="Postings fetched in parallel")
+    parser.add_argument("--limit", type=int, default=30000, help="Max jobs taken from each table")
+    parser.add_argument("--domain", help="Only jobs whose final_url contains this (e.g. greenhouse.io)")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Seconds for the link checks of the whole run; what's left is skipped until next run")
+    parser.add_argument("--min-age-days", type=int, default=7, help="Only jobs posted at least this many days ago")
+    parser.add_argument("--newest-first", action="store_true", help="Check the newest eligible jobs first")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Decide every posting but delete nothing (the SQL rules are only counted, no history row)")
+    return parser.parse_args()
+
+
+def print_report(table, report):
+    verb = "Would delete" if report["dry_run"] else "Deleted"
+    print(f"\n=== {table}{' (dry run)' if report['dry_run'] else ''} ===")
+    print(f"Jobs:            {report['jobs']}")
+    print(f"Postings fetched:{report['links_checked']:>7d}  ({report['links_per_second']:.2f} links/s)")
+    print(f"{verb + ':':17s}{report['deleted']:>7d} rows")
+    print(f"Errors:          {report['error_count']:>7d}")
+    if report["skipped_time_budget"]:
+        print(f"Skipped (budget):{report['skipped_time_budget']:>7d}")
+    print(f"Duration:        {report['duration_seconds']:>7.1f}s  " + ", ".join(
+        f"{phase}={seconds:.1f}s" for phase, seconds in report["phase_seconds"].items() if seconds
+    ))
+    print("Detectors:       " + ", ".join(
+        f"{detector}={count}" for detector, count in sorted(report["detectors"].items(), key=lambda kv: -kv[1])
+    ))
+    if report.get("sql_rule_counts"):
+        print("SQL rules:       " + ", ".join(
+            f"{label.removesuffix('_del_count')}={count}" for label, count in report["sql_rule_counts"].items()
+        ))
+    for final_url, detector in report["samples"][:5]:
+        print(f"   - [{detector}] {final_url}")
+
 
-    # Run the cleaning process
-    job_cleaning(jobs_to_clean, 'internships')
\ No newline at end of file
+def main(args):
+    ends_at = time.monotonic() + args.time_budget if args.time_budget is not None else None
+
+    # Verdicts per canonical URL, shared so a posting listed in both tables is only fetched once
+    verdicts = {}
+    # Failed requests from both tables, reported as one summary (and one Sentry event) per run, or hourly if it's long
+    errors = ErrorAggregator("job_cleaning", flush_interval=3600, to_sentry=not args.dry_run)
+
+    for table in args.tables:
+        with metrics.phase("select_jobs"):
+            jobs_to_clean = get_jobs_for_cleaning(
+                table, args.min_age_days, limit=args.limit, newest=args.newest_first, url_filter=args.domain
+            )
+
+        # Run the cleaning process
+        report = job_cleaning(
+            jobs_to_clean,
+            table,
+            shared_verdicts=verdicts,
+            errors=errors,
+            dry_run=args.dry_run,
+            workers=args.workers,
+            time_budget=None if ends_at is None else max(0.0, ends_at - time.monotonic()),
+        )
+        if report:
+            print_report(table, report)
+
+        if args.dry_run:
+            continue
+
+        # Flag tonight's run if it was much slower than the last week's
+        trends = get_cleaning_trends(table, days=14)
+        if trends and trends[-1]["regressions"]:
+            message = f"Cleaning {table} regressed: " + "; ".join(trends[-1]["regressions"])
+            logging.warning(message)
+            capture_message(message, level="warning")
+
+    errors.flush()
+
+    if METRICS_TEXTFILE:
+        metrics.write_textfile(METRICS_TEXTFILE)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Playwright renders go to the shared browser pool, which this run owns
+    with browser_pool.serving():
+        main(args)
@@ -1,11 +1,93 @@
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import "../index.css";
 
+const POLL_INTERVAL_MS = 1500;
+const CHECK_DEADLINE_MS = 3 * 60 * 1000;
+
+// Waits for a submitted check: server-sent events when available, polling otherwise (or if the stream fails).
+// Gives up after CHECK_DEADLINE_MS so the page never waits forever on a check the server lost.
+function waitForCheck(check, onDone, onError) {
+    let stopped = false;
+    let source = null;
+    let pollTimer = null;
+    const deadlineTimer = setTimeout(() => {
+        stop();
+        onError("The check is taking too long, please try again");
+    }, CHECK_DEADLINE_MS);
+
+    async function poll() {
+        if (stopped) return;
+
+        try {
+            const response = await fetch(check.poll_url, { credentials: "include" });
+            const data = await response.json();
+
+            if (!response.ok) {
+                stop();
+                onError(data?.error || "Backend error");
+                return;
+            }
+
+            if (data.status === "done") {
+                stop();
+                onDone(data.result);
+                return;
+            }
+        } catch (err) {
+            // Network blip: keep polling
+        }
+
+        pollTimer = setTimeout(poll, POLL_INTERVAL_MS);
+    }
+
+    function stop() {
+        stopped = true;
+        if (source) source.close();
+        if (pollTimer) clearTimeout(pollTimer);
+        clearTimeout(deadlineTimer);
+    }
+
+    if (typeof window !== "undefined" && window.EventSource) {
+        source = new EventSource(check.events_url, { withCredentials: true });
+
+        source.addEventListener("result", (e) => {
+            stop();
+            onDone(JSON.parse(e.data).result);
+        });
+
+        source.addEventListener("missing", () => {
+            stop();
+            onError("Check not found");
+        });
+
+        // "pending" ends the stream and EventSource reconnects by itself after the server's retry
+        // delay; only fall back to polling if the connection can't be re-established
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED && !stopped) {
+                source = null;
+                poll();
+            }
+        };
+    } else {
+        poll();
+    }
+
+    return stop;
+}
+
 function Index() {
     const [url, setUrl] = useState("");
     const [error, setError] = useState("");
     const [status, setStatus] = useState("idle"); // idle | loading | done | error
     const [result, setResult] = useState(null);
+    const stopWaitingRef = useRef(null);
+
+    // Stop listening for a check if the page goes away
+    useEffect(() => {
+        return () => {
+            if (stopWaitingRef.current) stopWaitingRef.current();
+        };
+    }, []);
 
     const cardVariant = useMemo(() => {
         if (status === "loading" || status === "error") return "neutral";
@@ -31,8 +113,11 @@ function Index() {
         setStatus("loading");
         setResult(null);
 
+        if (stopWaitingRef.current) stopWaitingRef.current();
+
         try {
-            const response = await fetch("/check_job", {
+            // Submit returns right away with a check id; the check itself runs in the background
+            const response = await fetch("/check_job/submit", {
                 method: "POST",
                 headers: {
                     "Content-Type": "application/json"
@@ -49,8 +134,17 @@ function Index() {
                 return;
             }
 
-            setResult(data);
-            setStatus("done");
+            stopWaitingRef.current = waitForCheck(
+                data,
+                (checkResult) => {
+                    setResult(checkResult);
+                    setStatus("done");
+                },
+                (message) => {
+                    setError(message);
+                    setStatus("error");
+                }
+            );
 
         } catch (err) {
             setError(`Request failed: ${err.message}`);
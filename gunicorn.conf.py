@@ -0,0 +1,25 @@
+"""
+gunicorn.conf.py is picked up automatically by gunicorn (see Procfile). The app is preloaded in the master and the
+workers are forked from it, so anything holding sockets or threads (Sentry, DB pools, the shared HTTP pools) is set
+up again in each worker by post_fork. Chromium is never started in the master: the master owns the browser pool server
+(a separate process it starts in on_starting, restarts if it dies and stops in on_exit), and workers only connect to it.
+
+Set PRELOAD_CHECKER=1 to also import the link checker in the master, so workers share it instead of each paying for
+the import on their first /check_job.
+"""
+
+
+def on_starting(server):
+    # Runs in the master before any worker is forked, so the workers inherit the pool's BROWSER_POOL_AUTHKEY
+    from backend import browser_pool
+    browser_pool.start_server()
+
+
+def on_exit(server):
+    from backend import browser_pool
+    browser_pool.stop_server()
+
+
+def post_fork(server, worker):
+    from backend.app import init_worker
+    init_worker()